@@ -5,88 +5,1058 @@ Author: [Your Name] - [Student ID]
 This module provides the base class using OpenAI API.
 """
 
-from typing import Dict, Any
-from openai import OpenAI
+from typing import Dict, Any, Optional, Tuple, Callable, Generator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import threading
+import time
+from infra.llm_cache import LLMResponseCache
+from infra.http_pool import ClientRegistry, get_client_registry
+from infra.rate_limiter import Reservation, estimate_tokens
+from infra.retry_policy import LatencyWindow
+from infra.metrics import MetricsRegistry, get_metrics_registry
 
 
 class BaseAgent:
     """
     Base class for all agents using OpenAI.
+
+    Child classes describe their LLM request in _build_request() and turn the
+    response into a result in _handle_response(); process() and aprocess()
+    drive the same steps over the sync and async clients. Requests should put
+    static instructions in the system prompt and variable content last, so
+    the provider can serve the shared prompt prefix from its cache.
     """
-    
-    def __init__(self, name: str, api_key: str, model: str = "gpt-4o-mini"):
+
+    def __init__(self, name: str, api_key: str, model: str = "gpt-4o-mini",
+                 cache: LLMResponseCache = None, clients: ClientRegistry = None,
+                 metrics: MetricsRegistry = None):
         """
         Initialize the base agent.
-        
+
         Args:
             name: Name of the agent
             api_key: OpenAI API key
             model: The model to use
+            cache: Optional response cache shared between agents
+            clients: Registry of pooled clients (defaults to the shared one)
+            metrics: Registry for call metrics (defaults to the shared one)
         """
         self.name = name
         self.model = model
-        self.client = OpenAI(api_key=api_key)
-        
+        self.api_key = api_key
+        self.clients = clients or get_client_registry()
+        self.client = self.clients.get_client(api_key)
+        self.cache = cache
+        self.metrics = metrics or get_metrics_registry()
+
         # Track API usage
         self.api_call_count = 0
         self.total_tokens = 0
-        
-    def call_llm(self, messages: list, system_prompt: str = "", max_tokens: int = 4000) -> Dict[str, Any]:
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0  # prompt tokens served by the provider's prefix cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fallback_count = 0  # results produced by _handle_failure()
+
+        # Track streaming latency
+        self.streamed_calls = 0
+        self.total_ttft_ms = 0.0
+        self.last_ttft_ms = None
+
+        # Track retries and hedged requests (see infra.retry_policy)
+        self.retries = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self.hedge_tokens = 0
+        self.latencies = LatencyWindow()
+        self._stats_lock = threading.Lock()
+
+        # Track speculative calls started before the real input was known
+        self.speculations = 0
+        self.speculation_hits = 0
+        self.speculation_misses = 0
+        self.speculation_saved_s = 0.0
+        self.speculation_wasted_tokens = 0
+        self._pending_speculations = {}  # request key -> list of Speculation
+
+    def call_llm(self, messages: list, system_prompt: str = "", max_tokens: int = 4000,
+                 temperature: float = 0.7, on_chunk: Callable[[str], None] = None,
+                 timeout: float = None) -> Dict[str, Any]:
         """
         Make an API call to OpenAI and track usage.
+
+        Identical requests are served from the response cache when one is
+        configured; cache hits do not count as API calls. Responses are only
+        added to the cache once process() has turned them into a result, so a
+        reply that can't be parsed is never replayed. When on_chunk is
+        given the response is streamed and each text chunk is passed to it
+        as it arrives. Failed attempts are timed out, retried and (for
+        non-streamed calls) hedged according to the client registry's
+        retry policy; timeout overrides the policy's per-attempt timeout.
         """
+        if on_chunk is not None:
+            stream = self.stream_llm(messages, system_prompt, max_tokens, temperature, timeout)
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration as stop:
+                    return stop.value
+                on_chunk(chunk)
+
         try:
-            # Prepare messages
-            openai_messages = []
-            
-            if system_prompt:
-                openai_messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            
-            for msg in messages:
-                openai_messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
-            
+            openai_messages = self._build_messages(messages, system_prompt)
+
+            cache_key, cached = self._check_cache(openai_messages, max_tokens, temperature)
+            if cached is not None:
+                return cached
+
             # Make API call
-            response = self.client.chat.completions.create(
+            response, reservation = self._create(dict(
+                model=self.model,
+                messages=openai_messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            ), timeout)
+
+            return self._record_usage(response.choices[0].message.content, response.usage,
+                                      cache_key, reservation)
+
+        except Exception as e:
+            print(f"Error in {self.name} API call: {str(e)}")
+            raise
+
+    def stream_llm(self, messages: list, system_prompt: str = "", max_tokens: int = 4000,
+                   temperature: float = 0.7,
+                   timeout: float = None) -> Generator[str, None, Dict[str, Any]]:
+        """
+        Make a streaming API call, yielding text chunks as they arrive.
+
+        Usage is taken from the final chunk of the stream, so token counts
+        match a non-streamed call. The generator returns the same dictionary
+        as call_llm(). Only opening the stream is retried: once text has been
+        yielded a failure is raised to the caller.
+        """
+        try:
+            openai_messages = self._build_messages(messages, system_prompt)
+
+            cache_key, cached = self._check_cache(openai_messages, max_tokens, temperature)
+            if cached is not None:
+                yield cached["text"]
+                return cached
+
+            state = _StreamState()
+            response, reservation = self._create(dict(
                 model=self.model,
                 messages=openai_messages,
                 max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            # Track usage
-            self.api_call_count += 1
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
-            total_tokens = response.usage.total_tokens
-            self.total_tokens += total_tokens
-            
-            # Extract response
-            response_text = response.choices[0].message.content
-            
-            return {
-                "text": response_text,
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-                "total_tokens": total_tokens
-            }
-            
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True}
+            ), timeout)
+            with response:
+                for chunk in response:
+                    text = state.feed(chunk)
+                    if text:
+                        yield text
+
+            return self._record_stream(state, cache_key, reservation)
+
         except Exception as e:
             print(f"Error in {self.name} API call: {str(e)}")
             raise
-    
+
+    async def acall_llm(self, messages: list, system_prompt: str = "", max_tokens: int = 4000,
+                        temperature: float = 0.7, on_chunk: Callable[[str], None] = None,
+                        timeout: float = None) -> Dict[str, Any]:
+        """
+        Async version of call_llm() using the pooled async client.
+        """
+        try:
+            openai_messages = self._build_messages(messages, system_prompt)
+
+            cache_key, cached = self._check_cache(openai_messages, max_tokens, temperature)
+            if cached is not None:
+                if on_chunk is not None:
+                    on_chunk(cached["text"])
+                return cached
+
+            # Make API call
+            if on_chunk is None:
+                response, reservation = await self._acreate(dict(
+                    model=self.model,
+                    messages=openai_messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                ), timeout)
+                return self._record_usage(response.choices[0].message.content, response.usage,
+                                          cache_key, reservation)
+
+            state = _StreamState()
+            response, reservation = await self._acreate(dict(
+                model=self.model,
+                messages=openai_messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True}
+            ), timeout)
+            async with response:
+                async for chunk in response:
+                    text = state.feed(chunk)
+                    if text:
+                        on_chunk(text)
+
+            return self._record_stream(state, cache_key, reservation)
+
+        except Exception as e:
+            print(f"Error in {self.name} API call: {str(e)}")
+            raise
+
+    def _build_messages(self, messages: list, system_prompt: str) -> list:
+        """Prepare the OpenAI message list."""
+        openai_messages = []
+
+        if system_prompt:
+            openai_messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+
+        for msg in messages:
+            openai_messages.append({
+                "role": msg.get("role", "user"),
+                "content": msg.get("content", "")
+            })
+
+        return openai_messages
+
+    def _check_cache(self, openai_messages: list, max_tokens: int,
+                     temperature: float) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Serve identical requests from the cache.
+
+        Returns:
+            Tuple of (cache key, cached response or None)
+        """
+        if self.cache is None:
+            return None, None
+
+        cache_key = LLMResponseCache.make_key({
+            "model": self.model,
+            "messages": openai_messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        })
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            self.cache_misses += 1
+            self._inc("llm_cache_misses_total")
+            return cache_key, None
+
+        self.cache_hits += 1
+        self._inc("llm_cache_hits_total")
+        return cache_key, self._free_response(cached["text"], cache_key)
+
+    @staticmethod
+    def _free_response(text: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Response for text that cost no tokens (cache hits and replays)."""
+        return {
+            "text": text,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+            "cached_tokens": 0,
+            "cached": True,
+            "cache_key": cache_key
+        }
+
+    def _cache_response(self, response: Dict[str, Any]):
+        """Store a response that _handle_response() accepted."""
+        cache_key = response.get("cache_key")
+        if cache_key is not None and not response.get("cached") and response["text"]:
+            self.cache.put(cache_key, {"text": response["text"]})
+
+    def _discard_response(self, response: Optional[Dict[str, Any]]):
+        """Evict a cached response that _handle_response() rejected."""
+        if response is not None and response.get("cached") and response.get("cache_key"):
+            self.cache.delete(response["cache_key"])
+
+    def _create(self, request: Dict[str, Any], timeout: float = None) -> Tuple[Any, Optional[Reservation]]:
+        """
+        Send a chat completion request with retries and optional hedging.
+
+        Args:
+            request: chat.completions.create() keyword arguments
+            timeout: Per-attempt timeout (defaults to the retry policy's)
+
+        Returns:
+            Tuple of (API response or stream, rate limiter reservation)
+        """
+        policy = self.clients.retry_policy
+        request["timeout"] = timeout or policy.timeout_s
+        retry = 0
+        while True:
+            hedge_delay = None if request.get("stream") else self.latencies.hedge_delay(policy)
+            try:
+                if hedge_delay is None:
+                    return self._attempt(request)
+                return self._hedged_attempt(request, hedge_delay)
+            except Exception as e:
+                if retry >= policy.max_retries or not policy.is_retryable(e):
+                    raise
+                delay = policy.backoff_s(retry, e)
+                retry += 1
+                self._count_retry(e, retry, delay)
+                time.sleep(delay)
+
+    async def _acreate(self, request: Dict[str, Any],
+                       timeout: float = None) -> Tuple[Any, Optional[Reservation]]:
+        """Async version of _create()."""
+        policy = self.clients.retry_policy
+        request["timeout"] = timeout or policy.timeout_s
+        retry = 0
+        while True:
+            hedge_delay = None if request.get("stream") else self.latencies.hedge_delay(policy)
+            try:
+                if hedge_delay is None:
+                    return await self._aattempt(request)
+                return await self._ahedged_attempt(request, hedge_delay)
+            except Exception as e:
+                if retry >= policy.max_retries or not policy.is_retryable(e):
+                    raise
+                delay = policy.backoff_s(retry, e)
+                retry += 1
+                self._count_retry(e, retry, delay)
+                await asyncio.sleep(delay)
+
+    def _attempt(self, request: Dict[str, Any]) -> Tuple[Any, Optional[Reservation]]:
+        """Send one request within the rate limits, recording its latency."""
+        reservation = self._reserve(request["messages"], request["max_tokens"])
+        return self._send(request, reservation)
+
+    async def _aattempt(self, request: Dict[str, Any]) -> Tuple[Any, Optional[Reservation]]:
+        """Async version of _attempt()."""
+        reservation = await self._areserve(request["messages"], request["max_tokens"])
+        return await self._asend(request, reservation)
+
+    def _send(self, request: Dict[str, Any],
+              reservation: Optional[Reservation]) -> Tuple[Any, Optional[Reservation]]:
+        """Send a request that already holds its reservation, recording its latency."""
+        started = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(**request)
+        except BaseException:
+            self._settle(reservation, 0)
+            self._inc("llm_requests_total", outcome="error")
+            raise
+        self._record_attempt(request, time.perf_counter() - started)
+        return response, reservation
+
+    async def _asend(self, request: Dict[str, Any],
+                     reservation: Optional[Reservation]) -> Tuple[Any, Optional[Reservation]]:
+        """Async version of _send()."""
+        started = time.perf_counter()
+        try:
+            client = self.clients.get_async_client(self.api_key)
+            response = await client.chat.completions.create(**request)
+        except BaseException:
+            self._settle(reservation, 0)
+            self._inc("llm_requests_total", outcome="error")
+            raise
+        self._record_attempt(request, time.perf_counter() - started)
+        return response, reservation
+
+    def _record_attempt(self, request: Dict[str, Any], seconds: float):
+        """Record a successful attempt's latency (streams only count as requests)."""
+        self._inc("llm_requests_total", outcome="ok")
+        if not request.get("stream"):
+            self.latencies.add(seconds)
+            self._observe("llm_request_seconds", seconds)
+
+    def _hedged_attempt(self, request: Dict[str, Any],
+                        delay: float) -> Tuple[Any, Optional[Reservation]]:
+        """
+        Send a request, and a duplicate if it is still running after delay.
+
+        The primary waits for the rate limiter here, so the delay only
+        counts time the request has actually been in flight. The duplicate
+        is only sent if the limiter has room for it right away; while
+        calls are queued a hedge would just spend more of the budget. The
+        first successful response wins. A blocking request cannot be
+        cancelled, so the loser runs to completion and its tokens are
+        counted as hedge tokens.
+        """
+        reservation = self._reserve(request["messages"], request["max_tokens"])
+        primary = _hedge_pool.submit(contextvars.copy_context().run, self._send,
+                                     request, reservation)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        ready, hedge_reservation = self._try_reserve(request["messages"], request["max_tokens"])
+        if not ready:
+            return primary.result()
+        with self._stats_lock:
+            self.hedged_requests += 1
+        self._inc("llm_hedged_requests_total")
+        hedge = _hedge_pool.submit(contextvars.copy_context().run, self._send,
+                                   request, hedge_reservation)
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._stats_lock:
+                            self.hedge_wins += 1
+                    for loser in {primary, hedge} - {future}:
+                        loser.add_done_callback(self._settle_hedge_loser)
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def _ahedged_attempt(self, request: Dict[str, Any],
+                               delay: float) -> Tuple[Any, Optional[Reservation]]:
+        """Async version of _hedged_attempt(); the losing request is cancelled."""
+        reservation = await self._areserve(request["messages"], request["max_tokens"])
+        primary = asyncio.ensure_future(self._asend(request, reservation))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            ready, hedge_reservation = self._try_reserve(request["messages"], request["max_tokens"])
+            if not ready:
+                return await primary
+            with self._stats_lock:
+                self.hedged_requests += 1
+            self._inc("llm_hedged_requests_total")
+            hedge = asyncio.ensure_future(self._asend(request, hedge_reservation))
+            tasks.add(hedge)
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._stats_lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _settle_hedge_loser(self, future):
+        """Account for the tokens of a hedged request that lost the race."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response, reservation = future.result()
+        tokens = response.usage.total_tokens if response.usage else 0
+        with self._stats_lock:
+            self.hedge_tokens += tokens
+        self._settle(reservation, tokens)
+
+    def _count_retry(self, error: Exception, retry: int, delay: float):
+        """Record and log a retry."""
+        with self._stats_lock:
+            self.retries += 1
+        self._inc("llm_retries_total", error=type(error).__name__)
+        print(f"[{self.name}] {type(error).__name__}; retry {retry}/"
+              f"{self.clients.retry_policy.max_retries} in {delay:.1f}s")
+
+    def _inc(self, name: str, value: float = 1, **labels):
+        """Add to one of this agent's counters in the metrics registry."""
+        self.metrics.inc(name, value, agent=self.name, model=self.model, **labels)
+
+    def _observe(self, name: str, value: float):
+        """Record a value in one of this agent's histograms."""
+        self.metrics.observe(name, value, agent=self.name, model=self.model)
+
+    def _settle(self, reservation: Optional[Reservation], tokens: int):
+        """Settle a rate limiter reservation, if there is one."""
+        if reservation is not None:
+            self.clients.rate_limiter.settle(reservation, tokens)
+
+    def _reserve(self, openai_messages: list, max_tokens: int) -> Optional[Reservation]:
+        """Wait until the shared rate limiter has room for this request."""
+        limiter = self.clients.rate_limiter
+        if limiter is None:
+            return None
+        return limiter.acquire(estimate_tokens(openai_messages, max_tokens))
+
+    async def _areserve(self, openai_messages: list, max_tokens: int) -> Optional[Reservation]:
+        """Async version of _reserve()."""
+        limiter = self.clients.rate_limiter
+        if limiter is None:
+            return None
+        return await limiter.aacquire(estimate_tokens(openai_messages, max_tokens))
+
+    def _try_reserve(self, openai_messages: list,
+                     max_tokens: int) -> Tuple[bool, Optional[Reservation]]:
+        """Reserve room for this request only if it can be sent without waiting."""
+        limiter = self.clients.rate_limiter
+        if limiter is None:
+            return True, None
+        reservation = limiter.try_acquire(estimate_tokens(openai_messages, max_tokens))
+        return reservation is not None, reservation
+
+    def _record_usage(self, response_text: str, usage: Any, cache_key: Optional[str],
+                      reservation: Optional[Reservation] = None) -> Dict[str, Any]:
+        """Track usage for a completion."""
+        # Track usage
+        self.api_call_count += 1
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+        total_tokens = usage.total_tokens if usage else 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+        self.total_tokens += total_tokens
+        self.prompt_tokens += input_tokens
+        self.cached_prompt_tokens += cached_tokens
+        record = _call_record.get()
+        if record is not None:
+            record.tokens += total_tokens
+        self._inc("llm_calls_total")
+        self._inc("llm_input_tokens_total", input_tokens)
+        self._inc("llm_output_tokens_total", output_tokens)
+        self._inc("llm_cached_tokens_total", cached_tokens)
+        self._observe("llm_input_tokens", input_tokens)
+        self._observe("llm_output_tokens", output_tokens)
+
+        # Give back the part of the reservation that was not used
+        self._settle(reservation, total_tokens)
+
+        return {
+            "text": response_text,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "cached_tokens": cached_tokens,
+            "cache_key": cache_key  # cached by process() once it has been parsed
+        }
+
+    def _record_stream(self, state: "_StreamState", cache_key: Optional[str],
+                       reservation: Optional[Reservation] = None) -> Dict[str, Any]:
+        """Track usage and time-to-first-token for a finished stream."""
+        result = self._record_usage(state.text(), state.usage, cache_key, reservation)
+
+        ttft_ms = state.time_to_first_token_ms()
+        if ttft_ms is not None:
+            self.streamed_calls += 1
+            self.total_ttft_ms += ttft_ms
+            self.last_ttft_ms = ttft_ms
+            self._observe("llm_time_to_first_token_seconds", ttft_ms / 1000)
+            result["time_to_first_token_ms"] = ttft_ms
+
+        return result
+
     def get_usage_stats(self) -> Dict[str, int]:
         """Get usage statistics."""
         return {
             "numApiCalls": self.api_call_count,
-            "totalTokens": self.total_tokens
+            "totalTokens": self.total_tokens,
+            "promptTokens": self.prompt_tokens,
+            "cachedPromptTokens": self.cached_prompt_tokens,
+            "cacheHits": self.cache_hits,
+            "cacheMisses": self.cache_misses,
+            "retries": self.retries,
+            "hedgedRequests": self.hedged_requests,
+            "hedgeWins": self.hedge_wins,
+            "hedgeTokens": self.hedge_tokens
         }
-    
-    def process(self, input_data: Any) -> Any:
-        """Process input - override in child classes."""
-        raise NotImplementedError("Child classes must implement process()")
+
+    def get_counters(self) -> Dict[str, Any]:
+        """Get all usage counters, e.g. for a workflow checkpoint."""
+        return {name: getattr(self, name) for name in _COUNTERS}
+
+    def restore_counters(self, counters: Dict[str, Any]):
+        """
+        Restore usage counters saved by get_counters().
+
+        Args:
+            counters: Counter values (missing ones are left unchanged)
+        """
+        for name in _COUNTERS:
+            if name in counters:
+                setattr(self, name, counters[name])
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Get hit rate and latency saved by speculative calls."""
+        settled = self.speculation_hits + self.speculation_misses
+        return {
+            "speculations": self.speculations,
+            "hits": self.speculation_hits,
+            "misses": self.speculation_misses,
+            "hitRate": round(self.speculation_hits / settled, 3) if settled else None,
+            "latencySavedS": round(self.speculation_saved_s, 4),
+            "wastedTokens": self.speculation_wasted_tokens
+        }
+
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Get time-to-first-token statistics for streamed calls."""
+        return {
+            "streamedCalls": self.streamed_calls,
+            "avgTimeToFirstTokenMs": (self.total_ttft_ms / self.streamed_calls
+                                      if self.streamed_calls else None),
+            "lastTimeToFirstTokenMs": self.last_ttft_ms
+        }
+
+    def process(self, input_data: Any, on_chunk: Callable[[str], None] = None) -> Any:
+        """
+        Process input with a blocking LLM call.
+
+        Args:
+            input_data: Agent-specific input
+            on_chunk: Optional callback receiving streamed response text
+
+        Returns:
+            Agent-specific result
+        """
+        request = self._build_request(input_data)
+        record = _call_record.get()
+        response = None
+        try:
+            response = self._speculative_response(request, on_chunk)
+            if response is None:
+                response = self.call_llm(**request, on_chunk=on_chunk)
+            result = self._handle_response(input_data, response)
+        except Exception as e:
+            self._discard_response(response)
+            self.fallback_count += 1
+            self._inc("agent_fallbacks_total")
+            if record is not None:
+                record.fallbacks += 1
+            return self._handle_failure(input_data, e)
+        self._cache_response(response)
+        if record is not None:
+            record.response = response
+        return result
+
+    async def aprocess(self, input_data: Any, on_chunk: Callable[[str], None] = None) -> Any:
+        """
+        Process input without blocking the event loop.
+
+        Args:
+            input_data: Agent-specific input
+            on_chunk: Optional callback receiving streamed response text
+
+        Returns:
+            Agent-specific result
+        """
+        request = self._build_request(input_data)
+        record = _call_record.get()
+        response = None
+        try:
+            response = await self._aspeculative_response(request, on_chunk)
+            if response is None:
+                response = await self.acall_llm(**request, on_chunk=on_chunk)
+            result = self._handle_response(input_data, response)
+        except Exception as e:
+            self._discard_response(response)
+            self.fallback_count += 1
+            self._inc("agent_fallbacks_total")
+            if record is not None:
+                record.fallbacks += 1
+            return self._handle_failure(input_data, e)
+        self._cache_response(response)
+        if record is not None:
+            record.response = response
+        return result
+
+    def replay_response(self, input_data: Any, response_text: str) -> Any:
+        """
+        Rebuild a result from response text received in an earlier call.
+
+        Nothing is sent to the LLM, so the result reports no token usage.
+        Fields that depend on the input are recomputed for input_data.
+
+        Args:
+            input_data: Agent-specific input
+            response_text: Text of a response that _handle_response() accepted
+
+        Returns:
+            Agent-specific result
+
+        Raises:
+            Exception: Whatever _handle_response() raises for the text
+        """
+        return self._handle_response(input_data, self._free_response(response_text))
+
+    def speculate(self, input_data: Any, stream: bool = False) -> "Speculation":
+        """
+        Start the LLM call for a predicted input before the real one is known.
+
+        The call runs in the background. When process() is later called with
+        an input that builds the same request, it takes over the speculative
+        call instead of sending a new one; otherwise the speculation should be
+        dropped with cancel_speculation().
+
+        Args:
+            input_data: Predicted agent-specific input
+            stream: Stream the call; chunks received before process() takes it
+                over are buffered and replayed to its on_chunk callback
+
+        Returns:
+            Handle describing the speculation and, later, its outcome
+        """
+        request = self._build_request(input_data)
+        speculation = Speculation(self._speculation_key(request))
+        on_chunk = speculation.feed if stream else None
+        speculation.handle = _speculation_pool.submit(contextvars.copy_context().run,
+                                                      self._speculative_call, request, on_chunk)
+        self._add_speculation(speculation)
+        return speculation
+
+    def aspeculate(self, input_data: Any, stream: bool = False) -> "Speculation":
+        """
+        Async version of speculate(); must be called from a running event loop.
+
+        The speculative call is a task on that loop and is taken over by
+        aprocess().
+        """
+        request = self._build_request(input_data)
+        speculation = Speculation(self._speculation_key(request))
+        on_chunk = speculation.feed if stream else None
+        speculation.handle = asyncio.ensure_future(self._aspeculative_call(request, on_chunk))
+        self._add_speculation(speculation)
+        return speculation
+
+    def speculation_matches(self, speculation: "Speculation", input_data: Any) -> bool:
+        """
+        Check whether processing an input would send the speculated request.
+
+        Args:
+            speculation: Handle returned by speculate()
+            input_data: The real agent-specific input
+
+        Returns:
+            True if the speculative call can stand in for the real one
+        """
+        return speculation.key == self._speculation_key(self._build_request(input_data))
+
+    def cancel_speculation(self, speculation: "Speculation"):
+        """
+        Drop a speculation that was not (or will not be) used.
+
+        A queued call is cancelled; a blocking call that is already running
+        cannot be, so its tokens are counted as wasted once it finishes.
+        Speculations that were already used are left alone.
+
+        Args:
+            speculation: Handle returned by speculate()
+        """
+        with self._stats_lock:
+            pending = self._pending_speculations.get(speculation.key, [])
+            if speculation not in pending:
+                return
+            pending.remove(speculation)
+            if not pending:
+                del self._pending_speculations[speculation.key]
+            speculation.status = "miss"
+            self.speculation_misses += 1
+
+        if not speculation.handle.cancel():
+            speculation.handle.add_done_callback(
+                lambda future: self._count_wasted_speculation(speculation, future))
+
+    def _speculation_key(self, request: Dict[str, Any]) -> str:
+        """Hash a request so speculative and real calls can be matched."""
+        return LLMResponseCache.make_key({"model": self.model, "request": request})
+
+    def _add_speculation(self, speculation: "Speculation"):
+        """Make a started speculation available to process()/aprocess()."""
+        with self._stats_lock:
+            self.speculations += 1
+            self._pending_speculations.setdefault(speculation.key, []).append(speculation)
+
+    def _claim_speculation(self, request: Dict[str, Any],
+                           async_ok: bool) -> Optional["Speculation"]:
+        """Take a pending speculation that sent exactly this request, if any."""
+        key = self._speculation_key(request)
+        with self._stats_lock:
+            pending = self._pending_speculations.get(key, [])
+            for speculation in pending:
+                if async_ok or isinstance(speculation.handle, Future):
+                    pending.remove(speculation)
+                    if not pending:
+                        del self._pending_speculations[key]
+                    return speculation
+        return None
+
+    def _speculative_call(self, request: Dict[str, Any],
+                          on_chunk: Callable[[str], None]) -> Tuple[Dict[str, Any], float]:
+        """Run a speculative call; returns the response and when it finished."""
+        _call_record.set(None)  # its usage is credited when a stage claims it
+        return self.call_llm(**request, on_chunk=on_chunk), time.perf_counter()
+
+    async def _aspeculative_call(self, request: Dict[str, Any],
+                                 on_chunk: Callable[[str], None]) -> Tuple[Dict[str, Any], float]:
+        """Async version of _speculative_call()."""
+        _call_record.set(None)
+        return await self.acall_llm(**request, on_chunk=on_chunk), time.perf_counter()
+
+    def _speculative_response(self, request: Dict[str, Any],
+                              on_chunk: Callable[[str], None]) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a matching speculative call and use its response.
+
+        Returns:
+            The call_llm() result, or None when there is no usable speculation
+        """
+        speculation = self._claim_speculation(request, async_ok=False)
+        if speculation is None:
+            return None
+        if speculation.handle.cancel():
+            # Still queued behind other calls: no head start, send it now
+            self._record_speculation(speculation, None)
+            return None
+        asked = time.perf_counter()
+        if on_chunk is not None:
+            speculation.attach(on_chunk)
+        try:
+            response, finished = speculation.handle.result()
+        except Exception:
+            self._record_speculation(speculation, None)
+            return None
+        return self._use_speculation(speculation, response, asked, finished, on_chunk)
+
+    async def _aspeculative_response(self, request: Dict[str, Any],
+                                     on_chunk: Callable[[str], None]) -> Optional[Dict[str, Any]]:
+        """Async version of _speculative_response()."""
+        speculation = self._claim_speculation(request, async_ok=True)
+        if speculation is None:
+            return None
+        asked = time.perf_counter()
+        handle = speculation.handle
+        if isinstance(handle, Future) and handle.cancel():
+            self._record_speculation(speculation, None)
+            return None
+        if on_chunk is not None:
+            speculation.attach(on_chunk)
+        try:
+            if isinstance(handle, Future):
+                handle = asyncio.wrap_future(handle)
+            response, finished = await handle
+        except Exception:
+            self._record_speculation(speculation, None)
+            return None
+        return self._use_speculation(speculation, response, asked, finished, on_chunk)
+
+    def _use_speculation(self, speculation: "Speculation", response: Dict[str, Any],
+                         asked: float, finished: float,
+                         on_chunk: Callable[[str], None]) -> Dict[str, Any]:
+        """Record a speculation hit and pass its response on."""
+        # The speculative call had a head start from its launch until the real
+        # request would have been sent (or until it finished, if sooner)
+        saved_s = min(asked, finished) - speculation.started
+        self._record_speculation(speculation, saved_s)
+
+        # Its usage was recorded outside any record_calls() block; credit it
+        # to the caller that takes it over
+        record = _call_record.get()
+        if record is not None:
+            record.tokens += response["total_tokens"]
+            record.speculation_saved_s += saved_s
+        if on_chunk is not None and not speculation.streamed and response["text"]:
+            # Started without streaming: pass the whole text on at once
+            on_chunk(response["text"])
+        return response
+
+    def _record_speculation(self, speculation: "Speculation", saved_s: Optional[float]):
+        """Record a claimed speculation as a hit, or a miss if its call failed."""
+        with self._stats_lock:
+            if saved_s is None:
+                speculation.status = "miss"
+                self.speculation_misses += 1
+            else:
+                speculation.status = "hit"
+                speculation.saved_s = saved_s
+                self.speculation_hits += 1
+                self.speculation_saved_s += saved_s
+
+    def _count_wasted_speculation(self, speculation: "Speculation", future):
+        """Account for the tokens of a dropped speculation that ran anyway."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response, _ = future.result()
+        with self._stats_lock:
+            speculation.wasted_tokens = response["total_tokens"]
+            self.speculation_wasted_tokens += response["total_tokens"]
+
+    def _build_request(self, input_data: Any) -> Dict[str, Any]:
+        """Build call_llm() keyword arguments - override in child classes."""
+        raise NotImplementedError("Child classes must implement _build_request()")
+
+    def _handle_response(self, input_data: Any, response: Dict[str, Any]) -> Any:
+        """Turn an LLM response into a result - override in child classes."""
+        raise NotImplementedError("Child classes must implement _handle_response()")
+
+    def _handle_failure(self, input_data: Any, error: Exception) -> Any:
+        """Produce a result when the LLM call or parsing fails."""
+        raise error
+
+
+class CallRecord:
+    """
+    Usage of the agent calls made inside a record_calls() block.
+    """
+
+    __slots__ = ("tokens", "fallbacks", "speculation_saved_s", "response")
+
+    def __init__(self):
+        """Start with no usage."""
+        self.tokens = 0
+        self.fallbacks = 0  # results produced by _handle_failure()
+        self.speculation_saved_s = 0.0  # head start of speculative calls taken over
+        self.response = None  # last response accepted by _handle_response()
+
+
+# CallRecord of the record_calls() block the current task or thread is in
+_call_record = contextvars.ContextVar("call_record", default=None)
+
+
+@contextmanager
+def record_calls() -> Iterator[CallRecord]:
+    """
+    Attribute the agent calls made in this context to a new CallRecord.
+
+    Agents are shared between concurrent workflows, so their counters can't
+    tell which calls belong to one stage; the record only sees calls made
+    from this context (and from tasks or threads that copy it).
+
+    Yields:
+        The CallRecord being filled in
+    """
+    record = CallRecord()
+    token = _call_record.set(record)
+    try:
+        yield record
+    finally:
+        _call_record.reset(token)
+
+
+# Usage counters saved in checkpoints
+_COUNTERS = ("api_call_count", "total_tokens", "prompt_tokens", "cached_prompt_tokens",
+             "cache_hits", "cache_misses", "fallback_count", "streamed_calls", "total_ttft_ms",
+             "last_ttft_ms", "retries", "hedged_requests", "hedge_wins", "hedge_tokens",
+             "speculations", "speculation_hits", "speculation_misses", "speculation_saved_s",
+             "speculation_wasted_tokens")
+
+
+# Threads running the blocking attempts of hedged calls
+_hedge_pool = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+
+# Threads running blocking speculative calls; they mostly wait on the network,
+# so the pool is sized for concurrent workflows rather than CPUs
+_speculation_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-speculate")
+
+
+class Speculation:
+    """
+    An LLM call started for a predicted input (see BaseAgent.speculate()).
+    """
+
+    __slots__ = ("key", "handle", "started", "status", "saved_s", "wasted_tokens",
+                 "streamed", "_chunks", "_consumer", "_lock")
+
+    def __init__(self, key: str):
+        """
+        Start timing a speculation.
+
+        Args:
+            key: Hash of the speculated request
+        """
+        self.key = key
+        self.handle = None  # concurrent Future or asyncio Task of the call
+        self.started = time.perf_counter()
+        self.status = "running"  # "hit" once used, "miss" once dropped
+        self.saved_s = 0.0
+        self.wasted_tokens = 0
+
+        # Streamed text, buffered until the process() call that claims it attaches
+        self.streamed = False
+        self._chunks = []
+        self._consumer = None
+        self._lock = threading.Lock()
+
+    def feed(self, chunk: str):
+        """
+        Take a streamed chunk of the speculative call.
+
+        Args:
+            chunk: Response text
+        """
+        with self._lock:
+            self.streamed = True
+            if self._consumer is None:
+                self._chunks.append(chunk)
+            else:
+                self._consumer(chunk)
+
+    def attach(self, consumer: Callable[[str], None]):
+        """
+        Replay the buffered chunks to consumer and forward later ones to it.
+
+        Args:
+            consumer: on_chunk callback of the claiming process() call
+        """
+        with self._lock:
+            for chunk in self._chunks:
+                consumer(chunk)
+            self._chunks = []
+            self._consumer = consumer
+
+
+class _StreamState:
+    """
+    Accumulates the chunks of a streamed completion.
+    """
+
+    def __init__(self):
+        """Start timing the stream."""
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.parts = []
+        self.usage = None
+
+    def feed(self, chunk: Any) -> str:
+        """
+        Add a stream chunk.
+
+        Args:
+            chunk: ChatCompletionChunk from the API
+
+        Returns:
+            The text carried by the chunk (may be empty)
+        """
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return ""
+
+        text = chunk.choices[0].delta.content or ""
+        if text:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.parts.append(text)
+        return text
+
+    def text(self) -> str:
+        """Full response text received so far."""
+        return "".join(self.parts)
+
+    def time_to_first_token_ms(self) -> Optional[float]:
+        """Milliseconds from request start to the first text chunk."""
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started) * 1000
@@ -15,22 +15,21 @@ class CodeGenerationAgent(BaseAgent):
     Agent responsible for generating executable Python code from requirements.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache = None, clients = None, metrics = None):
         """Initialize the Code Generation Agent."""
-        super().__init__(name = "CodeGenerationAgent", api_key = api_key)
+        super().__init__(name = "CodeGenerationAgent", api_key = api_key, cache = cache,
+                         clients = clients, metrics = metrics)
 
-    def process(self, structured_requirements: Dict) -> Dict:
+    def _build_request(self, structured_requirements: Dict) -> Dict:
         """
-        Generate Python code from structured requirements.
+        Build the LLM request for generating Python code.
 
         Args:
             structured_requirements: Dictionary containing parsed requirements
 
         Returns:
-            Dictionary containing generated code and metadata
+            Keyword arguments for call_llm()
         """
-        requirements = structured_requirements.get("requirements", {})
-
         system_prompt = """You are an expert Python developer. Generate clean, executable Python code.
 Use only standard Python libraries. Include docstrings and comments.
 Return ONLY Python code, no explanations."""
@@ -56,122 +55,34 @@ Code should be well-commented and ready to execute."""
             }
         ]
 
-        # Try with error handling for safety filters
-        try:
-            response = self.call_llm(messages, system_prompt, max_tokens = 4000)
-            code = self._extract_code(response["text"])
-        except Exception as e:
-            print(f"Error generating code, using fallback: {str(e)}")
-            # Fallback: generate simpler code
-            code = self._generate_fallback_code()
-            response = {"total_tokens": 0}
-
-        return {
-            "code": code,
-            "language": "python",
-            "tokens_used": response.get("total_tokens", 0),
-            "requirements_satisfied": requirements
-        }
-
-    def _extract_code(self, text: str) -> str:
-        """
-        Extract Python code from the LLM response.
-
-        Args:
-            text: Response text that may contain code blocks
-
-        Returns:
-            Extracted Python code
-        """
-        # If there's a code block, extract it
-        if "```python" in text:
-            code_start = text.find("```python") + 9
-            code_end = text.find("```", code_start)
-            code = text[code_start:code_end].strip()
-        elif "```" in text:
-            code_start = text.find("```") + 3
-            code_end = text.find("```", code_start)
-            code = text[code_start:code_end].strip()
-        else:
-            # Assume entire response is code
-            code = text.strip()
-
-        return code
-
-
-"""
-Code Generation Agent
-Author: [Your Name] - [Student ID]
-
-This agent generates executable Python code based on structured requirements.
-It creates the Music Scale Trainer application code.
-"""
-
-from agents.base_agent import BaseAgent
-from typing import Dict
-
-
-class CodeGenerationAgent(BaseAgent):
-    """
-    Agent responsible for generating executable Python code from requirements.
-    """
-
-    def __init__(self, api_key: str):
-        """Initialize the Code Generation Agent."""
-        super().__init__(name = "CodeGenerationAgent", api_key = api_key)
+        return {"messages": messages, "system_prompt": system_prompt, "max_tokens": 4000}
 
-    def process(self, structured_requirements: Dict) -> Dict:
+    def _handle_response(self, structured_requirements: Dict, response: Dict) -> Dict:
         """
         Generate Python code from structured requirements.
 
         Args:
             structured_requirements: Dictionary containing parsed requirements
+            response: LLM response from call_llm()
 
         Returns:
             Dictionary containing generated code and metadata
         """
-        requirements = structured_requirements.get("requirements", {})
-
-        system_prompt = """You are an expert Python developer. Generate clean, executable Python code.
-Use only standard Python libraries. Include docstrings and comments.
-Return ONLY Python code, no explanations."""
-
-        # Simplified prompt to avoid safety filters
-        prompt = f"""Create a Python program for a Music Scale Trainer application.
-
-Core features needed:
-- Interactive scale exercises
-- Multiple difficulty levels  
-- Progress tracking
-- Scale identification practice
-- Real-time feedback
-
-Generate complete, runnable Python code using tkinter for GUI or simple CLI.
-Include all necessary functions and a main() function.
-Code should be well-commented and ready to execute."""
-
-        messages = [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-
-        # Try with error handling for safety filters
-        try:
-            response = self.call_llm(messages, system_prompt, max_tokens = 4000)
-            code = self._extract_code(response["text"])
-        except Exception as e:
-            print(f"Error generating code, using fallback: {str(e)}")
-            # Fallback: generate simpler code
-            code = self._generate_fallback_code()
-            response = {"total_tokens": 0}
-
         return {
-            "code": code,
+            "code": self._extract_code(response["text"]),
             "language": "python",
             "tokens_used": response.get("total_tokens", 0),
-            "requirements_satisfied": requirements
+            "requirements_satisfied": structured_requirements.get("requirements", {})
+        }
+
+    def _handle_failure(self, structured_requirements: Dict, error: Exception) -> Dict:
+        """Fall back to the built-in application when generation fails."""
+        print(f"Error generating code, using fallback: {str(error)}")
+        return {
+            "code": self._generate_fallback_code(),
+            "language": "python",
+            "tokens_used": 0,
+            "requirements_satisfied": structured_requirements.get("requirements", {})
         }
 
     def _extract_code(self, text: str) -> str:
@@ -8,6 +8,7 @@ structured specifications that the code generation agent can use.
 
 from agents.base_agent import BaseAgent
 from typing import Dict, List
+import json
 
 
 class RequirementsAgent(BaseAgent):
@@ -16,21 +17,24 @@ class RequirementsAgent(BaseAgent):
     Takes natural language input and outputs structured requirements.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache=None, clients=None, metrics=None):
         """Initialize the Requirements Agent."""
-        super().__init__(name="RequirementsAgent", api_key=api_key)
+        super().__init__(name="RequirementsAgent", api_key=api_key, cache=cache, clients=clients,
+                         metrics=metrics)
 
-    def process(self, requirements_text: str) -> Dict:
+    def _build_request(self, requirements_text: str) -> Dict:
         """
-        Parse natural language requirements into structured format.
+        Build the LLM request for parsing requirements.
 
         Args:
             requirements_text: Natural language description of requirements
 
         Returns:
-            Dictionary containing structured requirements
+            Keyword arguments for call_llm()
         """
-        system_prompt = """You are a requirements analysis expert. 
+        # Static instructions first and the requirements text last, so every
+        # call shares the same prompt prefix
+        system_prompt = """You are a requirements analysis expert.
 Parse software requirements into structured format.
 Return ONLY a JSON object with these keys:
 - core_features: list of main functionalities
@@ -38,72 +42,95 @@ Return ONLY a JSON object with these keys:
 - data_requirements: list of data to store/track
 - technical_constraints: list of constraints
 
-Return valid JSON only, no other text."""
+Return valid JSON only, no other text.
+The user message contains the requirements to parse."""
 
         messages = [
             {
                 "role": "user",
-                "content": f"Parse these requirements into JSON:\n\n{requirements_text}"
+                "content": requirements_text
             }
         ]
 
-        try:
-            response = self.call_llm(messages, system_prompt, max_tokens=2000)
-
-            # Parse JSON from response
-            text = response["text"]
-
-            # Try to extract JSON
-            import json
-
-            # Find JSON block
-            if "```json" in text:
-                json_start = text.find("```json") + 7
-                json_end = text.find("```", json_start)
-                json_text = text[json_start:json_end].strip()
-            elif "{" in text and "}" in text:
-                json_start = text.find("{")
-                json_end = text.rfind("}") + 1
-                json_text = text[json_start:json_end]
-            else:
-                json_text = text
-
-            structured_requirements = json.loads(json_text)
-
-            return {
-                "requirements": structured_requirements,
-                "raw_text": requirements_text,
-                "tokens_used": response["total_tokens"]
-            }
+        return {"messages": messages, "system_prompt": system_prompt, "max_tokens": 2000}
 
-        except Exception as e:
-            print(f"Error parsing requirements: {str(e)}")
-            # Return fallback structure
-            return {
-                "requirements": {
-                    "core_features": [
-                        "Interactive scale exercises",
-                        "Multiple difficulty levels",
-                        "Real-time feedback",
-                        "Progress tracking",
-                        "Educational resources"
-                    ],
-                    "user_interactions": [
-                        "Identify scales",
-                        "Practice scales",
-                        "View progress",
-                        "Access scale information"
-                    ],
-                    "data_requirements": [
-                        "Scale definitions",
-                        "User scores",
-                        "Practice history"
-                    ],
-                    "technical_constraints": [
-                        "Python standard library only",
-                        "Simple text-based or GUI interface"
-                    ]
-                },
-                "raw_text": requirements_text,
-                "tokens_used": 0
-            }
+    def _handle_response(self, requirements_text: str, response: Dict) -> Dict:
+        """
+        Parse natural language requirements into structured format.
+
+        Args:
+            requirements_text: Natural language description of requirements
+            response: LLM response from call_llm()
+
+        Returns:
+            Dictionary containing structured requirements
+        """
+        # Parse JSON from response
+        text = response["text"]
+
+        # Find JSON block
+        if "```json" in text:
+            json_start = text.find("```json") + 7
+            json_end = text.find("```", json_start)
+            json_text = text[json_start:json_end].strip()
+        elif "{" in text and "}" in text:
+            json_start = text.find("{")
+            json_end = text.rfind("}") + 1
+            json_text = text[json_start:json_end]
+        else:
+            json_text = text
+
+        structured_requirements = json.loads(json_text)
+
+        return {
+            "requirements": structured_requirements,
+            "raw_text": requirements_text,
+            "tokens_used": response["total_tokens"]
+        }
+
+    def _handle_failure(self, requirements_text: str, error: Exception) -> Dict:
+        """Return the fallback structure when parsing fails."""
+        print(f"Error parsing requirements: {str(error)}")
+        return self.default_requirements(requirements_text)
+
+    def default_requirements(self, requirements_text: str = "") -> Dict:
+        """
+        Get the default MST requirements profile.
+
+        Used as the fallback when parsing fails and as the predicted profile
+        for speculative code generation before any requirements were parsed.
+
+        Args:
+            requirements_text: Natural language description of requirements
+
+        Returns:
+            Structured requirements in the same format as process()
+        """
+        return {
+            "requirements": {
+                "core_features": [
+                    "Interactive scale exercises",
+                    "Multiple difficulty levels",
+                    "Real-time feedback",
+                    "Progress tracking",
+                    "Educational resources"
+                ],
+                "user_interactions": [
+                    "Identify scales",
+                    "Practice scales",
+                    "View progress",
+                    "Access scale information"
+                ],
+                "data_requirements": [
+                    "Scale definitions",
+                    "User scores",
+                    "Practice history"
+                ],
+                "technical_constraints": [
+                    "Python standard library only",
+                    "Simple text-based or GUI interface"
+                ]
+            },
+            "raw_text": requirements_text,
+            "tokens_used": 0
+        }
@@ -15,22 +15,25 @@ class TestGenerationAgent(BaseAgent):
     Agent responsible for generating test cases for generated code.
     """
 
-    def __init__(self, api_key: str):
+    # The test prompt does not include the generated code, so the
+    # orchestrator can generate tests alongside the code
+    uses_generated_code = False
+
+    def __init__(self, api_key: str, cache=None, clients=None, metrics=None):
         """Initialize the Test Generation Agent."""
-        super().__init__(name="TestGenerationAgent", api_key=api_key)
+        super().__init__(name="TestGenerationAgent", api_key=api_key, cache=cache, clients=clients,
+                         metrics=metrics)
 
-    def process(self, code_and_requirements: tuple) -> Dict:
+    def _build_request(self, code_and_requirements: tuple) -> Dict:
         """
-        Generate test cases for the given code.
+        Build the LLM request for generating test cases.
 
         Args:
-            code_and_requirements: Tuple of (generated_code, requirements)
+            code_and_requirements: Tuple of (generated_code or None, requirements)
 
         Returns:
-            Dictionary containing test code and metadata
+            Keyword arguments for call_llm()
         """
-        generated_code, requirements = code_and_requirements
-
         system_prompt = """You are an expert in Python testing with pytest.
 Generate comprehensive test cases. Return ONLY test code, no explanations."""
 
@@ -53,22 +56,36 @@ Generate complete, runnable test code using pytest."""
             }
         ]
 
-        # Try with error handling
-        try:
-            response = self.call_llm(messages, system_prompt, max_tokens=4000)
-            test_code = self._extract_code(response["text"])
-        except Exception as e:
-            print(f"Error generating tests, using fallback: {str(e)}")
-            test_code = self._generate_fallback_tests()
-            response = {"total_tokens": 0}
+        return {"messages": messages, "system_prompt": system_prompt, "max_tokens": 4000}
+
+    def _handle_response(self, code_and_requirements: tuple, response: Dict) -> Dict:
+        """
+        Generate test cases for the given code.
+
+        Args:
+            code_and_requirements: Tuple of (generated_code or None, requirements)
+            response: LLM response from call_llm()
 
+        Returns:
+            Dictionary containing test code and metadata
+        """
         return {
-            "test_code": test_code,
+            "test_code": self._extract_code(response["text"]),
             "framework": "pytest",
             "tokens_used": response.get("total_tokens", 0),
             "expected_test_count": 10
         }
 
+    def _handle_failure(self, code_and_requirements: tuple, error: Exception) -> Dict:
+        """Fall back to the built-in test suite when generation fails."""
+        print(f"Error generating tests, using fallback: {str(error)}")
+        return {
+            "test_code": self._generate_fallback_tests(),
+            "framework": "pytest",
+            "tokens_used": 0,
+            "expected_test_count": 10
+        }
+
     def _extract_code(self, text: str) -> str:
         """Extract Python test code from the LLM response."""
         if "```python" in text:
@@ -0,0 +1,198 @@
+"""
+Batch Workflow Runner
+Author: [Your Name] - [Student ID]
+
+Runs the multi-agent workflow over many requirement documents using a
+worker pool. Each job writes its artifacts to its own output directory and
+progress is streamed to a results JSONL file.
+"""
+
+from orchestrator import Orchestrator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+import asyncio
+import json
+import os
+import threading
+import time
+
+
+def load_jobs(source: str) -> List[Dict]:
+    """
+    Load requirement documents for a batch run.
+
+    Args:
+        source: A .jsonl file (one object per line with "requirements" or
+            "text", and an optional "id"), or a directory of .txt/.md files
+
+    Returns:
+        List of jobs with "id" and "requirements" keys
+    """
+    jobs = []
+
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in (".txt", ".md"):
+                continue
+            with open(os.path.join(source, name), "r", encoding = "utf-8") as f:
+                jobs.append({"id": stem, "requirements": f.read()})
+        return jobs
+
+    with open(source, "r", encoding = "utf-8") as f:
+        for line_number, line in enumerate(f, start = 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            requirements = record.get("requirements") or record.get("text")
+            if not requirements:
+                raise ValueError(f"{source}:{line_number}: missing 'requirements' or 'text'")
+            jobs.append({
+                "id": str(record.get("id", f"job-{line_number:05d}")),
+                "requirements": requirements
+            })
+    return jobs
+
+
+class BatchRunner:
+    """
+    Fans requirement documents out to a pool of workflow workers.
+    """
+
+    def __init__(self, api_key: str, output_dir: str = "batch_output", workers: int = 4,
+                 mode: str = "thread", results_path: str = None, speculate: bool = True):
+        """
+        Initialize the batch runner.
+
+        Args:
+            api_key: OpenAI API key for the agents
+            output_dir: Root directory; each job gets a subdirectory
+            workers: Number of workflows running at once
+            mode: "thread" (worker threads) or "async" (tasks on one event loop)
+            results_path: Results JSONL file (defaults to <output_dir>/results.jsonl)
+            speculate: Let each workflow speculate on its requirements (see Orchestrator)
+        """
+        if mode not in ("thread", "async"):
+            raise ValueError(f"Unknown batch mode: {mode}")
+
+        self.api_key = api_key
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.results_path = results_path or os.path.join(output_dir, "results.jsonl")
+        self.speculate = speculate
+
+        self._results_lock = threading.Lock()
+        self._completed = 0
+        self._total = 0
+
+    def run(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Run all jobs and stream their results.
+
+        Args:
+            jobs: Jobs from load_jobs()
+
+        Returns:
+            List of per-job result records
+        """
+        os.makedirs(self.output_dir, exist_ok = True)
+        self._completed = 0
+        self._total = len(jobs)
+
+        print(f"[Batch] Running {len(jobs)} jobs with {self.workers} {self.mode} workers")
+        started = time.perf_counter()
+
+        with open(self.results_path, "a", encoding = "utf-8") as results_file:
+            if self.mode == "async":
+                results = asyncio.run(self._run_async(jobs, results_file))
+            else:
+                results = self._run_threads(jobs, results_file)
+
+        elapsed = time.perf_counter() - started
+        succeeded = sum(1 for r in results if r["status"] == "ok")
+        print(f"[Batch] Finished {succeeded}/{len(jobs)} jobs in {elapsed:.1f}s "
+              f"({len(jobs) / elapsed if elapsed > 0 else 0:.2f} jobs/s)")
+        print(f"[Batch] Results: {self.results_path}")
+        return results
+
+    def _run_threads(self, jobs: List[Dict], results_file) -> List[Dict]:
+        """Run jobs on a thread pool."""
+        results = []
+        with ThreadPoolExecutor(max_workers = self.workers) as executor:
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                results.append(self._record(future.result(), results_file))
+        return results
+
+    async def _run_async(self, jobs: List[Dict], results_file) -> List[Dict]:
+        """Run jobs as tasks on one event loop, at most `workers` at a time."""
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def run_one(job):
+            async with semaphore:
+                return self._record(await self._arun_job(job), results_file)
+
+        return list(await asyncio.gather(*(run_one(job) for job in jobs)))
+
+    def _run_job(self, job: Dict) -> Dict:
+        """Run one workflow synchronously."""
+        orchestrator, job_dir = self._make_orchestrator(job)
+        started = time.perf_counter()
+        try:
+            result = orchestrator.run_workflow(job["requirements"])
+            return self._job_record(job, job_dir, started, result = result)
+        except Exception as e:
+            return self._job_record(job, job_dir, started, error = e)
+
+    async def _arun_job(self, job: Dict) -> Dict:
+        """Run one workflow on the event loop."""
+        orchestrator, job_dir = self._make_orchestrator(job)
+        started = time.perf_counter()
+        try:
+            result = await orchestrator.arun_workflow(job["requirements"])
+            return self._job_record(job, job_dir, started, result = result)
+        except Exception as e:
+            return self._job_record(job, job_dir, started, error = e)
+
+    def _make_orchestrator(self, job: Dict):
+        """Create an orchestrator writing into the job's own directory."""
+        job_dir = os.path.join(self.output_dir, _safe_name(job["id"]))
+        orchestrator = Orchestrator(self.api_key, output_dir = job_dir, reports_dir = job_dir,
+                                    speculate = self.speculate)
+        return orchestrator, job_dir
+
+    def _job_record(self, job: Dict, job_dir: str, started: float,
+                    result: Dict = None, error: Exception = None) -> Dict:
+        """Build the results JSONL record for a finished job."""
+        record = {
+            "job_id": job["id"],
+            "status": "ok" if error is None else "error",
+            "latency_s": round(time.perf_counter() - started, 3),
+            "tokens": 0,
+            "api_calls": 0,
+            "output_dir": job_dir
+        }
+        if result is not None:
+            for model_stats in result["usage_stats"].values():
+                record["tokens"] += model_stats.get("totalTokens", 0)
+                record["api_calls"] += model_stats.get("numApiCalls", 0)
+        if error is not None:
+            record["error"] = str(error)
+        return record
+
+    def _record(self, record: Dict, results_file) -> Dict:
+        """Append a job record to the results file and report progress."""
+        with self._results_lock:
+            results_file.write(json.dumps(record) + "\n")
+            results_file.flush()
+            self._completed += 1
+            print(f"[Batch] {self._completed}/{self._total} {record['job_id']}: "
+                  f"{record['status']} in {record['latency_s']:.1f}s, {record['tokens']} tokens")
+        return record
+
+
+def _safe_name(job_id: str) -> str:
+    """Make a job ID safe to use as a directory name."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in job_id) or "job"
@@ -0,0 +1,7 @@
+"""
+Benchmark Suite
+Author: [Your Name] - [Student ID]
+
+End-to-end benchmarks for the multi-agent workflow, run against the offline
+mock LLM backend. See benchmarks/runner.py.
+"""
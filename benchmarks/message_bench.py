@@ -0,0 +1,122 @@
+"""
+MCPMessage Microbenchmark
+Author: [Your Name] - [Student ID]
+
+Compares the slotted MCPMessage against the original dict-backed version
+(UUID4 string IDs, ISO timestamp formatted in the constructor):
+  - messages created per second
+  - to_dict() conversions per second
+  - bytes allocated per message
+
+Usage:
+    python -m benchmarks.message_bench
+    python -m benchmarks.message_bench --count 500000
+"""
+
+from typing import Any, Callable, Dict
+from datetime import datetime
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from infra.mcp_bus import MCPMessage
+
+
+class LegacyMCPMessage:
+    """The MCPMessage implementation before it was slotted, kept for comparison."""
+
+    def __init__(self, sender: str, receiver: str, message_type: str,
+                 payload: Any, message_id: str = None):
+        self.sender = sender
+        self.receiver = receiver
+        self.message_type = message_type
+        self.payload = payload
+        self.message_id = message_id or self._generate_id()
+        self.timestamp = datetime.now().isoformat()
+
+    def _generate_id(self) -> str:
+        import uuid
+        return str(uuid.uuid4())
+
+    def to_dict(self) -> Dict:
+        return {
+            "sender": self.sender,
+            "receiver": self.receiver,
+            "message_type": self.message_type,
+            "payload": self.payload,
+            "message_id": self.message_id,
+            "timestamp": self.timestamp
+        }
+
+
+def bench_class(cls: Callable, count: int) -> Dict[str, float]:
+    """
+    Measure one message class.
+
+    Args:
+        cls: Message class to construct
+        count: Messages per measurement
+
+    Returns:
+        create_per_s, to_dict_per_s and bytes_per_message
+    """
+    payload = {"delta": "x"}
+
+    gc.collect()
+    started = time.perf_counter()
+    messages = [cls("Bench", "Echo", "process_response", payload) for _ in range(count)]
+    create_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in messages:
+        message.to_dict()
+    to_dict_s = time.perf_counter() - started
+    del messages
+
+    sample = min(count, 10000)
+    gc.collect()
+    tracemalloc.start()
+    kept = [cls("Bench", "Echo", "process_response", payload) for _ in range(sample)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return {
+        "create_per_s": count / create_s,
+        "to_dict_per_s": count / to_dict_s,
+        "bytes_per_message": allocated / sample
+    }
+
+
+def main():
+    """Run the microbenchmark and print before/after results."""
+    parser = argparse.ArgumentParser(description = "MCPMessage microbenchmark")
+    parser.add_argument("--count", type = int, default = 200000,
+                        help = "messages per measurement (default: 200000)")
+    args = parser.parse_args()
+
+    results = {
+        "legacy": bench_class(LegacyMCPMessage, args.count),
+        "slotted": bench_class(MCPMessage, args.count)
+    }
+    results["speedup"] = {
+        name: (results["slotted"][name] / results["legacy"][name]
+               if name != "bytes_per_message"
+               else results["legacy"][name] / results["slotted"][name])
+        for name in results["legacy"]
+    }
+
+    print(json.dumps({group: {name: round(value, 2) for name, value in values.items()}
+                      for group, values in results.items()}, indent = 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Workflow Benchmark Runner
+Author: [Your Name] - [Student ID]
+
+Measures the workflow against the in-process mock LLM so results reflect
+orchestration overhead rather than network noise:
+  - cold and warm workflow latency
+  - per-stage time (requirements, code, save, tests, test run)
+  - MCP bus overhead per message
+  - memory high-water mark
+  - throughput at several concurrency levels
+
+Results are written as JSON and compared against a stored baseline; the
+run fails when a metric regresses by more than the threshold. Absolute
+timings depend on the machine, so by default only ratios measured within
+one run are compared (traced vs untraced bus cost, N-worker vs 1-worker
+throughput). Absolute metrics are only worth comparing against a baseline
+recorded on the same host, e.g. one CI regenerates from the base commit.
+
+Usage:
+    python -m benchmarks.runner
+    python -m benchmarks.runner --update-baseline
+    python -m benchmarks.runner --absolute --baseline same_host.json
+"""
+
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from infra.http_pool import ClientRegistry
+from infra.mcp_bus import MCPBus, MCPMessage
+from infra.mock_llm import FakeLLMConfig
+from orchestrator import Orchestrator
+from run_tests import run_suite
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Absolute changes below these are treated as noise, whatever the ratio
+NOISE_FLOORS = {"_s": 0.01, "_us": 5.0, "_mb": 1.0}
+
+# Metrics where a lower value is a regression; all others are lower-is-better
+HIGHER_IS_BETTER = ("_per_s", "_speedup")
+
+REQUIREMENTS = """MST (Music Scale Trainer) is a software application designed to help musicians
+practice and improve their knowledge of musical scales, with difficulty levels, real-time
+feedback and progress tracking."""
+
+
+class _EchoAgent:
+    """Agent that returns its payload, used to isolate bus overhead."""
+
+    def process(self, payload):
+        return payload
+
+
+class WorkflowBenchmark:
+    """
+    Runs the benchmark scenarios in a scratch working directory.
+    """
+
+    def __init__(self, latency_s: float = 0.05, tokens_per_second: float = 20000,
+                 concurrency: List[int] = None, throughput_jobs: int = 8,
+                 bus_messages: int = 2000):
+        """
+        Initialize the benchmark.
+
+        Args:
+            latency_s: Mock time to first token for every LLM call
+            tokens_per_second: Mock generation speed
+            concurrency: Worker counts for the throughput scenario
+            throughput_jobs: Workflows per throughput measurement
+            bus_messages: Messages sent in the bus overhead scenario
+        """
+        self.fake_config = FakeLLMConfig(latency_s = latency_s,
+                                         tokens_per_second = tokens_per_second)
+        self.concurrency = concurrency or [1, 2, 4, 8]
+        self.throughput_jobs = throughput_jobs
+        self.bus_messages = bus_messages
+
+    def run(self) -> Dict[str, float]:
+        """
+        Run every scenario.
+
+        Returns:
+            Flat dictionary of metric name to value
+        """
+        metrics = {}
+        original_dir = os.getcwd()
+        with tempfile.TemporaryDirectory(prefix = "mst-bench-") as workdir:
+            os.chdir(workdir)
+            try:
+                metrics.update(self.bench_workflow())
+                metrics.update(self.bench_bus())
+                metrics.update(self.bench_throughput())
+            finally:
+                os.chdir(original_dir)
+        metrics.update(self.ratios(metrics))
+        return metrics
+
+    def ratios(self, metrics: Dict[str, float]) -> Dict[str, float]:
+        """
+        Machine-independent ratios of metrics measured in the same run.
+
+        Args:
+            metrics: Absolute results of run()
+
+        Returns:
+            Dictionary of "ratio." metrics
+        """
+        ratios = {
+            "ratio.bus_traced_overhead": (metrics["bus.per_message_traced_us"] /
+                                          metrics["bus.per_message_us"])
+        }
+        single = metrics.get("throughput.workers_1_per_s")
+        for workers in self.concurrency:
+            if workers > 1 and single:
+                ratios[f"ratio.workers_{workers}_speedup"] = (
+                    metrics[f"throughput.workers_{workers}_per_s"] / single)
+        return ratios
+
+    def bench_workflow(self) -> Dict[str, float]:
+        """Cold/warm latency, per-stage timings and memory high-water mark."""
+        orchestrator = self._orchestrator(enable_cache = True)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with _quiet():
+            cold = orchestrator.run_workflow(REQUIREMENTS)
+        cold_s = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        with _quiet():
+            orchestrator.run_workflow(REQUIREMENTS)
+        warm_s = time.perf_counter() - started
+
+        metrics = {
+            "workflow.cold_s": cold_s,
+            "workflow.warm_s": warm_s,
+            "memory.peak_mb": peak / (1024 * 1024),
+            "stage.test_run_s": self._time_test_run(orchestrator.output_dir)
+        }
+        for name, stage in cold["stage_report"]["stages"].items():
+            metrics[f"stage.{name}_s"] = stage["duration_s"]
+        return metrics
+
+    def bench_bus(self) -> Dict[str, float]:
+        """Round-trip cost of one request/response pair through MCPBus."""
+        metrics = {}
+        for traced in (False, True):
+            with _quiet():
+                bus = MCPBus()
+                bus.register_agent("Echo", _EchoAgent())
+                if traced:
+                    bus.enable_tracing()
+                started = time.perf_counter()
+                for i in range(self.bus_messages):
+                    bus.send_message(MCPMessage("Bench", "Echo", "process_request", i))
+                elapsed = time.perf_counter() - started
+            name = "bus.per_message_traced_us" if traced else "bus.per_message_us"
+            metrics[name] = elapsed / self.bus_messages * 1e6
+        return metrics
+
+    def bench_throughput(self) -> Dict[str, float]:
+        """Completed workflows per second at each concurrency level."""
+        metrics = {}
+        for workers in self.concurrency:
+            orchestrators = [self._orchestrator(enable_cache = False, job = i)
+                             for i in range(self.throughput_jobs)]
+            started = time.perf_counter()
+            with _quiet(), ThreadPoolExecutor(max_workers = workers) as executor:
+                list(executor.map(lambda o: o.run_workflow(REQUIREMENTS), orchestrators))
+            elapsed = time.perf_counter() - started
+            metrics[f"throughput.workers_{workers}_per_s"] = self.throughput_jobs / elapsed
+        return metrics
+
+    def _orchestrator(self, enable_cache: bool, job: int = None) -> Orchestrator:
+        """Create an orchestrator on a fresh mock backend."""
+        output_dir = "generated" if job is None else os.path.join("jobs", str(job))
+        clients = ClientRegistry(backend = "fake", fake_config = self.fake_config)
+        with _quiet():
+            return Orchestrator("bench-key", enable_cache = enable_cache, clients = clients,
+                                output_dir = output_dir, reports_dir = output_dir)
+
+    def _time_test_run(self, output_dir: str) -> float:
+        """Time a run of the generated tests through the test runner."""
+        started = time.perf_counter()
+        run_suite([output_dir])
+        return time.perf_counter() - started
+
+
+def compare_to_baseline(metrics: Dict[str, float], baseline: Dict[str, float],
+                        threshold: float, absolute: bool = False) -> List[str]:
+    """
+    Find metrics that regressed beyond the threshold.
+
+    Throughput and speedup metrics are higher-is-better; everything else is
+    lower-is-better.
+
+    Args:
+        metrics: Current results
+        baseline: Stored baseline results
+        threshold: Allowed relative regression (0.25 = 25%)
+        absolute: Also compare absolute timings, memory and throughput (only
+            meaningful against a baseline recorded on the same host)
+
+    Returns:
+        Human-readable descriptions of each regression
+    """
+    regressions = []
+    for name, base in baseline.items():
+        if name not in metrics or not base:
+            continue
+        if not absolute and not name.startswith("ratio."):
+            continue
+        current = metrics[name]
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (base - current) / base
+        else:
+            change = (current - base) / base
+            floor = next((v for suffix, v in NOISE_FLOORS.items() if name.endswith(suffix)), 0.0)
+            if current - base < floor:
+                continue
+        if change > threshold:
+            regressions.append(f"{name}: {current:.4f} vs baseline {base:.4f} "
+                               f"({change * 100:+.1f}% worse)")
+    return regressions
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence workflow progress output while measuring."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def main():
+    """Run the benchmarks and compare against the baseline."""
+    parser = argparse.ArgumentParser(description = "Workflow benchmark suite")
+    parser.add_argument("--baseline", default = DEFAULT_BASELINE,
+                        help = "baseline JSON file to compare against")
+    parser.add_argument("--output", default = None, help = "write results JSON here")
+    parser.add_argument("--threshold", type = float, default = 0.25,
+                        help = "allowed relative regression (default: 0.25)")
+    parser.add_argument("--update-baseline", action = "store_true",
+                        help = "store these results as the new baseline")
+    parser.add_argument("--absolute", action = "store_true",
+                        help = "also compare absolute metrics (baseline from the same host)")
+    parser.add_argument("--latency", type = float, default = 0.05,
+                        help = "mock LLM time to first token in seconds (default: 0.05)")
+    parser.add_argument("--concurrency", default = "1,2,4,8",
+                        help = "comma-separated worker counts (default: 1,2,4,8)")
+    args = parser.parse_args()
+
+    benchmark = WorkflowBenchmark(
+        latency_s = args.latency,
+        concurrency = [int(n) for n in args.concurrency.split(",") if n]
+    )
+    metrics = {name: round(value, 6) for name, value in benchmark.run().items()}
+
+    print(json.dumps(metrics, indent = 2, sort_keys = True))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(metrics, f, indent = 2, sort_keys = True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(metrics, f, indent = 2, sort_keys = True)
+        print(f"\n[Benchmarks] Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n[Benchmarks] No baseline at {args.baseline}; run with --update-baseline")
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(metrics, baseline, args.threshold, args.absolute)
+    if regressions:
+        print("\n[Benchmarks] REGRESSIONS:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n[Benchmarks] No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
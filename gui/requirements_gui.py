@@ -28,6 +28,7 @@ def launch_gui(orchestrator):
             self.orchestrator = orchestrator
             self.master.title("Music Scale Trainer - AI Code Generator")
             self.master.geometry("1000x700")
+            self._stream_sections = set()
 
             self.create_widgets()
             self.load_default_requirements()
@@ -149,7 +150,7 @@ def launch_gui(orchestrator):
             # Disable button during generation
             self.generate_btn.config(state = tk.DISABLED)
             self.progress.start()
-            self.status_label.config(text = "Generating code... This may take 1-2 minutes")
+            self.status_label.config(text = "Generating code... Output streams below as it arrives")
 
             # Run in thread
             thread = threading.Thread(
@@ -164,9 +165,13 @@ def launch_gui(orchestrator):
                 # Clear output
                 self.output_text.delete("1.0", tk.END)
                 self.log_output("Starting multi-agent workflow...\n")
+                self._stream_sections = set()
 
-                # Run workflow
-                result = self.orchestrator.run_workflow(requirements)
+                # Run workflow, rendering agent output as it streams in
+                result = self.orchestrator.run_workflow(
+                    requirements,
+                    on_partial = self._on_partial
+                )
 
                 # Display results
                 self.log_output("\n" + "=" * 60 + "\n")
@@ -198,6 +203,32 @@ def launch_gui(orchestrator):
                 self.log_output(f"\n❌ ERROR: {str(e)}\n")
                 self.master.after(0, self._generation_complete)
 
+        def _on_partial(self, message):
+            """Render a partial (streamed) agent response in the output pane."""
+            agent_name = message.sender
+            delta = message.payload["delta"]
+            self.master.after(0, lambda: self._append_stream(agent_name, delta))
+
+        def _append_stream(self, agent_name, delta):
+            """
+            Append streamed text to the agent's own section of the output pane.
+
+            Agents stream concurrently, so each one gets a section header the
+            first time it sends text and a mark that tracks the end of its
+            section; later chunks are inserted at that mark instead of at the
+            end of the pane, keeping the sections from interleaving.
+            """
+            mark = f"stream-{agent_name}"
+            if agent_name not in self._stream_sections:
+                self._stream_sections.add(agent_name)
+                # The trailing newline keeps text appended at END out of the section
+                self.output_text.insert(tk.END, f"\n--- {agent_name} ---\n\n")
+                self.output_text.mark_set(mark, "end-2c")
+                self.output_text.mark_gravity(mark, tk.RIGHT)
+            self.output_text.insert(mark, delta)
+            self.output_text.see(mark)
+            self.status_label.config(text = f"Streaming output from {agent_name}...")
+
         def log_output(self, text):
             """Thread-safe output logging."""
             self.master.after(0, lambda: self.output_text.insert(tk.END, text))
@@ -212,6 +243,7 @@ def launch_gui(orchestrator):
         def clear_output(self):
             """Clear the output text area."""
             self.output_text.delete("1.0", tk.END)
+            self._stream_sections = set()
             self.status_label.config(text = "Output cleared. Ready to generate.")
 
 
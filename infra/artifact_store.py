@@ -0,0 +1,315 @@
+"""
+Artifact Store
+Author: [Your Name] - [Student ID]
+
+Per-run, content-addressed storage for generated artifacts, so concurrent
+workflows never overwrite each other's files. Layout under the root:
+
+    blobs/<ab>/<sha256>      one read-only copy of each distinct content
+    runs/<run-id>/<file>     hard links to the blobs of that run
+    runs/<run-id>/.active    marker (holding the owner's PID) while the run is in progress
+    latest -> runs/<run-id>  symlink to the newest finished run
+    .lock                    serializes put() and gc() across processes
+
+Identical files in different runs share one blob. The latest symlink is
+replaced atomically, and gc() deletes the oldest finished runs (and the
+blobs only they used) until the store fits its size budget. Several
+processes can share one store.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+from contextlib import contextmanager
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+
+# Marker file of a run that is still being written
+_ACTIVE = ".active"
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of per-run artifact directories.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the store.
+
+        Args:
+            root: Store directory
+            max_bytes: Size budget enforced by gc()
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(root, "blobs")
+        self.runs_dir = os.path.join(root, "runs")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.blobs_written = 0
+        self.blobs_deduplicated = 0
+
+    def run_dir(self, run_id: str) -> str:
+        """Directory holding a run's artifacts."""
+        if os.sep in run_id or (os.altsep and os.altsep in run_id) or run_id.startswith("."):
+            raise ValueError(f"Invalid run ID: {run_id}")
+        return os.path.join(self.runs_dir, run_id)
+
+    def begin_run(self, run_id: str):
+        """
+        Mark a run as in progress so gc() in any process leaves it alone.
+
+        Args:
+            run_id: Run about to store artifacts
+        """
+        run_dir = self.run_dir(run_id)
+        with self._locked():
+            os.makedirs(run_dir, exist_ok = True)
+            with open(os.path.join(run_dir, _ACTIVE), "w", encoding = "utf-8") as f:
+                f.write(str(os.getpid()))
+
+    def end_run(self, run_id: str):
+        """
+        Mark a run as finished, making it eligible for gc().
+
+        Args:
+            run_id: Run passed to begin_run()
+        """
+        try:
+            os.remove(os.path.join(self.run_dir(run_id), _ACTIVE))
+        except FileNotFoundError:
+            pass
+
+    def put(self, run_id: str, filename: str, content: str) -> Dict[str, Any]:
+        """
+        Store an artifact for a run.
+
+        Args:
+            run_id: Run the artifact belongs to
+            filename: File name inside the run's directory
+            content: Text content (stored as UTF-8)
+
+        Returns:
+            Dictionary with path, sha256, bytes and deduplicated (True when
+            the content was already in the store)
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+
+        path = os.path.join(self.run_dir(run_id), filename)
+
+        # Under the lock, so gc() can't sweep the blob before it is linked
+        with self._locked():
+            deduplicated = os.path.exists(blob)
+            if deduplicated:
+                self.blobs_deduplicated += 1
+            else:
+                self._write_blob(blob, data)
+                self.blobs_written += 1
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            self._link(blob, path)
+
+        return {
+            "path": path,
+            "sha256": digest,
+            "bytes": len(data),
+            "deduplicated": deduplicated
+        }
+
+    def set_latest(self, run_id: str):
+        """
+        Atomically point the latest symlink at a run.
+
+        Args:
+            run_id: Run to mark as latest
+        """
+        target = os.path.relpath(self.run_dir(run_id), self.root)
+        tmp_link = os.path.join(self.root, f".latest.{uuid.uuid4().hex}")
+        os.symlink(target, tmp_link)
+        try:
+            os.replace(tmp_link, os.path.join(self.root, "latest"))
+        except BaseException:
+            os.remove(tmp_link)
+            raise
+
+    def latest(self) -> Optional[str]:
+        """Get the run ID the latest symlink points at, if any."""
+        try:
+            return os.path.basename(os.readlink(os.path.join(self.root, "latest")))
+        except OSError:
+            return None
+
+    def list_runs(self) -> List[str]:
+        """Get stored run IDs, oldest first."""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        return sorted(os.listdir(self.runs_dir))
+
+    def gc(self, protect: Iterable[str] = (), max_bytes: int = None) -> Dict[str, Any]:
+        """
+        Delete the oldest runs until the store fits the size budget.
+
+        The latest run, protected runs and runs still in progress in any
+        process (see begin_run()) are never deleted. Blobs no run links to
+        are only swept when the store is over budget.
+
+        Args:
+            protect: Run IDs to keep
+            max_bytes: Budget (defaults to the store's)
+
+        Returns:
+            Dictionary with removed_runs, freed_bytes and total_bytes
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        keep = set(protect)
+        latest = self.latest()
+        if latest is not None:
+            keep.add(latest)
+
+        freed = 0
+        removed = []
+        with self._locked():
+            total = self._stored_bytes()
+            if total > budget:
+                self._sweep_blobs()
+                remaining = self._stored_bytes()
+                freed, total = total - remaining, remaining
+            for run_id in self.list_runs():
+                if total <= budget:
+                    break
+                if run_id in keep or self._in_progress(run_id):
+                    continue
+                shutil.rmtree(self.run_dir(run_id), ignore_errors = True)
+                removed.append(run_id)
+                self._sweep_blobs()
+                remaining = self._stored_bytes()
+                freed += total - remaining
+                total = remaining
+
+        return {"removed_runs": removed, "freed_bytes": freed, "total_bytes": total}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get store statistics."""
+        with self._locked():
+            return {
+                "runs": len(self.list_runs()),
+                "blobsWritten": self.blobs_written,
+                "blobsDeduplicated": self.blobs_deduplicated
+            }
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store lock: a thread lock plus an flock on <root>/.lock."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok = True)
+            with open(os.path.join(self.root, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _in_progress(self, run_id: str) -> bool:
+        """Check for an in-progress marker whose owning process is still alive."""
+        try:
+            with open(os.path.join(self.run_dir(run_id), _ACTIVE), encoding = "utf-8") as f:
+                pid = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            return True  # unreadable marker: assume the run is still being written
+        if pid <= 0:
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False  # the owner exited without finishing the run
+        except OSError:
+            pass  # exists but belongs to another user
+        return True
+
+    def _blob_path(self, digest: str) -> str:
+        """Location of a blob."""
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _write_blob(self, blob: str, data: bytes):
+        """Atomically create a read-only blob."""
+        directory = os.path.dirname(blob)
+        os.makedirs(directory, exist_ok = True)
+        fd, tmp_path = tempfile.mkstemp(dir = directory, prefix = ".", suffix = ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Runs share the blob through hard links; editing one must not change the others
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, blob)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _link(self, blob: str, path: str):
+        """Atomically make path a hard link to the blob (a copy where links fail)."""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                os.link(blob, tmp_path)
+            except OSError:
+                # E.g. a file system without hard links
+                shutil.copy2(blob, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _files(self, directory: str):
+        """Yield (path, stat) for the files one level of subdirectories below directory."""
+        if not os.path.isdir(directory):
+            return
+        for sub in os.listdir(directory):
+            sub_dir = os.path.join(directory, sub)
+            if not os.path.isdir(sub_dir):
+                continue
+            for name in os.listdir(sub_dir):
+                if name.startswith("."):
+                    continue  # being written, or a marker
+                path = os.path.join(sub_dir, name)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    def _stored_bytes(self) -> int:
+        """
+        Bytes used by the store (lock held).
+
+        Linked run files share their blob's bytes; run files that are copies
+        (no hard links on the file system) take their own space.
+        """
+        total = sum(st.st_size for _, st in self._files(self.blob_dir))
+        total += sum(st.st_size for _, st in self._files(self.runs_dir) if st.st_nlink <= 1)
+        return total
+
+    def _sweep_blobs(self):
+        """Delete blobs no run links to (lock held)."""
+        for blob, st in self._files(self.blob_dir):
+            if st.st_nlink <= 1:
+                try:
+                    os.remove(blob)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,139 @@
+"""
+Artifact Writer
+Author: [Your Name] - [Student ID]
+
+Writes generated files (code, tests) atomically and only when their content
+changed. New content is written to a temporary file in the target directory
+and renamed over the old file, so a crash never leaves a truncated artifact.
+Unchanged content is detected by hash and not rewritten, which keeps the
+file's mtime (and anything keyed on it, like test reruns) untouched.
+"""
+
+from typing import Dict, Any, Tuple
+import hashlib
+import os
+import tempfile
+import threading
+
+
+class ArtifactWriter:
+    """
+    Atomic, skip-if-unchanged writer for files under one output directory.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the writer.
+
+        Args:
+            root: Directory the artifacts are written to
+        """
+        self.root = root
+        self._hashes = {}  # path -> (size, mtime_ns, sha256) of files we know
+        self._dirs = set()  # directories already created
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.writes = 0
+        self.skips = 0
+        self.bytes_written = 0
+        self.bytes_skipped = 0
+
+    def write(self, filename: str, content: str) -> Dict[str, Any]:
+        """
+        Write an artifact unless the file already has this content.
+
+        Args:
+            filename: Path relative to the root directory
+            content: Text content (written as UTF-8)
+
+        Returns:
+            Dictionary with path, changed, bytes_written, bytes_skipped and sha256
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, filename)
+
+        with self._lock:
+            changed = self._current_hash(path) != digest
+            if changed:
+                self._replace(path, data, digest)
+                self.writes += 1
+                self.bytes_written += len(data)
+            else:
+                self.skips += 1
+                self.bytes_skipped += len(data)
+
+        return {
+            "path": path,
+            "changed": changed,
+            "bytes_written": len(data) if changed else 0,
+            "bytes_skipped": 0 if changed else len(data),
+            "sha256": digest
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get write statistics."""
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "skips": self.skips,
+                "bytesWritten": self.bytes_written,
+                "bytesSkipped": self.bytes_skipped
+            }
+
+    def _current_hash(self, path: str) -> str:
+        """Hash of the file on disk, reusing the last hash while size and mtime match."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        known = self._hashes.get(path)
+        if known is not None and known[:2] == (st.st_size, st.st_mtime_ns):
+            return known[2]
+
+        digest, size = self._hash_file(path)
+        self._hashes[path] = (size, st.st_mtime_ns, digest)
+        return digest
+
+    def _hash_file(self, path: str) -> Tuple[str, int]:
+        """SHA-256 and size of a file's content."""
+        sha = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                sha.update(block)
+                size += len(block)
+        return sha.hexdigest(), size
+
+    def _replace(self, path: str, data: bytes, digest: str):
+        """Write to a temporary file next to the target and rename it into place."""
+        directory = os.path.dirname(path) or "."
+        if directory not in self._dirs:
+            os.makedirs(directory, exist_ok = True)
+            self._dirs.add(directory)
+
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir = directory, prefix = ".", suffix = ".tmp")
+        except FileNotFoundError:
+            # Removed since we created it
+            os.makedirs(directory, exist_ok = True)
+            fd, tmp_path = tempfile.mkstemp(dir = directory, prefix = ".", suffix = ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        st = os.stat(path)
+        self._hashes[path] = (st.st_size, st.st_mtime_ns, digest)
@@ -0,0 +1,224 @@
+"""
+Pooled HTTP Clients
+Author: [Your Name] - [Student ID]
+
+Registry of OpenAI clients shared by all agents. Every agent (and every
+orchestrator in the process) goes through the same connection pool, so TLS
+handshakes are paid once and keep-alive connections are reused across
+workflow steps and across workflows.
+
+The backend is pluggable: "openai" talks to the real API (or any
+OpenAI-compatible server given by base_url), "fake" uses the in-process
+mock from infra.mock_llm. The registry also carries the rate limiter that
+keeps every agent under the provider's token and request budgets, and the
+retry policy (timeouts, retries, hedging) agents apply to each call. The
+process-wide registry reads LLM_BACKEND, LLM_BASE_URL, LLM_TPM and LLM_RPM
+from the environment.
+"""
+
+from typing import Dict, Any
+import asyncio
+import os
+import threading
+import weakref
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from infra.mock_llm import FakeBackend, FakeLLMConfig, FakeOpenAI, AsyncFakeOpenAI
+from infra.rate_limiter import RateLimiter
+from infra.retry_policy import RetryPolicy
+
+
+class ClientRegistry:
+    """
+    Creates and shares pooled sync and async OpenAI clients.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 60.0, connect_timeout: float = 10.0,
+                 request_timeout: float = 120.0, backend: str = "openai",
+                 base_url: str = None, fake_config: FakeLLMConfig = None,
+                 tokens_per_minute: int = None, requests_per_minute: int = None,
+                 retry_policy: RetryPolicy = None):
+        """
+        Initialize the registry.
+
+        Args:
+            max_connections: Maximum open connections per pool
+            max_keepalive_connections: Idle connections kept for reuse
+            keepalive_expiry: Seconds an idle connection is kept alive
+            connect_timeout: Timeout for establishing a connection
+            request_timeout: Timeout for each request (read/write/pool)
+            backend: "openai" for a real (or OpenAI-compatible) endpoint, "fake"
+                for the in-process mock
+            base_url: Endpoint override, e.g. a local stand-in server
+            fake_config: Behaviour of the in-process mock
+            tokens_per_minute: TPM budget shared by all agents (None for no limit)
+            requests_per_minute: RPM budget shared by all agents (None for no limit)
+            retry_policy: Timeouts, retries and hedging for LLM calls
+        """
+        if backend not in ("openai", "fake"):
+            raise ValueError(f"Unknown LLM backend: {backend}")
+
+        self.backend = backend
+        self.base_url = base_url
+        self.fake_backend = FakeBackend(fake_config) if backend == "fake" else None
+
+        # Shared LLM call scheduler
+        self.rate_limiter = None
+        if tokens_per_minute or requests_per_minute:
+            self.rate_limiter = RateLimiter(tokens_per_minute, requests_per_minute)
+
+        # Agents retry through the policy, so the SDK's own retries are disabled
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self.limits = httpx.Limits(
+            max_connections = max_connections,
+            max_keepalive_connections = max_keepalive_connections,
+            keepalive_expiry = keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(request_timeout, connect = connect_timeout)
+
+        self._clients = {}  # api_key -> OpenAI
+        self._async_clients = weakref.WeakKeyDictionary()  # loop -> {api_key: AsyncOpenAI}
+        self._lock = threading.Lock()
+
+        # Connection statistics
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def get_client(self, api_key: str) -> OpenAI:
+        """
+        Get the shared sync client for an API key.
+
+        Args:
+            api_key: OpenAI API key
+
+        Returns:
+            Pooled OpenAI client
+        """
+        with self._lock:
+            if api_key not in self._clients:
+                if self.fake_backend is not None:
+                    self._clients[api_key] = FakeOpenAI(self.fake_backend)
+                else:
+                    http_client = httpx.Client(
+                        limits = self.limits,
+                        timeout = self.timeout,
+                        event_hooks = {"request": [self._on_request]}
+                    )
+                    self._clients[api_key] = OpenAI(api_key = api_key, base_url = self.base_url,
+                                                    http_client = http_client, max_retries = 0)
+            return self._clients[api_key]
+
+    def get_async_client(self, api_key: str) -> AsyncOpenAI:
+        """
+        Get the shared async client for an API key on the running event loop.
+
+        Async connection pools are bound to the loop that created them, so each
+        loop gets its own client.
+
+        Args:
+            api_key: OpenAI API key
+
+        Returns:
+            Pooled AsyncOpenAI client
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            if api_key not in clients:
+                if self.fake_backend is not None:
+                    clients[api_key] = AsyncFakeOpenAI(self.fake_backend)
+                else:
+                    http_client = httpx.AsyncClient(
+                        limits = self.limits,
+                        timeout = self.timeout,
+                        event_hooks = {"request": [self._on_async_request]}
+                    )
+                    clients[api_key] = AsyncOpenAI(api_key = api_key, base_url = self.base_url,
+                                                   http_client = http_client, max_retries = 0)
+            return clients[api_key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get connection pool statistics."""
+        return {
+            "requests": self.requests,
+            "connectionsOpened": self.connections_opened,
+            "connectionsReused": max(self.requests - self.connections_opened, 0),
+            "tlsHandshakes": self.tls_handshakes
+        }
+
+    def close(self):
+        """Close all sync clients and their connection pools."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+    def _on_request(self, request: httpx.Request):
+        """Count the request and trace whether it opens a new connection."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request):
+        """Async version of _on_request()."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._atrace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        """Record connection events reported by the transport."""
+        if event_name.endswith((".connect_tcp.complete", ".connect_unix_socket.complete")):
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name.endswith(".start_tls.complete"):
+            with self._lock:
+                self.tls_handshakes += 1
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]):
+        """Async version of _trace()."""
+        self._trace(event_name, info)
+
+
+# Registry shared by default across all agents and orchestrators
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry.
+
+    Returns:
+        The shared ClientRegistry
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry(
+                backend = os.getenv("LLM_BACKEND", "openai"),
+                base_url = os.getenv("LLM_BASE_URL") or None,
+                tokens_per_minute = int(os.getenv("LLM_TPM", "0")) or None,
+                requests_per_minute = int(os.getenv("LLM_RPM", "0")) or None
+            )
+        return _default_registry
+
+
+def configure_client_registry(**kwargs) -> ClientRegistry:
+    """
+    Replace the process-wide client registry.
+
+    Agents created afterwards use the new registry.
+
+    Args:
+        **kwargs: ClientRegistry options
+
+    Returns:
+        The new shared ClientRegistry
+    """
+    global _default_registry
+    with _default_registry_lock:
+        _default_registry = ClientRegistry(**kwargs)
+        return _default_registry
@@ -0,0 +1,225 @@
+"""
+LLM Response Cache
+Author: [Your Name] - [Student ID]
+
+Content-addressed cache for LLM completions. Requests are keyed by a stable
+hash of everything that affects the output (model, messages, max_tokens,
+temperature). Entries live in an in-memory LRU tier backed by a sharded
+on-disk tier with TTL and size-based eviction.
+"""
+
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory + disk) cache for LLM responses.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/llm", memory_entries: int = 256,
+                 max_disk_bytes: int = 100 * 1024 * 1024,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk tier
+            memory_entries: Maximum number of entries kept in memory
+            max_disk_bytes: Size budget for the on-disk tier
+            ttl_seconds: Entries older than this are treated as misses
+        """
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # Computed lazily on first write
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: Dict) -> str:
+        """
+        Build a stable content hash for a request.
+
+        Args:
+            request: Everything that determines the LLM output
+
+        Returns:
+            Hex digest identifying the request
+        """
+        canonical = json.dumps(request, sort_keys = True, separators = (",", ":"),
+                               ensure_ascii = False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Request hash from make_key()
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is not None and now - entry["created"] <= self.ttl_seconds:
+                self._remember(key, entry["created"], entry["value"])
+                self.hits += 1
+                return entry["value"]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Request hash from make_key()
+            value: JSON-serializable response to store
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+        self._write_disk(key, {"created": created, "value": value})
+
+    def delete(self, key: str):
+        """
+        Remove an entry from both tiers, e.g. a response that turned out to be unusable.
+
+        Args:
+            key: Request hash from make_key()
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+
+        path = self._path_for(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            for path, _, _ in self._scan_disk():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memoryEntries": len(self._memory)
+        }
+
+    def _remember(self, key: str, created: float, value: Dict[str, Any]):
+        """Insert into the memory tier (caller holds the lock)."""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last = False)
+
+    def _path_for(self, key: str) -> str:
+        """Sharded on-disk location for a key."""
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry from disk, ignoring missing or corrupt files."""
+        path = self._path_for(key)
+        try:
+            with open(path, "r", encoding = "utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, entry: Dict[str, Any]):
+        """Atomically write an entry to disk and enforce the size budget."""
+        path = self._path_for(key)
+        data = json.dumps(entry).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            fd, tmp_path = tempfile.mkstemp(dir = os.path.dirname(path), suffix = ".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[LLM Cache] Could not write cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self):
+        """Yield (path, size, mtime) for every on-disk entry."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _evict_disk(self):
+        """Remove expired entries, then oldest ones, until under budget (caller holds the lock)."""
+        entries = sorted(self._scan_disk(), key = lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.ttl_seconds
+        target = int(self.max_disk_bytes * 0.9)
+
+        for path, size, mtime in entries:
+            if mtime >= cutoff and total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        self._disk_bytes = total
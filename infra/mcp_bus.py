@@ -6,9 +6,29 @@ This module implements the Model Context Protocol (MCP) for inter-agent communic
 It handles message passing, tool registration, and coordination between agents.
 """
 
-from typing import Dict, Any, Callable, List
-import json
+from typing import Dict, Any, Callable, Iterator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
+import asyncio
+import contextvars
+import itertools
+import json
+import multiprocessing
+import pickle
+import random
+import threading
+import time
+import weakref
+from infra.message_log import MessageHistory
+from infra.tracing import BusTracer
+from infra.metrics import MetricsRegistry
+
+
+# 64-bit message IDs: a random per-process high half and a monotonic counter,
+# so IDs stay unique across processes and across runs sharing a history log
+_ID_BASE = random.getrandbits(31) << 32
+_next_id = itertools.count(1).__next__
 
 
 class MCPMessage:
@@ -16,8 +36,11 @@ class MCPMessage:
     Represents a message in the MCP protocol.
     """
 
+    __slots__ = ("sender", "receiver", "message_type", "payload", "message_id",
+                 "correlation_id", "timestamp_ns")
+
     def __init__(self, sender: str, receiver: str, message_type: str,
-                 payload: Any, message_id: str = None):
+                 payload: Any, message_id: int = None, correlation_id: int = None):
         """
         Initialize an MCP message.
 
@@ -27,18 +50,26 @@ class MCPMessage:
             message_type: Type of message (e.g., "request", "response", "tool_call")
             payload: The actual data being sent
             message_id: Unique identifier for the message
+            correlation_id: ID of the request this message responds to
         """
         self.sender = sender
         self.receiver = receiver
         self.message_type = message_type
         self.payload = payload
-        self.message_id = message_id or self._generate_id()
-        self.timestamp = datetime.now().isoformat()
+        self.message_id = message_id or _ID_BASE + _next_id()
+        self.correlation_id = correlation_id
+        self.timestamp_ns = time.time_ns()
+
+    @property
+    def timestamp(self) -> str:
+        """Creation time as an ISO 8601 string (formatted on demand)."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
 
-    def _generate_id(self) -> str:
-        """Generate a unique message ID."""
-        import uuid
-        return str(uuid.uuid4())
+    @timestamp.setter
+    def timestamp(self, value: str):
+        """Set the creation time from an ISO 8601 string, as before timestamp_ns."""
+        created = datetime.fromisoformat(value)
+        self.timestamp_ns = round(created.timestamp() * 1_000_000) * 1000
 
     def to_dict(self) -> Dict:
         """Convert message to dictionary."""
@@ -48,6 +79,7 @@ class MCPMessage:
             "message_type": self.message_type,
             "payload": self.payload,
             "message_id": self.message_id,
+            "correlation_id": self.correlation_id,
             "timestamp": self.timestamp
         }
 
@@ -55,10 +87,16 @@ class MCPMessage:
 class MCPTool:
     """
     Represents a tool that can be used by agents via MCP.
+
+    Tools run inline on the caller's thread by default. CPU-heavy tools can
+    run on the shared thread pool or, to escape the GIL, the shared process
+    pool; process tools need a module-level handler and picklable
+    parameters and results.
     """
 
     def __init__(self, name: str, description: str,
-                 handler: Callable, parameters: Dict = None):
+                 handler: Callable, parameters: Dict = None, executor: str = "inline",
+                 max_concurrency: int = None, timeout: float = None):
         """
         Initialize an MCP tool.
 
@@ -67,43 +105,189 @@ class MCPTool:
             description: What the tool does
             handler: Function to execute when tool is called
             parameters: Schema describing tool parameters
+            executor: "inline", "thread" or "process"
+            max_concurrency: Calls of this tool allowed to run at once; a
+                pooled call that timed out keeps its slot until it finishes
+            timeout: Seconds to wait for a pooled call (including time spent
+                waiting for a concurrency slot)
         """
+        if executor not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown tool executor: {executor}")
+        if executor == "process":
+            try:
+                pickle.dumps(handler)
+            except Exception as e:
+                raise ValueError(f"Tool '{name}' runs in a process pool but its handler "
+                                 f"cannot be pickled: {e}")
+
         self.name = name
         self.description = description
         self.handler = handler
         self.parameters = parameters or {}
+        self.executor = executor
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
 
     def execute(self, **kwargs) -> Any:
         """
         Execute the tool with given parameters.
 
+        Returns:
+            Result of tool execution
+
+        Raises:
+            TimeoutError: If a pooled call does not finish within the timeout
+        """
+        if self.executor == "inline" and self._slots is None:
+            return self.handler(**kwargs)
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        if self._slots is not None and not self._slots.acquire(timeout = self.timeout):
+            raise TimeoutError(f"Tool '{self.name}' timed out waiting for a free slot")
+
+        if self.executor == "inline":
+            try:
+                return self.handler(**kwargs)
+            finally:
+                self._slots.release()
+
+        try:
+            future = _tool_pool(self.executor).submit(self.handler, **kwargs)
+        except BaseException:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+        if self._slots is not None:
+            # A call that times out keeps running, so it holds its slot until it ends
+            future.add_done_callback(lambda _: self._slots.release())
+
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            return future.result(timeout = remaining)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Tool '{self.name}' timed out after {self.timeout}s") from None
+
+    async def aexecute(self, **kwargs) -> Any:
+        """
+        Execute the tool without blocking the event loop.
+
+        Inline tools run directly; pooled tools are waited on from a thread.
+
         Returns:
             Result of tool execution
         """
-        return self.handler(**kwargs)
+        if self.executor == "inline" and self._slots is None:
+            return self.handler(**kwargs)
+        return await asyncio.to_thread(self.execute, **kwargs)
+
+
+# Pools shared by all pooled tools, created on first use
+_tool_pools = {}
+_tool_pools_lock = threading.Lock()
+
+
+def _tool_pool(kind: str):
+    """Get the shared thread or process pool for tool calls."""
+    with _tool_pools_lock:
+        pool = _tool_pools.get(kind)
+        if pool is None:
+            if kind == "process":
+                # Spawned workers don't inherit the parent's threads and locks
+                pool = ProcessPoolExecutor(mp_context = multiprocessing.get_context("spawn"))
+            else:
+                pool = ThreadPoolExecutor(thread_name_prefix = "mcp-tool")
+            _tool_pools[kind] = pool
+        return pool
+
+
+def shutdown_tool_pools(wait: bool = True):
+    """
+    Shut down the shared tool pools (they are recreated on next use).
+
+    Args:
+        wait: Wait for running tool calls to finish
+    """
+    with _tool_pools_lock:
+        pools = list(_tool_pools.values())
+        _tool_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait = wait, cancel_futures = True)
 
 
 class MCPBus:
     """
     Message bus implementing the Model Context Protocol.
     Handles communication between agents and tool execution.
+
+    In "queued" mode, asend_message() puts agent requests on a bounded
+    per-agent inbox served by a pool of worker tasks, so many requests (to
+    the same or different agents) are in flight at once. Responses are
+    matched to their requests by correlation ID.
     """
 
-    def __init__(self):
-        """Initialize the MCP bus."""
+    def __init__(self, max_history: int = 1000, history_log: str = None,
+                 mode: str = "direct", workers_per_agent: int = 1, queue_size: int = 64,
+                 metrics: MetricsRegistry = None):
+        """
+        Initialize the MCP bus.
+
+        Args:
+            max_history: Messages kept in memory; older ones are spilled
+            history_log: Base name of the JSONL segments spilled messages are
+                written to (gzip if it ends in ".gz"); without it they are dropped
+            mode: "direct" calls the agent from asend_message(); "queued" goes
+                through the agent's inbox
+            workers_per_agent: Concurrent requests each agent serves in queued mode
+            queue_size: Inbox capacity; senders wait when it is full
+            metrics: Registry for message counts and latencies (None records nothing)
+        """
+        if mode not in ("direct", "queued"):
+            raise ValueError(f"Unknown bus mode: {mode}")
+
         self.agents = {}  # Registry of agents
         self.tools = {}  # Registry of tools
-        self.message_history = []  # Log of all messages
+        self.message_history = MessageHistory(max_history, history_log)  # Log of all messages
+        self.tracer = None  # BusTracer when tracing is enabled
+        self.metrics = metrics
+
+        # Queued mode
+        self.mode = mode
+        self.workers_per_agent = workers_per_agent
+        self.queue_size = queue_size
+        self.agent_workers = {}  # agent name -> worker count override
+        self._queues = weakref.WeakKeyDictionary()  # loop -> _QueueState
+
+    def enable_tracing(self, tracer: BusTracer = None) -> BusTracer:
+        """
+        Start recording a span for every message the bus handles.
+
+        Args:
+            tracer: Tracer to record into (a new one is created if omitted)
+
+        Returns:
+            The active tracer
+        """
+        self.tracer = tracer or BusTracer()
+        return self.tracer
+
+    def disable_tracing(self):
+        """Stop recording spans."""
+        self.tracer = None
 
-    def register_agent(self, agent_name: str, agent: Any):
+    def register_agent(self, agent_name: str, agent: Any, workers: int = None):
         """
         Register an agent with the MCP bus.
 
         Args:
             agent_name: Unique name for the agent
             agent: The agent object
+            workers: Concurrent requests served in queued mode (default:
+                workers_per_agent)
         """
         self.agents[agent_name] = agent
+        if workers is not None:
+            self.agent_workers[agent_name] = workers
         print(f"[MCP Bus] Registered agent: {agent_name}")
 
     def register_tool(self, tool: MCPTool):
@@ -114,14 +298,20 @@ class MCPBus:
             tool: The MCPTool to register
         """
         self.tools[tool.name] = tool
+        if tool.executor == "process":
+            # Start a worker now so its startup overlaps with the LLM calls
+            _tool_pool("process").submit(int)
         print(f"[MCP Bus] Registered tool: {tool.name}")
 
-    def send_message(self, message: MCPMessage) -> MCPMessage:
+    def send_message(self, message: MCPMessage,
+                     on_partial: Callable[[MCPMessage], None] = None) -> MCPMessage:
         """
         Send a message from one agent to another via the bus.
 
         Args:
             message: The MCPMessage to send
+            on_partial: Optional callback receiving partial process_response
+                messages while the receiver streams its result
 
         Returns:
             Response message from the receiver
@@ -131,71 +321,419 @@ class MCPBus:
 
         print(f"[MCP Bus] {message.sender} -> {message.receiver}: {message.message_type}")
 
+        tracer = self.tracer
+        if tracer is None and self.metrics is None:
+            return self._dispatch(message, on_partial)
+
+        span = tracer.start(message) if tracer is not None else None
+        started = time.perf_counter()
+        try:
+            response = self._dispatch(message, on_partial)
+        except Exception as e:
+            self._observe(message, tracer, span, started, error = e)
+            raise
+        self._observe(message, tracer, span, started, response)
+        return response
+
+    def _dispatch(self, message: MCPMessage,
+                  on_partial: Callable[[MCPMessage], None]) -> MCPMessage:
+        """Deliver a message to its tool or agent and return the response."""
         # Handle tool calls directly (receiver is "MCPBus")
         if message.message_type == "tool_call":
-            # Execute a tool
-            tool_name = message.payload.get("tool_name")
-            tool_params = message.payload.get("parameters", {})
+            return self._execute_tool_call(message)
 
-            if tool_name not in self.tools:
-                raise ValueError(f"Tool '{tool_name}' not registered")
+        # Get the receiving agent
+        receiver_agent = self._get_receiver(message)
 
-            result = self.tools[tool_name].execute(**tool_params)
+        # Agent processes the payload
+        if on_partial is not None:
+            result = receiver_agent.process(message.payload,
+                                            on_chunk = self._partial_emitter(message, on_partial))
+        else:
+            result = receiver_agent.process(message.payload)
+        return self._make_process_response(message, result)
 
-            response = MCPMessage(
-                sender = "MCPBus",
-                receiver = message.sender,
-                message_type = "tool_response",
-                payload = {"result": result}
-            )
+    async def asend_message(self, message: MCPMessage,
+                            on_partial: Callable[[MCPMessage], None] = None) -> MCPMessage:
+        """
+        Send a message via the bus without blocking the event loop.
+
+        Agents that provide aprocess() are awaited directly; others run in a
+        worker thread.
+
+        Args:
+            message: The MCPMessage to send
+            on_partial: Optional callback receiving partial process_response
+                messages while the receiver streams its result
+
+        Returns:
+            Response message from the receiver
+        """
+        # Log the message
+        self.message_history.append(message)
+
+        print(f"[MCP Bus] {message.sender} -> {message.receiver}: {message.message_type}")
+
+        tracer = self.tracer
+        if tracer is None and self.metrics is None:
+            return await self._adispatch(message, on_partial)
+
+        span = tracer.start(message) if tracer is not None else None
+        started = time.perf_counter()
+        try:
+            response = await self._adispatch(message, on_partial)
+        except Exception as e:
+            self._observe(message, tracer, span, started, error = e)
+            raise
+        self._observe(message, tracer, span, started, response)
+        return response
+
+    def _observe(self, message: MCPMessage, tracer: BusTracer, span: Any, started: float,
+                 response: MCPMessage = None, error: Exception = None):
+        """Close the message's trace span and record its metrics."""
+        if span is not None:
+            tracer.finish(span, response, error = error)
+
+        metrics = self.metrics
+        if metrics is None:
+            return
+        if message.message_type == "tool_call":
+            target = message.payload.get("tool_name")
+        else:
+            target = message.receiver
+        metrics.inc("mcp_messages_total", message_type = message.message_type, target = target)
+        if error is not None:
+            metrics.inc("mcp_message_errors_total", message_type = message.message_type,
+                        target = target)
+        metrics.observe("mcp_message_seconds", time.perf_counter() - started,
+                        message_type = message.message_type, target = target)
+
+    async def _adispatch(self, message: MCPMessage,
+                         on_partial: Callable[[MCPMessage], None]) -> MCPMessage:
+        """Async version of _dispatch()."""
+        if message.message_type == "tool_call":
+            return await self._aexecute_tool_call(message)
 
-            self.message_history.append(response)
-            return response
+        if self.mode == "queued":
+            return await self._enqueue(message, on_partial)
+        return await self._aprocess(message, on_partial)
 
+    async def _aprocess(self, message: MCPMessage,
+                        on_partial: Callable[[MCPMessage], None]) -> MCPMessage:
+        """Have the receiving agent process a request without blocking the loop."""
+        receiver_agent = self._get_receiver(message)
+
+        kwargs = {}
+        if on_partial is not None:
+            kwargs["on_chunk"] = self._partial_emitter(message, on_partial)
+
+        if hasattr(receiver_agent, "aprocess"):
+            result = await receiver_agent.aprocess(message.payload, **kwargs)
+        else:
+            result = await asyncio.to_thread(receiver_agent.process, message.payload, **kwargs)
+        return self._make_process_response(message, result)
+
+    async def _enqueue(self, message: MCPMessage,
+                       on_partial: Callable[[MCPMessage], None]) -> MCPMessage:
+        """
+        Queue a request on the receiver's inbox and wait for its response.
+
+        The sender's context (e.g. the active trace span) is carried over to
+        the worker that processes the request.
+        """
+        self._get_receiver(message)
+        state = self._queue_state()
+        inbox = self._inbox(state, message.receiver)
+
+        future = asyncio.get_running_loop().create_future()
+        state.pending[message.message_id] = future
+        try:
+            # Waits here while the inbox is full (backpressure)
+            await inbox.put((message, on_partial, contextvars.copy_context()))
+            return await future
+        finally:
+            state.pending.pop(message.message_id, None)
+
+    def _queue_state(self) -> "_QueueState":
+        """Get the inboxes and workers for the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._queues.get(loop)
+        if state is None:
+            state = self._queues[loop] = _QueueState()
+        return state
+
+    def _inbox(self, state: "_QueueState", agent_name: str) -> asyncio.Queue:
+        """Get an agent's inbox, starting its workers on first use."""
+        inbox = state.inboxes.get(agent_name)
+        if inbox is None:
+            inbox = state.inboxes[agent_name] = asyncio.Queue(maxsize = self.queue_size)
+            workers = self.agent_workers.get(agent_name, self.workers_per_agent)
+            for _ in range(max(1, workers)):
+                state.workers.append(asyncio.create_task(self._agent_worker(state, inbox)))
+        return inbox
+
+    async def _agent_worker(self, state: "_QueueState", inbox: asyncio.Queue):
+        """Serve requests from one agent inbox until cancelled."""
+        while True:
+            message, on_partial, context = await inbox.get()
+            try:
+                future = state.pending.get(message.message_id)
+                if future is None or future.done():
+                    # Sender stopped waiting; don't spend an LLM call on it
+                    continue
+
+                task = asyncio.create_task(self._aprocess(message, on_partial), context = context)
+                try:
+                    response = await task
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+
+                waiter = state.pending.get(response.correlation_id)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(response)
+            finally:
+                inbox.task_done()
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get inbox depth and worker count per agent (queued mode).
+
+        Returns:
+            Dictionary of agent name to queued, capacity and workers, summed
+            over all event loops using the bus
+        """
+        stats = {}
+        for state in list(self._queues.values()):
+            for agent_name, inbox in state.inboxes.items():
+                entry = stats.setdefault(agent_name, {
+                    "queued": 0,
+                    "capacity": 0,
+                    "workers": 0
+                })
+                entry["queued"] += inbox.qsize()
+                entry["capacity"] += inbox.maxsize
+                entry["workers"] += self.agent_workers.get(agent_name, self.workers_per_agent)
+        return stats
+
+    async def aclose(self):
+        """
+        Stop the inbox workers running on the current event loop.
+
+        Requests already queued (including senders waiting on a full inbox)
+        are processed before the workers are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        state = self._queues.get(loop)
+        if state is None:
+            return
+        # Inboxes can be added while earlier ones drain
+        drained = 0
+        while drained < len(state.inboxes):
+            drained = len(state.inboxes)
+            for inbox in list(state.inboxes.values()):
+                await inbox.join()
+        self._queues.pop(loop, None)
+        for worker in state.workers:
+            worker.cancel()
+        await asyncio.gather(*state.workers, return_exceptions = True)
+
+    def _execute_tool_call(self, message: MCPMessage) -> MCPMessage:
+        """Execute a tool call and log the tool response."""
+        # Execute a tool
+        tool, tool_params = self._get_tool(message)
+        result = tool.execute(**tool_params)
+        return self._make_tool_response(message, result)
+
+    async def _aexecute_tool_call(self, message: MCPMessage) -> MCPMessage:
+        """Async version of _execute_tool_call()."""
+        tool, tool_params = self._get_tool(message)
+        result = await tool.aexecute(**tool_params)
+        return self._make_tool_response(message, result)
+
+    def _get_tool(self, message: MCPMessage) -> Tuple[MCPTool, Dict]:
+        """Look up the tool and parameters of a tool_call message."""
+        tool_name = message.payload.get("tool_name")
+        tool_params = message.payload.get("parameters", {})
+
+        if tool_name not in self.tools:
+            raise ValueError(f"Tool '{tool_name}' not registered")
+
+        return self.tools[tool_name], tool_params
+
+    def _make_tool_response(self, message: MCPMessage, result: Any) -> MCPMessage:
+        """Wrap a tool result in a logged tool_response message."""
+        response = MCPMessage(
+            sender = "MCPBus",
+            receiver = message.sender,
+            message_type = "tool_response",
+            payload = {"result": result},
+            correlation_id = message.message_id
+        )
+
+        self.message_history.append(response)
+        return response
+
+    def _get_receiver(self, message: MCPMessage) -> Any:
+        """Look up the agent that should process a request message."""
         # Check if receiver exists for other message types
         if message.receiver not in self.agents:
             raise ValueError(f"Agent '{message.receiver}' not registered")
 
-        # Get the receiving agent
-        receiver_agent = self.agents[message.receiver]
+        if message.message_type != "process_request":
+            raise ValueError(f"Unknown message type: {message.message_type}")
 
-        # Process based on message type
-        if message.message_type == "process_request":
-            # Agent processes the payload
-            result = receiver_agent.process(message.payload)
+        return self.agents[message.receiver]
+
+    def _partial_emitter(self, message: MCPMessage,
+                         on_partial: Callable[[MCPMessage], None]) -> Callable[[str], None]:
+        """
+        Build a chunk callback that forwards streamed text as partial responses.
 
-            # Create response message
-            response = MCPMessage(
+        Partial messages are delivered to on_partial only; the final
+        process_response is what gets logged in the message history.
+        """
+        def emit(chunk: str):
+            on_partial(MCPMessage(
                 sender = message.receiver,
                 receiver = message.sender,
                 message_type = "process_response",
-                payload = result
-            )
+                payload = {
+                    "partial": True,
+                    "delta": chunk,
+                    "in_reply_to": message.message_id
+                },
+                correlation_id = message.message_id
+            ))
+
+        return emit
+
+    def _make_process_response(self, message: MCPMessage, result: Any) -> MCPMessage:
+        """Wrap an agent result in a logged process_response message."""
+        # Create response message
+        response = MCPMessage(
+            sender = message.receiver,
+            receiver = message.sender,
+            message_type = "process_response",
+            payload = result,
+            correlation_id = message.message_id
+        )
+
+        self.message_history.append(response)
+        return response
+
+    def broadcast(self, sender: str, message_type: str, payload: Any,
+                  timeout: float = None) -> "BroadcastResult":
+        """
+        Broadcast a message to all agents concurrently.
 
-            self.message_history.append(response)
-            return response
+        Args:
+            sender: Name of sending agent
+            message_type: Type of message
+            payload: Message payload
+            timeout: Seconds to wait for each receiver (None waits for all)
 
-        else:
-            raise ValueError(f"Unknown message type: {message.message_type}")
-    def broadcast(self, sender: str, message_type: str, payload: Any) -> List[MCPMessage]:
+        Returns:
+            BroadcastResult: responses in agent registration order, plus the
+            agents that timed out or failed
+        """
+        receivers = [name for name in self.agents if name != sender]
+        replies = {}
+        result = BroadcastResult()
+        for agent_name, response, error in self.iter_broadcast(sender, message_type,
+                                                               payload, timeout):
+            if isinstance(error, TimeoutError):
+                result.timed_out.append(agent_name)
+            elif error is not None:
+                result.failed[agent_name] = error
+            else:
+                replies[agent_name] = response
+
+        result.extend(replies[name] for name in receivers if name in replies)
+        return result
+
+    def iter_broadcast(self, sender: str, message_type: str, payload: Any,
+                       timeout: float = None) -> Iterator[Tuple[str, Any, Exception]]:
         """
-        Broadcast a message to all agents.
+        Broadcast a message to all agents and yield replies as they complete.
+
+        Each receiver is called on its own thread, so total latency is that of
+        the slowest receiver rather than the sum. Receivers still running when
+        the timeout expires are reported with a TimeoutError and abandoned.
 
         Args:
             sender: Name of sending agent
             message_type: Type of message
             payload: Message payload
+            timeout: Seconds to wait for each receiver (None waits for all)
+
+        Yields:
+            (agent_name, response, error) with exactly one of response/error set
+        """
+        receivers = [name for name in self.agents if name != sender]
+        if not receivers:
+            return
+
+        executor = ThreadPoolExecutor(max_workers = len(receivers),
+                                      thread_name_prefix = "mcp-broadcast")
+        futures = {
+            executor.submit(contextvars.copy_context().run, self.send_message,
+                            MCPMessage(sender, agent_name, message_type, payload)): agent_name
+            for agent_name in receivers
+        }
+        reported = set()
+        try:
+            for future in as_completed(futures, timeout = timeout):
+                reported.add(future)
+                error = future.exception()
+                yield futures[future], None if error else future.result(), error
+        except FuturesTimeoutError:
+            # Replies that arrived while the caller was handling earlier ones
+            # still count; only receivers still running have timed out
+            for future, agent_name in futures.items():
+                if future in reported:
+                    continue
+                if future.done():
+                    error = future.exception()
+                    yield agent_name, None if error else future.result(), error
+                else:
+                    yield agent_name, None, TimeoutError(
+                        f"Agent '{agent_name}' did not respond within {timeout}s")
+        finally:
+            executor.shutdown(wait = False, cancel_futures = True)
+
+    async def abroadcast(self, sender: str, message_type: str, payload: Any,
+                         timeout: float = None) -> "BroadcastResult":
+        """
+        Async version of broadcast() using asend_message() for every receiver.
+
+        Args:
+            sender: Name of sending agent
+            message_type: Type of message
+            payload: Message payload
+            timeout: Seconds to wait for each receiver (None waits for all)
 
         Returns:
-            List of responses from all agents
+            BroadcastResult: responses in agent registration order, plus the
+            agents that timed out or failed
         """
-        responses = []
-        for agent_name in self.agents.keys():
-            if agent_name != sender:
-                message = MCPMessage(sender, agent_name, message_type, payload)
-                response = self.send_message(message)
-                responses.append(response)
-        return responses
+        receivers = [name for name in self.agents if name != sender]
+        outcomes = await asyncio.gather(*[
+            asyncio.wait_for(self.asend_message(MCPMessage(sender, agent_name,
+                                                           message_type, payload)), timeout)
+            for agent_name in receivers
+        ], return_exceptions = True)
+
+        result = BroadcastResult()
+        for agent_name, outcome in zip(receivers, outcomes):
+            if isinstance(outcome, (asyncio.TimeoutError, TimeoutError)):
+                result.timed_out.append(agent_name)
+            elif isinstance(outcome, BaseException):
+                result.failed[agent_name] = outcome
+            else:
+                result.append(outcome)
+        return result
 
     def get_message_history(self) -> List[Dict]:
         """
@@ -204,7 +742,21 @@ class MCPBus:
         Returns:
             List of message dictionaries
         """
-        return [msg.to_dict() for msg in self.message_history]
+        return list(self.message_history.iter())
+
+    def iter_message_history(self, start: int = 0) -> Iterator[Dict]:
+        """
+        Lazily iterate over the message history, oldest first.
+
+        Spilled messages are streamed back from the history log.
+
+        Args:
+            start: Index of the first message to return
+
+        Returns:
+            Iterator of message dictionaries
+        """
+        return self.message_history.iter(start)
 
     def get_agent_tools(self, agent_name: str) -> List[str]:
         """
@@ -218,4 +770,32 @@ class MCPBus:
         """
         # For now, return all tools
         # In a more sophisticated system, you'd have per-agent permissions
-        return list(self.tools.keys())
\ No newline at end of file
+        return list(self.tools.keys())
+
+
+class BroadcastResult(list):
+    """
+    Responses to a broadcast, with the receivers that did not answer.
+
+    Behaves as the list of successful responses; timed_out lists agents that
+    missed the deadline and failed maps agents to the exception they raised.
+    """
+
+    def __init__(self, responses: List[MCPMessage] = ()):
+        super().__init__(responses)
+        self.timed_out = []
+        self.failed = {}
+
+    @property
+    def complete(self) -> bool:
+        """True when every receiver responded."""
+        return not self.timed_out and not self.failed
+
+
+class _QueueState:
+    """Inboxes, workers and pending requests of a queued bus on one event loop."""
+
+    def __init__(self):
+        self.inboxes = {}  # agent name -> asyncio.Queue
+        self.workers = []  # worker tasks
+        self.pending = {}  # request message_id -> Future for its response
@@ -0,0 +1,214 @@
+"""
+MCP Message History
+Author: [Your Name] - [Student ID]
+
+Bounded history of the messages handled by the MCP bus. The newest messages
+are kept in an in-memory ring buffer; when it fills up, the oldest ones are
+spilled in batches to append-only JSONL segments (gzip-compressed when the
+path ends in ".gz"). Without a log path, spilled messages are dropped and
+only counted.
+
+Each history writes its own segments, named after the log path:
+    reports/mcp_history.<session>.<n>.jsonl.gz
+so histories sharing a log path never read each other's messages. A new
+segment is started when the current one reaches its size limit, and the
+oldest segments of the log path (of any session) are deleted beyond the
+retention count; messages in deleted segments are skipped like dropped ones.
+
+History is read through a lazy iterator that streams the segments from disk
+and then the buffer, so callers can page through it without materializing
+everything.
+"""
+
+from typing import Dict, Any, Iterator, List, Optional
+from collections import deque
+import datetime
+import gzip
+import itertools
+import json
+import os
+import re
+import threading
+import uuid
+
+
+class MessageHistory:
+    """
+    Ring buffer of MCP messages with spill to an append-only log.
+    """
+
+    def __init__(self, max_memory: int = 1000, log_path: Optional[str] = None,
+                 compress: Optional[bool] = None, spill_batch: int = None,
+                 max_segment_bytes: int = 5 * 1024 * 1024, max_segments: int = 20):
+        """
+        Initialize the history.
+
+        Args:
+            max_memory: Messages kept in memory
+            log_path: Base name of the JSONL segments for older messages (None drops them)
+            compress: Gzip the log (defaults to True when log_path ends in ".gz")
+            spill_batch: Messages written per spill (default: a quarter of max_memory)
+            max_segment_bytes: Size at which a new segment is started
+            max_segments: Segments of log_path kept on disk, across all sessions
+        """
+        if max_memory < 1:
+            raise ValueError("max_memory must be at least 1")
+
+        self.max_memory = max_memory
+        self.log_path = log_path
+        if compress is None:
+            compress = log_path is not None and log_path.endswith(".gz")
+        self.compress = compress
+        self.spill_batch = max(1, min(spill_batch or max_memory // 4, max_memory))
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max(1, max_segments)
+
+        self._buffer = deque()
+        self._spilled = 0  # messages moved out of memory (written or dropped)
+        self._segments = []  # [path, message count] of this history's segments, oldest first
+        self._lock = threading.Lock()
+
+        if log_path:
+            root, ext = os.path.splitext(log_path)
+            if ext == ".gz":
+                root, inner = os.path.splitext(root)
+                ext = inner + ext
+            self._segment_root = root
+            self._segment_ext = ext
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._session = f"{stamp}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+            self._segment_pattern = re.compile(
+                re.escape(os.path.basename(root)) + r"\.\d{8}-\d{6}-\d+-[0-9a-f]{6}\.\d{4}"
+                + re.escape(ext) + "$")
+
+    def append(self, message: Any):
+        """
+        Record a message, spilling the oldest ones when the buffer is full.
+
+        Args:
+            message: MCPMessage (anything with to_dict())
+        """
+        with self._lock:
+            self._buffer.append(message)
+            if len(self._buffer) > self.max_memory:
+                batch = [self._buffer.popleft() for _ in range(self.spill_batch)]
+                if self.log_path:
+                    self._write(batch)
+                self._spilled += len(batch)
+
+    def __len__(self) -> int:
+        """Total messages recorded, including spilled ones."""
+        with self._lock:
+            return self._spilled + len(self._buffer)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over all recorded messages as dictionaries, oldest first."""
+        return self.iter()
+
+    def iter(self, start: int = 0) -> Iterator[Dict]:
+        """
+        Lazily iterate over message dictionaries, oldest first.
+
+        Messages spilled without a log, or whose segment has been deleted,
+        can no longer be returned and are skipped.
+
+        Args:
+            start: Index of the first message to return
+
+        Yields:
+            Message dictionaries
+        """
+        with self._lock:
+            spilled = self._spilled
+            buffered = list(self._buffer)
+            segments = [tuple(segment) for segment in self._segments]
+
+        position = 0
+        for path, count in segments:
+            if start < position + count:
+                try:
+                    with self._open(path, "rt") as f:
+                        # Stop at the count seen above; later spills may be in progress
+                        for line in itertools.islice(f, max(start - position, 0), count):
+                            yield json.loads(line)
+                except FileNotFoundError:
+                    pass  # deleted by the retention limit
+                except EOFError:
+                    pass  # read ahead into a gzip member that is still being written
+            position += count
+
+        for message in buffered[max(start - spilled, 0):]:
+            yield message.to_dict()
+
+    def pages(self, page_size: int = 100, start: int = 0) -> Iterator[List[Dict]]:
+        """
+        Iterate over the history in lists of up to page_size messages.
+
+        Args:
+            page_size: Messages per page
+            start: Index of the first message to return
+
+        Yields:
+            Lists of message dictionaries
+        """
+        messages = self.iter(start)
+        while True:
+            page = list(itertools.islice(messages, page_size))
+            if not page:
+                return
+            yield page
+
+    def recent(self) -> List[Any]:
+        """Get the message objects still held in memory."""
+        with self._lock:
+            return list(self._buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get history statistics."""
+        with self._lock:
+            return {
+                "total": self._spilled + len(self._buffer),
+                "inMemory": len(self._buffer),
+                "spilled": self._spilled,
+                "logPath": self.log_path,
+                "segments": [path for path, _ in self._segments]
+            }
+
+    def _write(self, batch: List[Any]):
+        """Append a batch of messages to the current segment as one write (lock held)."""
+        try:
+            full = os.path.getsize(self._segments[-1][0]) >= self.max_segment_bytes
+        except (IndexError, OSError):
+            full = True  # no segment yet, or it was deleted by the retention limit
+        if full:
+            self._start_segment()
+
+        segment = self._segments[-1]
+        data = "".join(json.dumps(message.to_dict(), default = str) + "\n" for message in batch)
+        # Each batch is a complete gzip member, so the segment stays readable between spills
+        with self._open(segment[0], "at") as f:
+            f.write(data)
+        segment[1] += len(batch)
+
+    def _start_segment(self):
+        """Start this history's next segment and delete the oldest ones of the log path."""
+        directory = os.path.dirname(self.log_path) or "."
+        os.makedirs(directory, exist_ok = True)
+        path = (f"{self._segment_root}.{self._session}.{len(self._segments) + 1:04d}"
+                f"{self._segment_ext}")
+        self._segments.append([path, 0])
+
+        # Session names start with a timestamp, so name order is age order
+        existing = sorted(name for name in os.listdir(directory)
+                          if self._segment_pattern.match(name))
+        for name in existing[:max(len(existing) + 1 - self.max_segments, 0)]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+    def _open(self, path: str, mode: str):
+        """Open a segment, compressed or not."""
+        if self.compress:
+            return gzip.open(path, mode, encoding = "utf-8")
+        return open(path, mode, encoding = "utf-8")
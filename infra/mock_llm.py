@@ -0,0 +1,693 @@
+"""
+Mock LLM Backend
+Author: [Your Name] - [Student ID]
+
+Offline stand-in for the OpenAI chat completions API, used for deterministic
+benchmarking and load testing without network access or API spend.
+
+FakeOpenAI / AsyncFakeOpenAI are in-process drop-in replacements for the
+OpenAI clients; serve() exposes the same fake over HTTP so the real clients
+(and the pooled HTTP stack) can be pointed at it with a base URL.
+
+Run a local stand-in server with:
+    python -m infra.mock_llm --port 8089 --latency 0.5
+"""
+
+from typing import Dict, Any, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import httpx
+import openai
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+CANNED_REQUIREMENTS = {
+    "core_features": [
+        "Interactive scale exercises",
+        "Multiple difficulty levels",
+        "Real-time feedback",
+        "Progress tracking",
+        "Educational resources"
+    ],
+    "user_interactions": [
+        "Identify scales",
+        "Practice scales",
+        "View progress",
+        "Access scale information"
+    ],
+    "data_requirements": [
+        "Scale definitions",
+        "User scores",
+        "Practice history"
+    ],
+    "technical_constraints": [
+        "Python standard library only",
+        "Simple text-based or GUI interface"
+    ]
+}
+
+CANNED_CODE = '''"""
+Music Scale Trainer Application
+Practice identifying major and minor scales.
+"""
+
+import random
+
+SCALES = {
+    "C Major": ["C", "D", "E", "F", "G", "A", "B"],
+    "A Minor": ["A", "B", "C", "D", "E", "F", "G"],
+    "G Major": ["G", "A", "B", "C", "D", "E", "F#"],
+    "E Minor": ["E", "F#", "G", "A", "B", "C", "D"],
+    "D Major": ["D", "E", "F#", "G", "A", "B", "C#"],
+    "F Major": ["F", "G", "A", "Bb", "C", "D", "E"],
+}
+
+DIFFICULTY_OPTIONS = {"Easy": 3, "Medium": 5, "Hard": len(SCALES)}
+
+
+class MusicScaleTrainer:
+    """Tracks exercises, answers and progress."""
+
+    def __init__(self, difficulty="Easy"):
+        """Initialize the trainer."""
+        self.scales = dict(SCALES)
+        self.score = 0
+        self.attempts = 0
+        self.history = []
+        self.current_scale = None
+        self.set_difficulty(difficulty)
+
+    def set_difficulty(self, difficulty):
+        """Change the difficulty level."""
+        if difficulty not in DIFFICULTY_OPTIONS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        self.difficulty = difficulty
+
+    def new_question(self, rng=random):
+        """Pick a scale and return its notes and answer options."""
+        self.current_scale = rng.choice(sorted(self.scales))
+        others = [s for s in sorted(self.scales) if s != self.current_scale]
+        count = min(DIFFICULTY_OPTIONS[self.difficulty] - 1, len(others))
+        options = [self.current_scale] + rng.sample(others, count)
+        rng.shuffle(options)
+        return self.scales[self.current_scale], options
+
+    def check_answer(self, answer):
+        """Score an answer for the current question."""
+        if self.current_scale is None:
+            raise RuntimeError("No active question")
+        correct = answer == self.current_scale
+        self.attempts += 1
+        if correct:
+            self.score += 1
+        self.history.append((self.current_scale, answer, correct))
+        return correct
+
+    def accuracy(self):
+        """Percentage of correct answers."""
+        if self.attempts == 0:
+            return 0.0
+        return self.score / self.attempts * 100
+
+
+def main():
+    """Run a short practice session in the terminal."""
+    trainer = MusicScaleTrainer()
+    for _ in range(3):
+        notes, options = trainer.new_question()
+        print("Notes:", ", ".join(notes))
+        print("Options:", ", ".join(options))
+        answer = input("Which scale? ").strip()
+        print("Correct!" if trainer.check_answer(answer) else f"It was {trainer.current_scale}")
+    print(f"Accuracy: {trainer.accuracy():.1f}%")
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+CANNED_TESTS = '''"""
+Test cases for Music Scale Trainer
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mst_app import MusicScaleTrainer
+
+
+@pytest.fixture
+def trainer():
+    return MusicScaleTrainer()
+
+
+def test_initial_score(trainer):
+    assert trainer.score == 0
+    assert trainer.attempts == 0
+
+
+def test_default_difficulty(trainer):
+    assert trainer.difficulty == "Easy"
+
+
+def test_scales_loaded(trainer):
+    assert "C Major" in trainer.scales
+    assert len(trainer.scales["C Major"]) == 7
+
+
+def test_set_difficulty(trainer):
+    trainer.set_difficulty("Hard")
+    assert trainer.difficulty == "Hard"
+
+
+def test_invalid_difficulty(trainer):
+    with pytest.raises(ValueError):
+        trainer.set_difficulty("Impossible")
+
+
+def test_question_contains_answer(trainer):
+    notes, options = trainer.new_question(random.Random(1))
+    assert trainer.current_scale in options
+    assert notes == trainer.scales[trainer.current_scale]
+
+
+def test_easy_option_count(trainer):
+    _, options = trainer.new_question(random.Random(2))
+    assert len(options) == 3
+
+
+def test_correct_answer_scores(trainer):
+    trainer.new_question(random.Random(3))
+    assert trainer.check_answer(trainer.current_scale)
+    assert trainer.score == 1
+
+
+def test_wrong_answer_does_not_score(trainer):
+    trainer.new_question(random.Random(4))
+    assert not trainer.check_answer("Not A Scale")
+    assert trainer.score == 0
+    assert trainer.attempts == 1
+
+
+def test_answer_without_question(trainer):
+    with pytest.raises(RuntimeError):
+        trainer.check_answer("C Major")
+
+
+def test_accuracy(trainer):
+    trainer.new_question(random.Random(5))
+    trainer.check_answer(trainer.current_scale)
+    trainer.check_answer("Not A Scale")
+    assert trainer.accuracy() == 50.0
+'''
+
+
+class FakeLLMConfig:
+    """
+    Behaviour of the fake backend.
+    """
+
+    def __init__(self, latency_s: float = 0.0, latency_distribution: str = "constant",
+                 latency_spread: float = 0.0, tokens_per_second: float = 0.0,
+                 chunk_tokens: int = 8, error_rate: float = 0.0,
+                 error_kinds: List[str] = None, completion_tokens: int = None,
+                 prompt_cache_min_tokens: int = 1024, seed: int = 0):
+        """
+        Initialize the configuration.
+
+        Args:
+            latency_s: Mean time to first token
+            latency_distribution: "constant", "uniform", "lognormal" or "exponential"
+            latency_spread: Half-width for uniform, sigma for lognormal
+            tokens_per_second: Generation speed after the first token (0 = instant)
+            chunk_tokens: Tokens per streamed chunk
+            error_rate: Probability that a call fails
+            error_kinds: Errors to inject: "rate_limit", "timeout", "server"
+            completion_tokens: Fixed completion token count (default: estimated from text)
+            prompt_cache_min_tokens: Shortest prompt whose repeated prefix is
+                reported as cached, like the provider's prefix cache
+            seed: Seed for latency and error sampling
+        """
+        if latency_distribution not in ("constant", "uniform", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.latency_s = latency_s
+        self.latency_distribution = latency_distribution
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.error_rate = error_rate
+        self.error_kinds = list(error_kinds or ["rate_limit"])
+        self.completion_tokens = completion_tokens
+        self.prompt_cache_min_tokens = prompt_cache_min_tokens
+        self.seed = seed
+
+
+class FakeBackend:
+    """
+    Produces canned completions with configurable latency and failures.
+    """
+
+    def __init__(self, config: FakeLLMConfig = None):
+        """
+        Initialize the backend.
+
+        Args:
+            config: Fake behaviour (defaults to instant, error-free responses)
+        """
+        self.config = config or FakeLLMConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._seen_prefixes = set()
+        self.calls = 0
+
+    def plan(self, **kwargs) -> Dict[str, Any]:
+        """
+        Decide the outcome of one completion request.
+
+        Returns:
+            Dictionary with the response text, token counts, latencies and an
+            optional error to raise
+        """
+        messages = kwargs.get("messages", [])
+        model = kwargs.get("model", "fake-model")
+        text = self._canned_text(messages)
+
+        prompt_tokens = sum(_estimate_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = self.config.completion_tokens or _estimate_tokens(text)
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens:
+            completion_tokens = min(completion_tokens, max_tokens)
+
+        with self._lock:
+            self.calls += 1
+            cached_tokens = self._cached_prefix_tokens(messages, prompt_tokens)
+            first_token_s = self._sample_latency()
+            failed = self._random.random() < self.config.error_rate
+            error_kind = self._random.choice(self.config.error_kinds) if failed else None
+
+        generation_s = 0.0
+        if self.config.tokens_per_second > 0:
+            generation_s = completion_tokens / self.config.tokens_per_second
+
+        return {
+            "model": model,
+            "text": text,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "first_token_s": first_token_s,
+            "generation_s": generation_s,
+            "error": error_kind
+        }
+
+    def completion(self, plan: Dict[str, Any]) -> ChatCompletion:
+        """Build a non-streamed ChatCompletion for a plan."""
+        return ChatCompletion.model_validate({
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": plan["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": plan["text"]}
+            }],
+            "usage": _usage(plan)
+        })
+
+    def chunks(self, plan: Dict[str, Any], include_usage: bool) -> List[ChatCompletionChunk]:
+        """Split a plan's text into streamed ChatCompletionChunks."""
+        chunk_chars = self.config.chunk_tokens * 4
+        text = plan["text"]
+        base = {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": plan["model"]
+        }
+
+        chunks = []
+        for start in range(0, len(text), chunk_chars):
+            chunks.append(ChatCompletionChunk.model_validate(dict(base, choices = [{
+                "index": 0,
+                "delta": {"content": text[start:start + chunk_chars]},
+                "finish_reason": None
+            }])))
+        chunks.append(ChatCompletionChunk.model_validate(dict(base, choices = [{
+            "index": 0, "delta": {}, "finish_reason": "stop"
+        }])))
+        if include_usage:
+            chunks.append(ChatCompletionChunk.model_validate(dict(base, choices = [],
+                                                                  usage = _usage(plan))))
+        return chunks
+
+    def timeout_s(self, plan: Dict[str, Any], kwargs: Dict[str, Any]) -> Optional[float]:
+        """
+        Check a plan against the request's timeout.
+
+        Returns:
+            Seconds after which the request times out, or None if it finishes in time
+        """
+        timeout = kwargs.get("timeout")
+        if not isinstance(timeout, (int, float)):
+            return None
+        needed = plan["first_token_s"]
+        if not kwargs.get("stream"):
+            needed += plan["generation_s"]
+        return timeout if needed > timeout else None
+
+    def timeout_error(self) -> Exception:
+        """Build the error raised when a request times out."""
+        request = httpx.Request("POST", "http://fake-llm/v1/chat/completions")
+        return openai.APITimeoutError(request = request)
+
+    def error(self, plan: Dict[str, Any]) -> Exception:
+        """Build the injected API error for a failed plan."""
+        request = httpx.Request("POST", "http://fake-llm/v1/chat/completions")
+        if plan["error"] == "timeout":
+            return openai.APITimeoutError(request = request)
+        if plan["error"] == "server":
+            return openai.InternalServerError("Injected server error",
+                                              response = httpx.Response(500, request = request),
+                                              body = None)
+        return openai.RateLimitError("Injected rate limit",
+                                     response = httpx.Response(429, request = request),
+                                     body = None)
+
+    def _cached_prefix_tokens(self, messages: List[Dict], prompt_tokens: int) -> int:
+        """
+        Simulate provider prefix caching (caller holds the lock).
+
+        Leading messages seen in an earlier request count as cached, in
+        128-token blocks, once the prompt is long enough.
+        """
+        cached = 0
+        prefix = ()
+        prefix_tokens = 0
+        for message in messages:
+            prefix += ((message.get("role"), message.get("content") or ""),)
+            prefix_tokens += _estimate_tokens(message.get("content") or "")
+            key = hash(prefix)
+            if key in self._seen_prefixes:
+                cached = prefix_tokens
+            self._seen_prefixes.add(key)
+
+        if prompt_tokens < self.config.prompt_cache_min_tokens:
+            return 0
+        return cached // 128 * 128
+
+    def _sample_latency(self) -> float:
+        """Sample a time-to-first-token (caller holds the lock)."""
+        mean = self.config.latency_s
+        spread = self.config.latency_spread
+        kind = self.config.latency_distribution
+
+        if mean <= 0:
+            return 0.0
+        if kind == "uniform":
+            return max(0.0, self._random.uniform(mean - spread, mean + spread))
+        if kind == "lognormal":
+            sigma = spread or 0.5
+            return self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        if kind == "exponential":
+            return self._random.expovariate(1 / mean)
+        return mean
+
+    def _canned_text(self, messages: List[Dict]) -> str:
+        """Pick the canned response matching the agent's system prompt."""
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        if "requirements analysis" in system:
+            return json.dumps(CANNED_REQUIREMENTS, indent = 2)
+        if "pytest" in system:
+            return f"```python\n{CANNED_TESTS}```"
+        return f"```python\n{CANNED_CODE}```"
+
+
+class _Completions:
+    """Fake of client.chat.completions."""
+
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    def create(self, **kwargs):
+        """Fake chat.completions.create()."""
+        plan = self._backend.plan(**kwargs)
+        timeout = self._backend.timeout_s(plan, kwargs)
+        if timeout is not None:
+            time.sleep(timeout)
+            raise self._backend.timeout_error()
+
+        time.sleep(plan["first_token_s"])
+        if plan["error"]:
+            raise self._backend.error(plan)
+
+        if not kwargs.get("stream"):
+            time.sleep(plan["generation_s"])
+            return self._backend.completion(plan)
+
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return _FakeStream(self._backend.chunks(plan, include_usage), plan["generation_s"])
+
+
+class _AsyncCompletions:
+    """Fake of the async client.chat.completions."""
+
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    async def create(self, **kwargs):
+        """Fake async chat.completions.create()."""
+        plan = self._backend.plan(**kwargs)
+        timeout = self._backend.timeout_s(plan, kwargs)
+        if timeout is not None:
+            await asyncio.sleep(timeout)
+            raise self._backend.timeout_error()
+
+        await asyncio.sleep(plan["first_token_s"])
+        if plan["error"]:
+            raise self._backend.error(plan)
+
+        if not kwargs.get("stream"):
+            await asyncio.sleep(plan["generation_s"])
+            return self._backend.completion(plan)
+
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return _AsyncFakeStream(self._backend.chunks(plan, include_usage), plan["generation_s"])
+
+
+class _FakeStream:
+    """Iterable, closable stream of chunks paced over the generation time."""
+
+    def __init__(self, chunks: List[ChatCompletionChunk], generation_s: float):
+        self._chunks = chunks
+        self._delay = generation_s / max(1, len(chunks) - 1)
+
+    def __iter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if index and self._delay:
+                time.sleep(self._delay)
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Nothing to release."""
+
+
+class _AsyncFakeStream(_FakeStream):
+    """Async version of _FakeStream."""
+
+    async def __aiter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if index and self._delay:
+                await asyncio.sleep(self._delay)
+            yield chunk
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class FakeOpenAI:
+    """
+    In-process stand-in for openai.OpenAI.
+    """
+
+    def __init__(self, backend: FakeBackend = None):
+        """
+        Initialize the fake client.
+
+        Args:
+            backend: Shared fake backend (a default one is created if omitted)
+        """
+        self.backend = backend or FakeBackend()
+        self.chat = _Chat(_Completions(self.backend))
+
+    def close(self):
+        """Nothing to release."""
+
+
+class AsyncFakeOpenAI:
+    """
+    In-process stand-in for openai.AsyncOpenAI.
+    """
+
+    def __init__(self, backend: FakeBackend = None):
+        """
+        Initialize the fake client.
+
+        Args:
+            backend: Shared fake backend (a default one is created if omitted)
+        """
+        self.backend = backend or FakeBackend()
+        self.chat = _Chat(_AsyncCompletions(self.backend))
+
+
+class _Chat:
+    """Fake of client.chat."""
+
+    def __init__(self, completions):
+        self.completions = completions
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def _usage(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Usage block for a plan."""
+    return {
+        "prompt_tokens": plan["prompt_tokens"],
+        "completion_tokens": plan["completion_tokens"],
+        "total_tokens": plan["prompt_tokens"] + plan["completion_tokens"],
+        "prompt_tokens_details": {"cached_tokens": plan["cached_tokens"]}
+    }
+
+
+def serve(host: str = "127.0.0.1", port: int = 8089, config: FakeLLMConfig = None):
+    """
+    Serve the fake backend as an OpenAI-compatible HTTP endpoint.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        config: Fake behaviour
+
+    Returns:
+        The running server; its thread is a daemon. Call shutdown() to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    backend = FakeBackend(config)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            plan = backend.plan(**request)
+            time.sleep(plan["first_token_s"])
+
+            if plan["error"]:
+                status = {"rate_limit": 429, "timeout": 504, "server": 500}[plan["error"]]
+                self._send_json(status, {"error": {"message": f"Injected {plan['error']}"}})
+                return
+
+            if not request.get("stream"):
+                time.sleep(plan["generation_s"])
+                self._send_json(200, backend.completion(plan).model_dump(exclude_none = True))
+                return
+
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            stream = _FakeStream(backend.chunks(plan, include_usage), plan["generation_s"])
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in stream:
+                self._write_chunk(f"data: {chunk.model_dump_json(exclude_none = True)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _send_json(self, status: int, body: Dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _write_chunk(self, text: str):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    return server
+
+
+def main():
+    """Run the fake backend as a standalone HTTP server."""
+    parser = argparse.ArgumentParser(description = "OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8089)
+    parser.add_argument("--latency", type = float, default = 0.0,
+                        help = "mean time to first token in seconds")
+    parser.add_argument("--distribution", default = "constant",
+                        choices = ["constant", "uniform", "lognormal", "exponential"])
+    parser.add_argument("--spread", type = float, default = 0.0,
+                        help = "uniform half-width or lognormal sigma")
+    parser.add_argument("--tokens-per-second", type = float, default = 0.0)
+    parser.add_argument("--error-rate", type = float, default = 0.0)
+    parser.add_argument("--prompt-cache-min-tokens", type = int, default = 1024,
+                        help = "shortest prompt whose repeated prefix is reported as cached")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, FakeLLMConfig(
+        latency_s = args.latency,
+        latency_distribution = args.distribution,
+        latency_spread = args.spread,
+        tokens_per_second = args.tokens_per_second,
+        error_rate = args.error_rate,
+        prompt_cache_min_tokens = args.prompt_cache_min_tokens,
+        seed = args.seed
+    ))
+    print(f"[Mock LLM] Serving on http://{args.host}:{server.server_port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+LLM Rate Limiter
+Author: [Your Name] - [Student ID]
+
+Shared scheduler for LLM calls that keeps the process under the provider's
+tokens-per-minute (TPM) and requests-per-minute (RPM) budgets. Each call
+reserves its estimated tokens before it is sent; when a budget is used up
+the caller waits its turn (first come, first served) instead of getting a
+rate-limit error. Once the real usage is known the reservation is settled,
+so unused max_tokens are given back. Given-back tokens shorten the wait of
+later calls but never release them before a call that queued earlier.
+"""
+
+from typing import Dict, Any, List, Optional
+import asyncio
+import threading
+import time
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    Estimate the tokens a chat completion counts against the TPM budget.
+
+    Providers reserve the prompt plus max_tokens up front. The prompt is
+    estimated at about four characters per token plus a few tokens of
+    per-message overhead.
+
+    Args:
+        messages: OpenAI chat messages
+        max_tokens: Completion token limit of the request
+
+    Returns:
+        Estimated token count
+    """
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + 4 * len(messages) + 3 + max_tokens
+
+
+class Reservation:
+    """
+    Tokens reserved for one LLM call.
+    """
+
+    __slots__ = ("tokens", "wait_s")
+
+    def __init__(self, tokens: int, wait_s: float):
+        self.tokens = tokens
+        self.wait_s = wait_s
+
+
+class RateLimiter:
+    """
+    Token buckets for tokens and requests per minute, shared by all agents.
+    """
+
+    def __init__(self, tokens_per_minute: int = None, requests_per_minute: int = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            tokens_per_minute: TPM budget (None for no token limit)
+            requests_per_minute: RPM budget (None for no request limit)
+        """
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+
+        # Buckets start full and may go negative; the deficit is the queue
+        self._tokens = float(tokens_per_minute or 0)
+        self._requests = float(requests_per_minute or 0)
+        self._updated = time.monotonic()
+        # Release time of the last queued call; later calls never go before it
+        self._next_free = self._updated
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.delayed = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+
+    def acquire(self, tokens: int) -> Reservation:
+        """
+        Wait until a call of the given size fits in the budgets.
+
+        Args:
+            tokens: Estimated tokens for the call
+
+        Returns:
+            Reservation to pass to settle() once usage is known
+        """
+        reservation = self._reserve(tokens)
+        if reservation.wait_s > 0:
+            try:
+                time.sleep(reservation.wait_s)
+            finally:
+                self._dequeue()
+        return reservation
+
+    async def aacquire(self, tokens: int) -> Reservation:
+        """
+        Async version of acquire() that waits without blocking the event loop.
+
+        Args:
+            tokens: Estimated tokens for the call
+
+        Returns:
+            Reservation to pass to settle() once usage is known
+        """
+        reservation = self._reserve(tokens)
+        if reservation.wait_s > 0:
+            try:
+                await asyncio.sleep(reservation.wait_s)
+            finally:
+                self._dequeue()
+        return reservation
+
+    def try_acquire(self, tokens: int) -> Optional[Reservation]:
+        """
+        Reserve a call only if it fits in the budgets right now.
+
+        Used for optional calls such as hedged requests, which are not worth
+        queueing behind calls that are already waiting.
+
+        Args:
+            tokens: Estimated tokens for the call
+
+        Returns:
+            Reservation to pass to settle(), or None if the call would wait
+        """
+        with self._lock:
+            self._refill()
+            if self._next_free > self._updated:
+                return None
+            if self.tokens_per_minute and self._tokens < min(tokens, self.tokens_per_minute):
+                return None
+            if self.requests_per_minute and self._requests < 1:
+                return None
+            return self._take(tokens)
+
+    def settle(self, reservation: Reservation, actual_tokens: int):
+        """
+        Replace a reservation's estimate with the tokens actually used.
+
+        Args:
+            reservation: Reservation returned by acquire()
+            actual_tokens: Total tokens reported by the API
+        """
+        with self._lock:
+            self.actual_tokens += actual_tokens
+            if self.tokens_per_minute:
+                self._refill()
+                self._tokens = min(self._tokens + reservation.tokens - actual_tokens,
+                                   self.tokens_per_minute)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        with self._lock:
+            return {
+                "tokensPerMinute": self.tokens_per_minute,
+                "requestsPerMinute": self.requests_per_minute,
+                "requests": self.requests,
+                "delayedRequests": self.delayed,
+                "queueDepth": self.queue_depth,
+                "maxQueueDepth": self.max_queue_depth,
+                "totalWaitS": round(self.total_wait_s, 3),
+                "avgWaitMs": round(self.total_wait_s / self.requests * 1000, 1) if self.requests else 0.0,
+                "maxWaitMs": round(self.max_wait_s * 1000, 1),
+                "estimatedTokens": self.estimated_tokens,
+                "actualTokens": self.actual_tokens
+            }
+
+    def _reserve(self, tokens: int) -> Reservation:
+        """Take the call out of both buckets and work out how long it must wait."""
+        with self._lock:
+            self._refill()
+            return self._take(tokens)
+
+    def _take(self, tokens: int) -> Reservation:
+        """Deduct a call from the buckets (call with the lock held)."""
+        wait_s = 0.0
+        if self.tokens_per_minute:
+            # A call bigger than the whole budget would never fit; let it through alone
+            tokens = min(tokens, self.tokens_per_minute)
+            self._tokens -= tokens
+            if self._tokens < 0:
+                wait_s = -self._tokens / self.tokens_per_minute * 60
+        if self.requests_per_minute:
+            self._requests -= 1
+            if self._requests < 0:
+                wait_s = max(wait_s, -self._requests / self.requests_per_minute * 60)
+        wait_s = max(wait_s, self._next_free - self._updated)
+        if wait_s > 0:
+            self._next_free = self._updated + wait_s
+
+        self.requests += 1
+        self.estimated_tokens += tokens
+        self.total_wait_s += wait_s
+        self.max_wait_s = max(self.max_wait_s, wait_s)
+        if wait_s > 0:
+            self.delayed += 1
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        return Reservation(tokens, wait_s)
+
+    def _dequeue(self):
+        """Record that a waiting call has been released."""
+        with self._lock:
+            self.queue_depth -= 1
+
+    def _refill(self):
+        """Add the budget earned since the last update (call with the lock held)."""
+        now = time.monotonic()
+        elapsed_min = (now - self._updated) / 60
+        self._updated = now
+        if self.tokens_per_minute:
+            self._tokens = min(self._tokens + elapsed_min * self.tokens_per_minute,
+                               self.tokens_per_minute)
+        if self.requests_per_minute:
+            self._requests = min(self._requests + elapsed_min * self.requests_per_minute,
+                                 self.requests_per_minute)
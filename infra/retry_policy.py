@@ -0,0 +1,137 @@
+"""
+LLM Retry Policy
+Author: [Your Name] - [Student ID]
+
+Timeouts, retries and hedging for LLM calls. Retryable failures (rate
+limits, timeouts, connection and 5xx errors) are retried with exponential
+backoff and full jitter, honouring the provider's Retry-After header. With
+hedging enabled, a call that is still running after the agent's recent p95
+latency gets a duplicate request and whichever finishes first wins.
+"""
+
+from typing import Optional
+from collections import deque
+import math
+import random
+import threading
+import openai
+
+
+class RetryPolicy:
+    """
+    How LLM calls are timed out, retried and hedged.
+    """
+
+    def __init__(self, timeout_s: float = 120.0, max_retries: int = 3,
+                 backoff_base_s: float = 0.5, backoff_max_s: float = 30.0,
+                 hedge: bool = False, hedge_percentile: float = 95,
+                 hedge_min_samples: int = 5, hedge_min_delay_s: float = 0.5,
+                 seed: int = None):
+        """
+        Initialize the policy.
+
+        Args:
+            timeout_s: Timeout for each request attempt
+            max_retries: Retries after the first attempt (0 disables retrying)
+            backoff_base_s: Backoff ceiling for the first retry; doubles per retry
+            backoff_max_s: Largest backoff ceiling
+            hedge: Send a duplicate request when a call runs long
+            hedge_percentile: Latency percentile after which to hedge
+            hedge_min_samples: Completed calls needed before hedging starts
+            hedge_min_delay_s: Never hedge sooner than this
+            seed: Seed for the backoff jitter
+        """
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Check whether a failed request is worth repeating.
+
+        Args:
+            error: Exception raised by the request
+
+        Returns:
+            True for rate limits, timeouts, connection errors and 5xx/408/409
+        """
+        if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, TimeoutError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in (408, 409) or error.status_code >= 500
+        return False
+
+    def backoff_s(self, retry: int, error: Exception = None) -> float:
+        """
+        Delay before a retry: full jitter over an exponentially growing ceiling.
+
+        Args:
+            retry: Number of retries already made
+            error: The failure being retried (its Retry-After header is honoured)
+
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.backoff_max_s, self.backoff_base_s * 2 ** retry)
+        with self._lock:
+            delay = self._random.uniform(0, ceiling)
+        return max(delay, _retry_after_s(error))
+
+
+class LatencyWindow:
+    """
+    Recent completion latencies of one agent, used to pick the hedge delay.
+    """
+
+    def __init__(self, size: int = 200):
+        """
+        Initialize the window.
+
+        Args:
+            size: Latest samples kept
+        """
+        self._samples = deque(maxlen = size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        """Record a completed call's latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self, policy: RetryPolicy) -> Optional[float]:
+        """
+        Get how long to wait before hedging.
+
+        Args:
+            policy: Retry policy with the hedging settings
+
+        Returns:
+            Seconds, or None when hedging is off or there are too few samples
+        """
+        if not policy.hedge:
+            return None
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < policy.hedge_min_samples:
+            return None
+        rank = max(1, math.ceil(policy.hedge_percentile / 100 * len(samples)))
+        return max(samples[rank - 1], policy.hedge_min_delay_s)
+
+
+def _retry_after_s(error: Exception) -> float:
+    """Seconds requested by a Retry-After header on an API error (0 if none)."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return 0.0
+    value = response.headers.get("retry-after")
+    try:
+        return max(float(value), 0.0) if value else 0.0
+    except ValueError:
+        return 0.0
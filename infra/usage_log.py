@@ -0,0 +1,246 @@
+"""
+Usage Time Series
+Author: [Your Name] - [Student ID]
+
+Append-only JSONL log with one compact record per workflow run (run ID,
+per-stage durations, tokens, models and outcome), so latency and token
+regressions can be tracked across runs. When the active file grows past
+its size limit it is gzipped into a numbered segment and a new file is
+started; the oldest segments are deleted.
+
+Queries stream the segments line by line and only keep the values being
+aggregated:
+    python -m infra.usage_log --field stages.code --since 7d
+    python -m infra.usage_log --field tokens.total --group-by day
+"""
+
+from typing import Dict, Any, Iterator, List, Optional
+import argparse
+import datetime
+import gzip
+import json
+import math
+import os
+import re
+import shutil
+import threading
+
+
+class UsageLog:
+    """
+    Rotating JSONL time series of workflow runs.
+    """
+
+    def __init__(self, path: str = "reports/usage.jsonl", max_bytes: int = 5 * 1024 * 1024,
+                 backups: int = 10):
+        """
+        Initialize the log.
+
+        Args:
+            path: Active JSONL file; rotated segments are <path>.<n>.gz
+            max_bytes: Size at which the active file is rotated
+            backups: Rotated segments kept (older ones are deleted)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]):
+        """
+        Add a record, rotating the file first if it is full.
+
+        Args:
+            record: JSON-serializable run record
+        """
+        line = json.dumps(record, separators = (",", ":"), default = str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding = "utf-8") as f:
+                f.write(line)
+
+    def segments(self) -> List[str]:
+        """Get the log's files, oldest first."""
+        rotated = []
+        for n in range(self.backups, 0, -1):
+            segment = f"{self.path}.{n}.gz"
+            if os.path.exists(segment):
+                rotated.append(segment)
+        if os.path.exists(self.path):
+            rotated.append(self.path)
+        return rotated
+
+    def records(self, since: datetime.datetime = None,
+                until: datetime.datetime = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records, oldest first.
+
+        Args:
+            since: Skip records before this time (naive times are UTC)
+            until: Skip records at or after this time (naive times are UTC)
+
+        Yields:
+            Run records
+        """
+        since = _as_utc(since) if since else None
+        until = _as_utc(until) if until else None
+        for segment in self.segments():
+            opener = gzip.open if segment.endswith(".gz") else open
+            try:
+                with opener(segment, "rt", encoding = "utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # partially written line
+                        ts = _as_utc(datetime.datetime.fromisoformat(record["ts"]))
+                        if (since is None or ts >= since) and (until is None or ts < until):
+                            yield record
+            except (FileNotFoundError, EOFError):
+                continue  # rotated away or still being written
+
+    def query(self, field: str, since: datetime.datetime = None,
+              until: datetime.datetime = None, where: Dict[str, str] = None,
+              group_by: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate one numeric field over matching runs.
+
+        Args:
+            field: Dotted path into the record, e.g. "stages.code" or "tokens.total"
+            since: Only runs from this time on
+            until: Only runs before this time
+            where: Required values of other dotted fields, e.g. {"outcome": "ok"}
+            group_by: Dotted field to group by, or "day"
+
+        Returns:
+            {group: stats} with count, sum, mean, p50, p95, p99, min and max
+            (the single group is "all" without group_by)
+        """
+        groups = {}
+        for record in self.records(since, until):
+            if where and any(str(_lookup(record, key)) != value for key, value in where.items()):
+                continue
+            value = _lookup(record, field)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if group_by == "day":
+                group = record["ts"][:10]
+            elif group_by:
+                group = str(_lookup(record, group_by))
+            else:
+                group = "all"
+            groups.setdefault(group, []).append(value)
+
+        return {group: _summarize(values) for group, values in sorted(groups.items())}
+
+    def _rotate(self):
+        """Gzip the active file into segment 1, shifting older segments up."""
+        oldest = f"{self.path}.{self.backups}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for n in range(self.backups - 1, 0, -1):
+            segment = f"{self.path}.{n}.gz"
+            if os.path.exists(segment):
+                os.replace(segment, f"{self.path}.{n + 1}.gz")
+
+        tmp_path = f"{self.path}.1.gz.tmp"
+        with open(self.path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, f"{self.path}.1.gz")
+        os.remove(self.path)
+
+
+def parse_since(value: str) -> datetime.datetime:
+    """
+    Parse a time filter: a relative age such as "7d", "12h" or "30m", or an
+    ISO date/time. ISO times without an offset are taken as UTC.
+
+    Args:
+        value: Filter text
+
+    Returns:
+        The point in time, in UTC
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw])", value.strip())
+    if match is None:
+        return _as_utc(datetime.datetime.fromisoformat(value))
+    unit = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[match.group(2)]
+    return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(**{unit: float(match.group(1))})
+
+
+def _as_utc(moment: datetime.datetime) -> datetime.datetime:
+    """Convert a time to UTC, taking naive times (older records) as UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo = datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc)
+
+
+def _lookup(record: Dict[str, Any], field: str) -> Any:
+    """Follow a dotted path into a record (None if missing)."""
+    value = record
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _summarize(values: List[float]) -> Dict[str, Any]:
+    """Count, mean and nearest-rank percentiles of a list of values (rounded)."""
+    values.sort()
+    return {
+        "count": len(values),
+        "sum": round(sum(values), 4),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "p99": round(_percentile(values, 99), 4),
+        "min": round(values[0], 4),
+        "max": round(values[-1], 4)
+    }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Answer an aggregation query over the usage log."""
+    parser = argparse.ArgumentParser(description = "Query the workflow usage time series")
+    parser.add_argument("--path", default = "reports/usage.jsonl",
+                        help = "active usage log (default: reports/usage.jsonl)")
+    parser.add_argument("--field", default = "duration_s",
+                        help = "numeric field, e.g. stages.code, tokens.total (default: duration_s)")
+    parser.add_argument("--since", default = None,
+                        help = "only runs newer than this age (7d, 12h, 30m) or ISO time")
+    parser.add_argument("--until", default = None,
+                        help = "only runs older than this age or ISO time")
+    parser.add_argument("--where", action = "append", default = [], metavar = "FIELD=VALUE",
+                        help = "only runs where a field has a value (repeatable)")
+    parser.add_argument("--group-by", default = None,
+                        help = "field to group by, or 'day'")
+    args = parser.parse_args(argv)
+
+    where = dict(item.split("=", 1) for item in args.where)
+    log = UsageLog(args.path)
+    result = log.query(
+        args.field,
+        since = parse_since(args.since) if args.since else None,
+        until = parse_since(args.until) if args.until else None,
+        where = where,
+        group_by = args.group_by
+    )
+    if not result:
+        print(f"No runs with a numeric '{args.field}' match the query")
+        return
+    print(json.dumps(result, indent = 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,12 @@ Main Entry Point for Multi-Agent System
 from dotenv import load_dotenv
 load_dotenv()
 
+import argparse
 import os
 import sys
 from orchestrator import Orchestrator
+from infra.http_pool import configure_client_registry
+from infra.retry_policy import RetryPolicy
 
 def main():
     """
@@ -20,34 +23,135 @@ def main():
     print("Using OpenAI GPT-4o-mini API")
     print("="*70)
 
+    args = parse_args()
+
+    # LLM backend (OpenAI or the offline mock), shared rate limits and retry policy
+    configure_client_registry(
+        backend = args.backend,
+        base_url = os.getenv("LLM_BASE_URL") or None,
+        tokens_per_minute = args.tpm,
+        requests_per_minute = args.rpm,
+        retry_policy = RetryPolicy(timeout_s = args.timeout, max_retries = args.retries,
+                                   hedge = args.hedge)
+    )
+    if args.backend == "fake":
+        print("\n[Main] Using the offline mock LLM backend")
+    if args.tpm or args.rpm:
+        print(f"\n[Main] LLM rate limits: {args.tpm or 'unlimited'} tokens/min, "
+              f"{args.rpm or 'unlimited'} requests/min")
+
     # Check for API key - now checking for Google API key
     # Check for API key - now using OpenAI
     api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and args.backend == "fake":
+        api_key = "fake-key"
 
     if not api_key:
         print("\n ERROR: OPENAI_API_KEY environment variable not set")
         print("\nPlease set your API key in .env file")
         sys.exit(1)
 
+    # Batch mode builds one orchestrator per job
+    if args.batch:
+        run_batch_mode(api_key, args)
+        return
+
     # Initialize orchestrator
     print("\n[Main] Initializing Multi-Agent System...")
-    orchestrator = Orchestrator(api_key)
+    orchestrator = Orchestrator(api_key, speculate = not args.no_speculate)
+
+    # Record per-message spans on the MCP bus
+    tracer = orchestrator.mcp_bus.enable_tracing() if args.trace else None
 
     # Check if GUI mode or CLI mode
-    if len(sys.argv) > 1 and sys.argv[1] == "--cli":
+    if args.cli or args.resume:
         # CLI mode for testing
-        run_cli_mode(orchestrator)
+        run_cli_mode(orchestrator, args.resume)
     else:
         # GUI mode (default)
         run_gui_mode(orchestrator)
 
+    if tracer is not None:
+        tracer.export(args.trace)
+        print(f"\n[Main] MCP trace written to {args.trace}")
+
+
+def parse_args():
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description = "Music Scale Trainer AI code generation system")
+    parser.add_argument("--cli", action = "store_true",
+                        help = "run the built-in MST requirements without the GUI")
+    parser.add_argument("--batch", metavar = "SOURCE",
+                        help = "run every requirement document in a .jsonl file or directory")
+    parser.add_argument("--workers", type = int, default = 4,
+                        help = "number of concurrent workflows in batch mode (default: 4)")
+    parser.add_argument("--worker-mode", choices = ["thread", "async"], default = "thread",
+                        help = "run batch workers as threads or async tasks (default: thread)")
+    parser.add_argument("--output", default = "batch_output",
+                        help = "root output directory for batch mode (default: batch_output)")
+    parser.add_argument("--results", default = None,
+                        help = "results JSONL path for batch mode (default: <output>/results.jsonl)")
+    parser.add_argument("--resume", metavar = "RUN_ID", default = None,
+                        help = "continue an interrupted CLI run from its checkpoint ('latest' for the newest)")
+    parser.add_argument("--trace", metavar = "PATH", default = None,
+                        help = "trace MCP messages and write latency histograms to PATH")
+    parser.add_argument("--backend", choices = ["openai", "fake"],
+                        default = os.getenv("LLM_BACKEND", "openai"),
+                        help = "LLM backend; 'fake' runs offline against a mock (default: openai)")
+    parser.add_argument("--tpm", type = int, default = int(os.getenv("LLM_TPM", "0")) or None,
+                        help = "tokens-per-minute budget shared by all LLM calls")
+    parser.add_argument("--rpm", type = int, default = int(os.getenv("LLM_RPM", "0")) or None,
+                        help = "requests-per-minute budget shared by all LLM calls")
+    parser.add_argument("--timeout", type = float, default = 120.0,
+                        help = "timeout in seconds for each LLM request attempt (default: 120)")
+    parser.add_argument("--retries", type = int, default = 3,
+                        help = "retries for rate-limited, timed-out or failed LLM calls (default: 3)")
+    parser.add_argument("--hedge", action = "store_true",
+                        help = "send a duplicate LLM request when a call runs past its p95 latency")
+    parser.add_argument("--no-speculate", action = "store_true",
+                        help = "wait for parsed requirements before starting code and test generation")
+    return parser.parse_args()
+
+
+def run_batch_mode(api_key: str, args):
+    """
+    Run the workflow over a batch of requirement documents.
+
+    Args:
+        api_key: OpenAI API key
+        args: Parsed command line arguments
+    """
+    from batch_runner import BatchRunner, load_jobs
+
+    print(f"\n[Main] Running in batch mode: {args.batch}")
+    jobs = load_jobs(args.batch)
+
+    runner = BatchRunner(
+        api_key,
+        output_dir = args.output,
+        workers = args.workers,
+        mode = args.worker_mode,
+        results_path = args.results,
+        speculate = not args.no_speculate
+    )
+    results = runner.run(jobs)
+
+    if any(r["status"] != "ok" for r in results):
+        sys.exit(1)
 
-def run_cli_mode(orchestrator: Orchestrator):
+
+def run_cli_mode(orchestrator: Orchestrator, resume: str = None):
     """
     Run in CLI mode for testing.
 
     Args:
         orchestrator: The orchestrator instance
+        resume: Run ID to continue from its checkpoint instead of starting over
     """
     print("\n[Main] Running in CLI mode")
 
@@ -62,10 +166,22 @@ def run_cli_mode(orchestrator: Orchestrator):
     master all major and minor scales.
     """
 
-    print("\n[Main] Processing default MST requirements...")
+    if resume:
+        run_id = orchestrator.checkpoints.latest_run() if resume == "latest" else resume
+        if run_id is None:
+            print("\n ERROR: No checkpointed runs to resume")
+            sys.exit(1)
+        print(f"\n[Main] Resuming run {run_id}...")
+        try:
+            result = orchestrator.resume_workflow(run_id)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"\n ERROR: {e}")
+            sys.exit(1)
+    else:
+        print("\n[Main] Processing default MST requirements...")
 
-    # Run the workflow
-    result = orchestrator.run_workflow(requirements)
+        # Run the workflow
+        result = orchestrator.run_workflow(requirements)
 
     print("\n" + "="*70)
     print("RESULTS SUMMARY")
@@ -3,16 +3,38 @@ Orchestrator
 Author: [Your Name] - [Student ID]
 
 Coordinates the multi-agent system workflow using MCP.
-Manages the flow: Requirements -> Code Generation -> Test Generation
+Manages the flow: Requirements -> Code Generation -> Test Generation,
+running independent stages concurrently. LLM stages are fingerprinted by
+the request they would send, so unchanged stages are reused from earlier
+runs instead of being regenerated. Stages that only need the parsed
+requirements are started speculatively from a predicted requirements
+profile while the requirements are still being parsed.
 """
 
 from infra.mcp_bus import MCPBus, MCPMessage, MCPTool
 from agents.requirements_agent import RequirementsAgent
 from agents.code_agents import CodeGenerationAgent
 from agents.test_agent import TestGenerationAgent
-from typing import Dict
+from agents.base_agent import CallRecord, record_calls
+from infra.llm_cache import LLMResponseCache
+from infra.http_pool import ClientRegistry, get_client_registry
+from infra.stage_graph import StageGraph
+from infra.code_checks import validate_python
+from infra.checkpoint import CheckpointStore
+from infra.artifact_writer import ArtifactWriter
+from infra.artifact_store import ArtifactStore
+from infra.metrics import MetricsRegistry, MetricsSnapshot
+from infra.usage_log import UsageLog
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import datetime
 import json
 import os
+import threading
+import time
+
+
+# Stage store key of the last parsed requirements (the speculation prediction)
+_PROFILE_KEY = LLMResponseCache.make_key({"speculation_profile": "requirements"})
 
 
 class Orchestrator:
@@ -20,20 +42,58 @@ class Orchestrator:
     Orchestrates the multi-agent workflow using MCP for communication.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, enable_cache: bool = True, clients: ClientRegistry = None,
+                 output_dir: str = "generated", reports_dir: str = "reports",
+                 checkpoint_dir: Optional[str] = ".cache/runs", speculate: bool = True,
+                 artifact_budget: int = 256 * 1024 * 1024):
         """
         Initialize the orchestrator and all agents.
 
         Args:
             api_key: Anthropic API key for agents
+            enable_cache: Serve repeated identical LLM requests from the response
+                cache and reuse unchanged stages from earlier runs
+            clients: Pooled client registry (defaults to the process-wide one)
+            output_dir: Directory for generated code and tests
+            reports_dir: Directory for usage reports
+            checkpoint_dir: Directory for per-run checkpoints (None disables them)
+            speculate: Start code and test generation from predicted requirements
+                while the real requirements are being parsed
+            artifact_budget: Size budget in bytes of the per-run artifact store
         """
-        # Initialize MCP bus
-        self.mcp_bus = MCPBus()
-
-        # Initialize all agents
-        self.requirements_agent = RequirementsAgent(api_key)
-        self.code_agent = CodeGenerationAgent(api_key)
-        self.test_agent = TestGenerationAgent(api_key)
+        self.output_dir = output_dir
+        self.reports_dir = reports_dir
+        # Each run saves into its own directory of the artifact store; finished
+        # runs are published to the fixed paths in output_dir
+        self.artifact_store = ArtifactStore(os.path.join(output_dir, ".runs"),
+                                            max_bytes = artifact_budget)
+        self.artifacts = ArtifactWriter(output_dir)
+        self._publish_lock = threading.Lock()
+        self.checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        self.speculate = speculate
+        self.last_requirements = None  # predicted profile for the next run
+
+        # Metrics written by the agents and the bus; each run exports its own share
+        # and appends a summary record to the usage time series
+        self.metrics = MetricsRegistry()
+        self.usage_log = UsageLog(os.path.join(reports_dir, "usage.jsonl"))
+
+        # Initialize MCP bus; messages beyond the in-memory window go to a log
+        self.mcp_bus = MCPBus(history_log = os.path.join(reports_dir, "mcp_history.jsonl.gz"),
+                              metrics = self.metrics)
+
+        # Shared response cache for all agents, and outputs of earlier stages
+        self.response_cache = LLMResponseCache() if enable_cache else None
+        self.stage_store = LLMResponseCache(cache_dir = ".cache/stages") if enable_cache else None
+
+        # Initialize all agents on one shared connection pool
+        self.clients = clients or get_client_registry()
+        self.requirements_agent = RequirementsAgent(api_key, cache = self.response_cache,
+                                                    clients = self.clients, metrics = self.metrics)
+        self.code_agent = CodeGenerationAgent(api_key, cache = self.response_cache,
+                                              clients = self.clients, metrics = self.metrics)
+        self.test_agent = TestGenerationAgent(api_key, cache = self.response_cache,
+                                              clients = self.clients, metrics = self.metrics)
 
         # Register agents with MCP bus
         self.mcp_bus.register_agent("RequirementsAgent", self.requirements_agent)
@@ -53,7 +113,7 @@ class Orchestrator:
             name = "save_code",
             description = "Save generated code to a file",
             handler = self._save_code_handler,
-            parameters = {"code": "string", "filename": "string"}
+            parameters = {"code": "string", "filename": "string", "run_id": "string"}
         )
         self.mcp_bus.register_tool(save_code_tool)
 
@@ -62,85 +122,529 @@ class Orchestrator:
             name = "save_tests",
             description = "Save generated tests to a file",
             handler = self._save_tests_handler,
-            parameters = {"test_code": "string", "filename": "string"}
+            parameters = {"test_code": "string", "filename": "string", "run_id": "string"}
         )
         self.mcp_bus.register_tool(save_test_tool)
 
-    def _save_code_handler(self, code: str, filename: str) -> str:
+        # Tool for checking that generated code parses. Parsing one file takes
+        # milliseconds, less than starting a process worker, so it uses the
+        # thread pool; heavier checks can use executor = "process".
+        validate_code_tool = MCPTool(
+            name = "validate_code",
+            description = "Parse generated Python code and summarize its structure",
+            handler = validate_python,
+            parameters = {"code": "string", "filename": "string"},
+            executor = "thread",
+            max_concurrency = 4,
+            timeout = 60
+        )
+        self.mcp_bus.register_tool(validate_code_tool)
+
+    def _save_code_handler(self, code: str, filename: str, run_id: str) -> Dict[str, Any]:
         """
         Handler for save_code tool.
 
         Args:
             code: Code to save
             filename: Filename to save to
+            run_id: Run whose artifact directory receives the file
 
         Returns:
-            Success message
+            Write report with a message and bytes written/skipped
         """
-        os.makedirs("generated", exist_ok = True)
-        filepath = os.path.join("generated", filename)
-        with open(filepath, "w") as f:
-            f.write(code)
-        return f"Code saved to {filepath}"
+        return self._save_artifact("Code", code, filename, run_id)
 
-    def _save_tests_handler(self, test_code: str, filename: str) -> str:
+    def _save_tests_handler(self, test_code: str, filename: str, run_id: str) -> Dict[str, Any]:
         """
         Handler for save_tests tool.
 
         Args:
             test_code: Test code to save
             filename: Filename to save to
+            run_id: Run whose artifact directory receives the file
 
         Returns:
-            Success message
+            Write report with a message and bytes written/skipped
         """
-        os.makedirs("generated", exist_ok = True)
-        filepath = os.path.join("generated", filename)
-        with open(filepath, "w") as f:
-            f.write(test_code)
-        return f"Tests saved to {filepath}"
-
-    def run_workflow(self, requirements_text: str) -> Dict:
+        return self._save_artifact("Tests", test_code, filename, run_id)
+
+    def _save_artifact(self, label: str, content: str, filename: str,
+                       run_id: str) -> Dict[str, Any]:
+        """Store an artifact in the run's directory, deduplicating identical content."""
+        stored = self.artifact_store.put(run_id, filename, content)
+        report = {
+            "path": stored["path"],
+            "filename": filename,
+            "sha256": stored["sha256"],
+            "deduplicated": stored["deduplicated"],
+            "bytes_written": 0 if stored["deduplicated"] else stored["bytes"],
+            "bytes_skipped": stored["bytes"] if stored["deduplicated"] else 0
+        }
+        if stored["deduplicated"]:
+            report["message"] = (f"{label} saved to {report['path']} "
+                                 f"(linked to identical content, {report['bytes_skipped']} bytes skipped)")
+        else:
+            report["message"] = (f"{label} saved to {report['path']} "
+                                 f"({report['bytes_written']} bytes written)")
+        return report
+
+    def run_workflow(self, requirements_text: str,
+                     on_partial: Callable[[MCPMessage], None] = None) -> Dict:
         """
         Run the complete workflow from requirements to code and tests.
 
+        The workflow is a dependency graph of stages; stages that don't
+        depend on each other (e.g. code and test generation) run concurrently.
+        A checkpoint is written after every stage so the run can be resumed
+        with resume_workflow().
+
         Args:
             requirements_text: Natural language requirements
+            on_partial: Optional callback receiving partial (streamed) agent responses
 
         Returns:
             Dictionary with all generated artifacts and tracking info
         """
-        print("\n" + "=" * 60)
-        print("STARTING MULTI-AGENT WORKFLOW")
-        print("=" * 60)
+        run = self._start_run(requirements_text)
+        with self.metrics.scope(run["metrics"]):
+            graph = self._build_workflow_graph(run, on_partial, use_async = False)
+            results = graph.run(run["completed"], self._checkpoint_handler(run, graph))
 
-        # Step 1: Parse requirements using MCP
-        print("\n[Step 1] Parsing requirements via MCP...")
-        req_message = MCPMessage(
-            sender = "Orchestrator",
-            receiver = "RequirementsAgent",
-            message_type = "process_request",
-            payload = requirements_text
-        )
-        req_response = self.mcp_bus.send_message(req_message)
-        structured_requirements = req_response.payload
-        print(
-            f"✓ Requirements parsed: {len(structured_requirements['requirements'].get('core_features', []))} features identified")
+        return self._finish_workflow(results, graph, run)
+
+    async def arun_workflow(self, requirements_text: str,
+                            on_partial: Callable[[MCPMessage], None] = None) -> Dict:
+        """
+        Async version of run_workflow().
+
+        Many workflows can run concurrently on one event loop; each LLM call
+        is awaited instead of blocking a thread.
+
+        Args:
+            requirements_text: Natural language requirements
+            on_partial: Optional callback receiving partial (streamed) agent responses
+
+        Returns:
+            Dictionary with all generated artifacts and tracking info
+        """
+        run = self._start_run(requirements_text)
+        with self.metrics.scope(run["metrics"]):
+            graph = self._build_workflow_graph(run, on_partial, use_async = True)
+            results = await graph.arun(run["completed"], self._checkpoint_handler(run, graph))
+
+        return self._finish_workflow(results, graph, run)
+
+    def resume_workflow(self, run_id: str,
+                        on_partial: Callable[[MCPMessage], None] = None) -> Dict:
+        """
+        Continue an interrupted workflow from its last checkpoint.
+
+        Completed stages are not run again and the agents' usage counters
+        are restored, so the usage report covers the whole run.
+
+        Args:
+            run_id: ID of the run to resume
+            on_partial: Optional callback receiving partial (streamed) agent responses
+
+        Returns:
+            Dictionary with all generated artifacts and tracking info
+
+        Raises:
+            FileNotFoundError: If the run has no checkpoint (e.g. it finished)
+            ValueError: If the checkpoint is of a completed run
+        """
+        run = self._resume_run(run_id)
+        with self.metrics.scope(run["metrics"]):
+            graph = self._build_workflow_graph(run, on_partial, use_async = False)
+            results = graph.run(run["completed"], self._checkpoint_handler(run, graph))
+
+        return self._finish_workflow(results, graph, run)
 
-        # Step 2: Generate code using MCP
-        print("\n[Step 2] Generating code via MCP...")
-        code_message = MCPMessage(
+    async def aresume_workflow(self, run_id: str,
+                               on_partial: Callable[[MCPMessage], None] = None) -> Dict:
+        """
+        Async version of resume_workflow().
+
+        Args:
+            run_id: ID of the run to resume
+            on_partial: Optional callback receiving partial (streamed) agent responses
+
+        Returns:
+            Dictionary with all generated artifacts and tracking info
+        """
+        run = self._resume_run(run_id)
+        with self.metrics.scope(run["metrics"]):
+            graph = self._build_workflow_graph(run, on_partial, use_async = True)
+            results = await graph.arun(run["completed"], self._checkpoint_handler(run, graph))
+
+        return self._finish_workflow(results, graph, run)
+
+    def _start_run(self, requirements_text: str) -> Dict[str, Any]:
+        """Create the bookkeeping for a new workflow run."""
+        self._print_banner("STARTING MULTI-AGENT WORKFLOW")
+        run = self._new_run(CheckpointStore.new_run_id(), requirements_text)
+        if self.checkpoints is not None:
+            self._save_checkpoint(run)
+            print(f"[Orchestrator] Run ID: {run['run_id']}")
+        return run
+
+    def _resume_run(self, run_id: str) -> Dict[str, Any]:
+        """Load a checkpoint and restore the agents' usage counters."""
+        if self.checkpoints is None:
+            raise ValueError("Checkpoints are disabled for this orchestrator")
+        checkpoint = self.checkpoints.load(run_id)
+        if checkpoint.get("status") == "complete":
+            raise ValueError(f"Run '{run_id}' already completed; there is nothing to resume")
+
+        self._print_banner(f"RESUMING WORKFLOW {run_id}")
+        run = self._new_run(run_id, checkpoint["requirements_text"])
+        run["completed"] = checkpoint["completed"]
+        run["usage"] = checkpoint["usage"]
+        run["resumed_stages"] = sorted(checkpoint["completed"])
+
+        for agent_name, counters in checkpoint["usage"].items():
+            self.mcp_bus.agents[agent_name].restore_counters(counters)
+
+        if run["resumed_stages"]:
+            print(f"[Orchestrator] Already complete: {', '.join(run['resumed_stages'])}")
+        return run
+
+    def _new_run(self, run_id: str, requirements_text: str) -> Dict[str, Any]:
+        """Per-run state shared by the stage handlers."""
+        # Keep gc() (in this or any other process) away from runs still in progress
+        self.artifact_store.begin_run(run_id)
+        return {
+            "run_id": run_id,
+            "requirements_text": requirements_text,
+            "history_start": len(self.mcp_bus.message_history),
+            "messages": set(),  # IDs of the requests this run sent
+            "metrics": MetricsRegistry(),  # metrics recorded by this run (a scope of self.metrics)
+            "completed": {},  # checkpointed stage outputs
+            "usage": {},  # agent name -> counters when its stage was checkpointed
+            "stage_agents": {},  # stage name -> agent that ran it
+            "fallback_stages": set(),  # stages whose agent fell back to a template
+            "reused": {},  # stages reused from earlier runs
+            "speculations": {},  # stage name -> (agent name, Speculation)
+            "resumed_stages": []
+        }
+
+    def _checkpoint_handler(self, run: Dict[str, Any],
+                            graph: StageGraph) -> Optional[Callable[[str, Dict], None]]:
+        """
+        Build the StageGraph callback that checkpoints finished stages.
+
+        Stages produced by an agent's fallback template are not checkpointed,
+        nor is anything downstream of them, so a resumed run retries them.
+        """
+        if self.checkpoints is None:
+            return None
+
+        def on_stage_complete(name: str, results: Dict[str, Any]):
+            if name in run["completed"] or name in run["fallback_stages"]:
+                return
+            if not all(dep in run["completed"] for dep in graph.stages[name].depends_on):
+                return
+            run["completed"][name] = results[name]
+            agent_name = run["stage_agents"].get(name)
+            if agent_name is not None:
+                run["usage"][agent_name] = self.mcp_bus.agents[agent_name].get_counters()
+            self._save_checkpoint(run)
+
+        return on_stage_complete
+
+    def _save_checkpoint(self, run: Dict[str, Any]):
+        """Atomically write the run's checkpoint."""
+        self.checkpoints.save(run["run_id"], {
+            "run_id": run["run_id"],
+            "status": "running",
+            "requirements_text": run["requirements_text"],
+            "completed": run["completed"],
+            "usage": run["usage"]
+        })
+
+    def _build_workflow_graph(self, run: Dict[str, Any],
+                              on_partial: Callable[[MCPMessage], None],
+                              use_async: bool) -> StageGraph:
+        """
+        Declare the workflow stages and their data dependencies.
+
+        Args:
+            run: Per-run state from _new_run()
+            on_partial: Optional callback receiving partial agent responses
+            use_async: Build coroutine handlers for StageGraph.arun()
+
+        Returns:
+            The workflow StageGraph
+        """
+        requirements_text = run["requirements_text"]
+
+        # Test generation only waits for the code if the agent's prompt uses it
+        test_deps = ["requirements"]
+        if self.test_agent.uses_generated_code:
+            test_deps.append("code")
+
+        stages = [
+            ("requirements", [],
+             lambda r: self._request_message("RequirementsAgent", requirements_text),
+             self._report_requirements),
+            ("code", ["requirements"],
+             lambda r: self._request_message("CodeGenerationAgent", r["requirements"]),
+             self._report_code),
+            ("save_code", ["code"],
+             lambda r: self._save_code_message(r["code"], run["run_id"]),
+             self._report_save),
+            ("validate_code", ["code"],
+             lambda r: self._validate_code_message(r["code"]),
+             self._report_validation),
+            ("tests", test_deps,
+             lambda r: self._request_message(
+                 "TestGenerationAgent",
+                 (r["code"]["code"] if "code" in r else None, r["requirements"])),
+             self._report_tests),
+            ("save_tests", ["tests"],
+             lambda r: self._save_tests_message(r["tests"], run["run_id"]),
+             self._report_save),
+        ]
+
+        graph = StageGraph()
+        for name, depends_on, make_message, report in stages:
+            graph.add_stage(
+                name,
+                self._stage_handler(name, make_message, report, on_partial, run, use_async),
+                depends_on
+            )
+
+        self._start_speculation(stages, run, use_async, stream = on_partial is not None)
+        return graph
+
+    def _start_speculation(self, stages: list, run: Dict[str, Any], use_async: bool,
+                           stream: bool = False):
+        """
+        Start agent stages that only need the requirements from a prediction.
+
+        The prediction is the last parsed requirements profile (or the default
+        profile on the first run). Each speculative call runs alongside
+        requirements parsing; the stage keeps it if the real requirements
+        produce the same LLM request and otherwise cancels it and regenerates.
+
+        Args:
+            stages: (name, depends_on, make_message, report) stage declarations
+            run: Per-run state; records the speculations
+            use_async: Start the calls as tasks on the running event loop
+            stream: Stream the calls, so a stage that takes one over can pass
+                its output on to on_partial chunk by chunk
+        """
+        if not self.speculate or "requirements" in run["completed"]:
+            return
+
+        predicted = {"requirements": self._predict_requirements(run["requirements_text"])}
+        for name, depends_on, make_message, _ in stages:
+            if depends_on != ["requirements"] or name in run["completed"]:
+                continue
+            message = make_message(predicted)
+            if message.message_type != "process_request":
+                continue
+            # Stages that will be reused from an earlier run need no call
+            fingerprint = self._stage_fingerprint(name, message)
+            if fingerprint is not None and self._stored_stage(fingerprint) is not None:
+                continue
+
+            agent = self.mcp_bus.agents[message.receiver]
+            if use_async:
+                speculation = agent.aspeculate(message.payload, stream = stream)
+            else:
+                speculation = agent.speculate(message.payload, stream = stream)
+            run["speculations"][name] = (message.receiver, speculation)
+
+        if run["speculations"]:
+            print(f"[Orchestrator] Speculatively started: {', '.join(run['speculations'])}")
+
+    def _predict_requirements(self, requirements_text: str) -> Dict:
+        """Get the requirements profile to speculate on."""
+        if self.last_requirements is None and self.stage_store is not None:
+            record = self.stage_store.get(_PROFILE_KEY)
+            if record is not None:
+                self.last_requirements = record["output"]
+        if self.last_requirements is not None:
+            return self.last_requirements
+        return self.requirements_agent.default_requirements(requirements_text)
+
+    def _check_speculation(self, name: str, message: MCPMessage, run: Dict[str, Any],
+                           needed: bool):
+        """
+        Cancel a stage's speculation unless it matches the real request.
+
+        Args:
+            name: Stage name
+            message: The stage's real request message
+            run: Per-run state
+            needed: False when the stage will not call its agent (e.g. reused)
+        """
+        if name not in run["speculations"]:
+            return
+        agent_name, speculation = run["speculations"][name]
+        agent = self.mcp_bus.agents[agent_name]
+        if needed and agent.speculation_matches(speculation, message.payload):
+            return
+        agent.cancel_speculation(speculation)
+        if needed:
+            print(f"[Orchestrator] Speculative {name} mispredicted; regenerating")
+
+    def _stage_handler(self, name: str, make_message: Callable, report: Callable,
+                       on_partial: Callable[[MCPMessage], None],
+                       run: Dict[str, Any], use_async: bool) -> Callable:
+        """
+        Wrap a stage's MCP message exchange as a StageGraph handler.
+
+        Agent stages whose request matches an earlier run rebuild their output
+        from the stored response instead of calling the LLM.
+
+        Args:
+            name: Stage name
+            make_message: Builds the MCPMessage from dependency outputs
+            report: Prints progress and returns the stage output
+            on_partial: Optional callback receiving partial agent responses
+            run: Per-run state; records reused and fallback stages
+            use_async: Return a coroutine handler using asend_message()
+
+        Returns:
+            Stage handler
+        """
+        if use_async:
+            async def async_handler(inputs: Dict) -> Dict:
+                message = make_message(inputs)
+                fingerprint, reused = self._reuse_stage(name, message, run)
+                self._check_speculation(name, message, run, reused is None)
+                if reused is not None:
+                    return reused
+                started = time.perf_counter()
+                run["messages"].add(message.message_id)
+                with record_calls() as calls:
+                    response = await self.mcp_bus.asend_message(message, on_partial)
+                output = report(response.payload)
+                self._store_stage(name, fingerprint, message, started, calls, run)
+                return output
+            return async_handler
+
+        def handler(inputs: Dict) -> Dict:
+            message = make_message(inputs)
+            fingerprint, reused = self._reuse_stage(name, message, run)
+            self._check_speculation(name, message, run, reused is None)
+            if reused is not None:
+                return reused
+            started = time.perf_counter()
+            run["messages"].add(message.message_id)
+            with record_calls() as calls:
+                response = self.mcp_bus.send_message(message, on_partial)
+            output = report(response.payload)
+            self._store_stage(name, fingerprint, message, started, calls, run)
+            return output
+        return handler
+
+    def _stage_fingerprint(self, name: str, message: MCPMessage) -> Optional[str]:
+        """
+        Hash everything that determines an agent stage's output.
+
+        The fingerprint covers the exact LLM request the agent would send
+        (prompts and parsed inputs) and the model, so equivalent inputs map to
+        the same stage output. Tool stages are not fingerprinted.
+        """
+        if self.stage_store is None or message.message_type != "process_request":
+            return None
+        agent = self.mcp_bus.agents[message.receiver]
+        return LLMResponseCache.make_key({
+            "stage": name,
+            "agent": message.receiver,
+            "model": agent.model,
+            "request": agent._build_request(message.payload)
+        })
+
+    def _reuse_stage(self, name: str, message: MCPMessage,
+                     run: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+        """
+        Look up the stored response of an unchanged stage and rebuild its output.
+
+        The output is rebuilt by the agent against the current request, so
+        fields that depend on the input rather than on the LLM response are
+        not carried over from the earlier run.
+
+        Returns:
+            Tuple of (fingerprint or None, rebuilt output or None)
+        """
+        fingerprint = self._stage_fingerprint(name, message)
+        if fingerprint is None:
+            return None, None
+
+        record = self._stored_stage(fingerprint)
+        if record is None:
+            return fingerprint, None
+
+        agent = self.mcp_bus.agents[message.receiver]
+        try:
+            output = agent.replay_response(message.payload, record["response_text"])
+        except Exception as e:
+            print(f"[Orchestrator] Stored {name} output is unusable, regenerating: {e}")
+            return fingerprint, None
+
+        run["reused"][name] = {
+            "fingerprint": fingerprint,
+            "time_saved_s": record["duration_s"],
+            "tokens_saved": record["tokens"]
+        }
+        print(f"✓ Reused {name} from a previous run (inputs unchanged)")
+        return fingerprint, output
+
+    def _stored_stage(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Get a stage record that can be reused (older records lack the response)."""
+        record = self.stage_store.get(fingerprint)
+        if record is None or "response_text" not in record:
+            return None
+        return record
+
+    def _store_stage(self, name: str, fingerprint: Optional[str], message: MCPMessage,
+                     started: float, calls: CallRecord, run: Dict[str, Any]):
+        """
+        Record which agent ran a stage and store its LLM response for reuse.
+
+        Stages whose agent fell back to its template are marked in the run
+        and never stored.
+
+        Args:
+            name: Stage name
+            fingerprint: Stage fingerprint, or None if it can't be reused
+            message: The stage's request message
+            started: perf_counter() when the request was sent
+            calls: Usage of the agent calls the stage made
+            run: Per-run state
+        """
+        if message.receiver not in self.mcp_bus.agents:
+            return
+        run["stage_agents"][name] = message.receiver
+        if calls.fallbacks:
+            run["fallback_stages"].add(name)
+            return
+        if fingerprint is None or calls.response is None:
+            return
+        self.stage_store.put(fingerprint, {
+            "stage": name,
+            "response_text": calls.response["text"],
+            # A speculative call taken over by the stage started before it
+            "duration_s": round(time.perf_counter() - started + calls.speculation_saved_s, 4),
+            "tokens": calls.tokens
+        })
+
+    def _request_message(self, receiver: str, payload) -> MCPMessage:
+        """Build a process_request message from the orchestrator."""
+        return MCPMessage(
             sender = "Orchestrator",
-            receiver = "CodeGenerationAgent",
+            receiver = receiver,
             message_type = "process_request",
-            payload = structured_requirements
+            payload = payload
         )
-        code_response = self.mcp_bus.send_message(code_message)
-        generated_code = code_response.payload
-        print(f"✓ Code generated: {len(generated_code['code'])} characters")
 
-        # Save code using MCP tool
-        save_code_msg = MCPMessage(
+    def _save_code_message(self, generated_code: Dict, run_id: str) -> MCPMessage:
+        """Build the save_code tool call for generated code."""
+        return MCPMessage(
             sender = "Orchestrator",
             receiver = "MCPBus",
             message_type = "tool_call",
@@ -148,27 +652,30 @@ class Orchestrator:
                 "tool_name": "save_code",
                 "parameters": {
                     "code": generated_code["code"],
-                    "filename": "mst_app.py"
+                    "filename": "mst_app.py",
+                    "run_id": run_id
                 }
             }
         )
-        save_response = self.mcp_bus.send_message(save_code_msg)
-        print(f"✓ {save_response.payload['result']}")
 
-        # Step 3: Generate tests using MCP
-        print("\n[Step 3] Generating test cases via MCP...")
-        test_message = MCPMessage(
+    def _validate_code_message(self, generated_code: Dict) -> MCPMessage:
+        """Build the validate_code tool call for generated code."""
+        return MCPMessage(
             sender = "Orchestrator",
-            receiver = "TestGenerationAgent",
-            message_type = "process_request",
-            payload = (generated_code["code"], structured_requirements)
+            receiver = "MCPBus",
+            message_type = "tool_call",
+            payload = {
+                "tool_name": "validate_code",
+                "parameters": {
+                    "code": generated_code["code"],
+                    "filename": "mst_app.py"
+                }
+            }
         )
-        test_response = self.mcp_bus.send_message(test_message)
-        generated_tests = test_response.payload
-        print(f"✓ Tests generated: {len(generated_tests['test_code'])} characters")
 
-        # Save tests using MCP tool
-        save_test_msg = MCPMessage(
+    def _save_tests_message(self, generated_tests: Dict, run_id: str) -> MCPMessage:
+        """Build the save_tests tool call for generated tests."""
+        return MCPMessage(
             sender = "Orchestrator",
             receiver = "MCPBus",
             message_type = "tool_call",
@@ -176,36 +683,237 @@ class Orchestrator:
                 "tool_name": "save_tests",
                 "parameters": {
                     "test_code": generated_tests["test_code"],
-                    "filename": "test_mst_generated.py"
+                    "filename": "test_mst_generated.py",
+                    "run_id": run_id
                 }
             }
         )
-        save_test_response = self.mcp_bus.send_message(save_test_msg)
-        print(f"✓ {save_test_response.payload['result']}")
-
-        # Collect usage statistics
-        usage_stats = self._collect_usage_stats()
 
+    def _print_banner(self, title: str):
+        """Print a section banner."""
         print("\n" + "=" * 60)
-        print("WORKFLOW COMPLETE")
+        print(title)
         print("=" * 60)
 
+    def _report_requirements(self, structured_requirements: Dict) -> Dict:
+        """Print a summary of the parsed requirements."""
+        print(
+            f"✓ Requirements parsed: {len(structured_requirements['requirements'].get('core_features', []))} features identified")
+        return structured_requirements
+
+    def _report_code(self, generated_code: Dict) -> Dict:
+        """Print a summary of the generated code."""
+        print(f"✓ Code generated: {len(generated_code['code'])} characters")
+        return generated_code
+
+    def _report_tests(self, generated_tests: Dict) -> Dict:
+        """Print a summary of the generated tests."""
+        print(f"✓ Tests generated: {len(generated_tests['test_code'])} characters")
+        return generated_tests
+
+    def _report_save(self, tool_result: Dict) -> Dict:
+        """Print the result of a save tool call."""
+        print(f"✓ {tool_result['result']['message']}")
+        return tool_result
+
+    def _report_validation(self, tool_result: Dict) -> Dict:
+        """Print the result of the validate_code tool call."""
+        validation = tool_result["result"]
+        if validation["valid"]:
+            print(f"✓ Code parses: {validation['classes']} classes, "
+                  f"{validation['functions']} functions")
+        else:
+            print(f"✗ Generated code does not parse: {validation['error']}")
+        return validation
+
+    def _finish_workflow(self, results: Dict, graph: StageGraph, run: Dict[str, Any]) -> Dict:
+        """Collect usage statistics and build the workflow result."""
+        # Collect usage statistics
+        usage_stats = self._collect_usage_stats()
+        run_metrics = self._export_run_metrics(run)
+        stage_report = graph.get_report()
+        reused = run["reused"]
+        reuse_report = {
+            "reused_stages": sorted(reused),
+            "time_saved_s": round(sum(r["time_saved_s"] for r in reused.values()), 4),
+            "tokens_saved": sum(r["tokens_saved"] for r in reused.values()),
+            "stages": reused
+        }
+        speculation_report = self._finish_speculation(results, run)
+        artifact_report = self._publish_artifacts(results, run)
+        self.usage_log.append(self._usage_record(run, stage_report, run_metrics))
+        if self.checkpoints is not None:
+            # Nothing left to resume; the outputs live in the artifact store
+            self.checkpoints.delete(run["run_id"])
+
+        self._print_banner("WORKFLOW COMPLETE")
+        print(f"Critical path: {' -> '.join(stage_report['critical_path'])} "
+              f"({stage_report['critical_path_s']:.2f}s of {stage_report['serial_time_s']:.2f}s stage time)")
+        if reused:
+            print(f"Reused stages: {', '.join(reuse_report['reused_stages'])} "
+                  f"(saved {reuse_report['time_saved_s']:.2f}s, {reuse_report['tokens_saved']} tokens)")
+        if speculation_report["speculated_stages"]:
+            print(f"Speculation: {speculation_report['hits']}/"
+                  f"{len(speculation_report['speculated_stages'])} hits "
+                  f"(saved {speculation_report['latency_saved_s']:.2f}s)")
+
         return {
-            "requirements": structured_requirements,
-            "generated_code": generated_code,
-            "generated_tests": generated_tests,
+            "run_id": run["run_id"],
+            "resumed_stages": run["resumed_stages"],
+            "requirements": results["requirements"],
+            "generated_code": results["code"],
+            "generated_tests": results["tests"],
+            "code_validation": results["validate_code"],
             "usage_stats": usage_stats,
-            "mcp_message_history": self.mcp_bus.get_message_history()
+            "stage_report": stage_report,
+            "reuse_report": reuse_report,
+            "metrics": run_metrics.to_dict(),
+            "speculation_report": speculation_report,
+            "artifacts": artifact_report,
+            "connection_stats": self.clients.get_stats(),
+            "rate_limit_stats": (self.clients.rate_limiter.get_stats()
+                                 if self.clients.rate_limiter else None),
+            "stream_stats": {
+                agent.name: agent.get_stream_stats()
+                for agent in (self.requirements_agent, self.code_agent, self.test_agent)
+            },
+            # Only this workflow's messages; the full history stays in the bus
+            "mcp_message_history": self._run_message_history(run)
+        }
+
+    def _run_message_history(self, run: Dict[str, Any]) -> List[Dict]:
+        """
+        Collect the requests this run sent and the replies to them.
+
+        Other workflows can share the bus concurrently, so messages logged
+        since the run started are filtered by the run's request IDs.
+        """
+        ids = run["messages"]
+        return [
+            entry for entry in self.mcp_bus.iter_message_history(run["history_start"])
+            if entry["message_id"] in ids or entry["correlation_id"] in ids
+        ]
+
+    def _publish_artifacts(self, results: Dict, run: Dict[str, Any]) -> Dict:
+        """
+        Mark the run as the latest and copy its artifacts to the fixed paths.
+
+        The run's own directory in the artifact store keeps its files; the
+        fixed paths in output_dir always hold the latest finished run. Old
+        runs are then garbage-collected down to the store's size budget.
+        """
+        run_id = run["run_id"]
+        with self._publish_lock:
+            self.artifact_store.set_latest(run_id)
+            published = []
+            for stage, artifact in (("save_code", results["code"]["code"]),
+                                    ("save_tests", results["tests"]["test_code"])):
+                filename = results[stage]["result"]["filename"]
+                published.append(self.artifacts.write(filename, artifact)["path"])
+            self.artifact_store.end_run(run_id)
+            gc_report = self.artifact_store.gc()
+
+        if gc_report["removed_runs"]:
+            print(f"[Orchestrator] Removed {len(gc_report['removed_runs'])} old runs "
+                  f"({gc_report['freed_bytes']} bytes) from the artifact store")
+        return {
+            "run_dir": self.artifact_store.run_dir(run_id),
+            "published": published,
+            "gc": gc_report
+        }
+
+    def _finish_speculation(self, results: Dict, run: Dict[str, Any]) -> Dict:
+        """
+        Drop unused speculations, remember the parsed requirements as the next
+        prediction, and summarize this run's speculation.
+        """
+        stages = {}
+        for name, (agent_name, speculation) in run["speculations"].items():
+            self.mcp_bus.agents[agent_name].cancel_speculation(speculation)
+            stages[name] = {
+                "agent": agent_name,
+                "status": speculation.status,
+                "latency_saved_s": round(speculation.saved_s, 4),
+                "wasted_tokens": speculation.wasted_tokens
+            }
+
+        # Fallback output is the default profile; keep the previous prediction
+        if "requirements" not in run["fallback_stages"]:
+            requirements = results["requirements"]
+            self.last_requirements = requirements
+            if self.stage_store is not None:
+                self.stage_store.put(_PROFILE_KEY, {"output": requirements})
+
+        hits = sum(1 for s in stages.values() if s["status"] == "hit")
+        return {
+            "speculated_stages": sorted(stages),
+            "hits": hits,
+            "misses": len(stages) - hits,
+            "hit_rate": round(hits / len(stages), 3) if stages else None,
+            "latency_saved_s": round(sum(s["latency_saved_s"] for s in stages.values()), 4),
+            "wasted_tokens": sum(s["wasted_tokens"] for s in stages.values()),
+            "stages": stages
+        }
+
+    def _export_run_metrics(self, run: Dict[str, Any]) -> MetricsSnapshot:
+        """
+        Write the metrics recorded during this run to
+        <reports_dir>/metrics/<run-id>.json and .prom.
+
+        Returns:
+            The run's metrics
+        """
+        run_metrics = run["metrics"].snapshot()
+        base = os.path.join(self.reports_dir, "metrics", run["run_id"])
+        run_metrics.export(json_path = base + ".json", prometheus_path = base + ".prom")
+        return run_metrics
+
+    def _usage_record(self, run: Dict[str, Any], stage_report: Dict,
+                      run_metrics: MetricsSnapshot) -> Dict[str, Any]:
+        """
+        Build the run's usage time series record.
+
+        Stage durations only cover stages that ran in this invocation and
+        were not reused, so they stay comparable across runs.
+        """
+        input_tokens = run_metrics.total("llm_input_tokens_total")
+        output_tokens = run_metrics.total("llm_output_tokens_total")
+        return {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec = "seconds"),
+            "run_id": run["run_id"],
+            "outcome": "fallback" if run["fallback_stages"] else "ok",
+            "resumed": bool(run["resumed_stages"]),
+            "duration_s": stage_report["wall_clock_s"],
+            "stages": {name: stage["duration_s"] for name, stage in stage_report["stages"].items()
+                       if name not in run["reused"]},
+            "reused": sorted(run["reused"]),
+            "fallback_stages": sorted(run["fallback_stages"]),
+            "api_calls": run_metrics.total("llm_calls_total"),
+            "tokens": {
+                "total": input_tokens + output_tokens,
+                "input": input_tokens,
+                "output": output_tokens,
+                "cached": run_metrics.total("llm_cached_tokens_total")
+            },
+            "models": {
+                model: run_metrics.total("llm_input_tokens_total", model = model) +
+                       run_metrics.total("llm_output_tokens_total", model = model)
+                for model in run_metrics.label_values("llm_calls_total", "model")
+            }
         }
 
     def _collect_usage_stats(self) -> Dict:
         """
         Collect usage statistics from all agents.
 
+        Each model's entry also has an "agents" breakdown of prompt tokens
+        served from the provider's prefix cache.
+
         Returns:
             Dictionary with usage stats in required format
         """
         stats = {}
+        prompt_cache = {}
 
         # Collect from each agent
         for agent_name, agent in [
@@ -216,17 +924,29 @@ class Orchestrator:
             agent_stats = agent.get_usage_stats()
             # Use model name as key
             model_key = agent.model
+            prompt_cache.setdefault(model_key, {})[agent_name] = {
+                "numApiCalls": agent_stats["numApiCalls"],
+                "promptTokens": agent_stats["promptTokens"],
+                "cachedPromptTokens": agent_stats["cachedPromptTokens"],
+                "cachedPromptRatio": (round(agent_stats["cachedPromptTokens"] /
+                                            agent_stats["promptTokens"], 3)
+                                      if agent_stats["promptTokens"] else 0.0)
+            }
 
             if model_key in stats:
                 # Aggregate if same model used by multiple agents
-                stats[model_key]["numApiCalls"] += agent_stats["numApiCalls"]
-                stats[model_key]["totalTokens"] += agent_stats["totalTokens"]
+                for key, value in agent_stats.items():
+                    stats[model_key][key] = stats[model_key].get(key, 0) + value
             else:
-                stats[model_key] = agent_stats
+                # Copy, so aggregating later agents doesn't change this agent's stats
+                stats[model_key] = dict(agent_stats)
+
+        for model_key, agents in prompt_cache.items():
+            stats[model_key]["agents"] = agents
 
         # Save to file
-        os.makedirs("reports", exist_ok = True)
-        with open("reports/model_usage.json", "w") as f:
+        os.makedirs(self.reports_dir, exist_ok = True)
+        with open(os.path.join(self.reports_dir, "model_usage.json"), "w") as f:
             json.dump(stats, f, indent = 2)
 
         return stats
@@ -238,7 +958,8 @@ class Orchestrator:
         Returns:
             JSON string with usage statistics
         """
-        if os.path.exists("reports/model_usage.json"):
-            with open("reports/model_usage.json", "r") as f:
+        report_path = os.path.join(self.reports_dir, "model_usage.json")
+        if os.path.exists(report_path):
+            with open(report_path, "r") as f:
                 return f.read()
         return "{}"
\ No newline at end of file
@@ -3,111 +3,444 @@ Test Runner Script
 Author: [Your Name] - [Student ID]
 
 Automatically runs all generated test cases and reports results.
+
+Tests run through pytest's Python API with a plugin that records every
+test's outcome and duration, so the pass rate is computed from real results
+rather than from the console output. Large generated suites can be split
+into shards that run in a process pool:
+    python run_tests.py --workers 4
+
+Results are written as JSON and JUnit XML (reports/tests/ by default).
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
 import subprocess
 import sys
-import os
-import json
+import xml.etree.ElementTree as ET
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+
+DEFAULT_TEST_FILE = "generated/test_mst_generated.py"
+
+# Arguments for every pytest run; a module that fails to import doesn't stop the others
+PYTEST_ARGS = ["-q", "-p", "no:cacheprovider", "--tb=short", "--continue-on-collection-errors"]
+
+# Outcomes that count towards the pass rate (skips and expected failures don't)
+GATED_OUTCOMES = ("passed", "failed", "error")
+
+
+class ResultsPlugin:
+    """
+    pytest plugin that records the outcome, duration and failure text of
+    each test, plus collection errors.
+    """
+
+    def __init__(self):
+        """Initialize empty results."""
+        self.rootdir = None  # node IDs are relative to this directory
+        self.collected = []  # node IDs in collection order
+        self.results = {}  # node ID -> result
+        self.collection_errors = []
+
+    def pytest_collection_finish(self, session):
+        """Remember the collected node IDs."""
+        self.rootdir = str(session.config.rootpath)
+        self.collected = [item.nodeid for item in session.items]
+
+    def pytest_collectreport(self, report):
+        """Record modules that failed to import or collect."""
+        if report.failed:
+            self.collection_errors.append({
+                "nodeid": report.nodeid,
+                "message": report.longreprtext
+            })
+
+    def pytest_runtest_logreport(self, report):
+        """Fold the setup, call and teardown reports into one result per test."""
+        result = self.results.get(report.nodeid)
+        if result is None:
+            result = self.results[report.nodeid] = {
+                "nodeid": report.nodeid,
+                "outcome": "passed",
+                "duration": 0.0,
+                "message": None
+            }
+        result["duration"] += report.duration
+
+        if hasattr(report, "wasxfail"):
+            result["outcome"] = "xpassed" if report.passed else "xfailed"
+            result["message"] = report.wasxfail or None
+        elif report.failed:
+            if result["outcome"] != "failed":
+                result["outcome"] = "failed" if report.when == "call" else "error"
+            result["message"] = report.longreprtext
+        elif report.skipped:
+            result["outcome"] = "skipped"
+            if isinstance(report.longrepr, tuple):
+                result["message"] = report.longrepr[2]
+
+
+def collect_tests(paths: List[str]) -> Tuple[str, List[str], List[Dict[str, str]]]:
+    """
+    Collect test node IDs without running them.
+
+    Args:
+        paths: Test files or directories
+
+    Returns:
+        Tuple of (root directory, node IDs relative to it, collection errors)
+    """
+    plugin = ResultsPlugin()
+    _quiet_pytest(["--collect-only"] + paths, plugin)
+    return plugin.rootdir, plugin.collected, plugin.collection_errors
+
+
+def run_shard(args: List[str]) -> Dict[str, Any]:
+    """
+    Run tests in this process.
+
+    Args:
+        args: pytest arguments, e.g. test node IDs, files or directories
+
+    Returns:
+        Dictionary with results (in collection order), collection_errors and exit_code
+    """
+    plugin = ResultsPlugin()
+    exit_code = _quiet_pytest(args, plugin)
+    order = {nodeid: i for i, nodeid in enumerate(plugin.collected)}
+    results = sorted(plugin.results.values(), key = lambda r: order.get(r["nodeid"], len(order)))
+    return {
+        "results": results,
+        "collection_errors": plugin.collection_errors,
+        "exit_code": int(exit_code)
+    }
+
+
+def _quiet_pytest(args: List[str], plugin: ResultsPlugin) -> int:
+    """Run pytest in-process without console output; results come from the plugin."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return pytest.main(PYTEST_ARGS + args, plugins = [plugin])
+
+
+def run_suite(paths: List[str], workers: int = 1) -> Dict[str, Any]:
+    """
+    Run a test suite, sharded across worker processes if workers > 1.
+
+    Tests are assigned to shards round-robin in collection order, so each
+    shard gets a similar mix of the suite.
+
+    Args:
+        paths: Test files or directories
+        workers: Number of worker processes
+
+    Returns:
+        Summary with per-test results, outcome counts and the pass rate
+    """
+    started = datetime.datetime.now()
+    if workers > 1:
+        rootdir, nodeids, collection_errors = collect_tests(paths)
+        shards = []
+        for i in range(workers):
+            chunk = nodeids[i::workers]
+            if chunk:
+                # Pin the root directory so every shard reports the same node IDs
+                shards.append(["--rootdir", rootdir] + [os.path.join(rootdir, nodeid) for nodeid in chunk])
+    else:
+        collection_errors = []
+        shards = [paths]
+
+    if len(shards) > 1:
+        with ProcessPoolExecutor(max_workers = len(shards)) as executor:
+            shard_runs = list(executor.map(run_shard, shards))
+    elif shards:
+        shard_runs = [run_shard(shards[0])]
+    else:
+        shard_runs = []
+
+    if workers > 1 and len(shards) > 1:
+        # Merge back into collection order
+        by_id = {r["nodeid"]: r for shard in shard_runs for r in shard["results"]}
+        results = [by_id[nodeid] for nodeid in nodeids if nodeid in by_id]
+    else:
+        results = [r for shard in shard_runs for r in shard["results"]]
+    for shard in shard_runs:
+        for error in shard["collection_errors"]:
+            if error not in collection_errors:
+                collection_errors.append(error)
+
+    return summarize(results, collection_errors, started, len(shards) or 1)
 
 
-def run_tests():
+def summarize(results: List[Dict[str, Any]], collection_errors: List[Dict[str, str]],
+              started: datetime.datetime, shards: int = 1) -> Dict[str, Any]:
+    """
+    Count outcomes and compute the pass rate.
+
+    Args:
+        results: Per-test results
+        collection_errors: Modules that failed to collect
+        started: When the run started
+        shards: Number of shards the suite ran in
+
+    Returns:
+        Summary dictionary (also the JSON report)
+    """
+    counts = {}
+    for result in results:
+        result["duration"] = round(result["duration"], 6)
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    gated = sum(counts.get(outcome, 0) for outcome in GATED_OUTCOMES)
+
+    return {
+        "started": started.isoformat(timespec = "seconds"),
+        "duration_s": round((datetime.datetime.now() - started).total_seconds(), 4),
+        "shards": shards,
+        "total": len(results),
+        "counts": counts,
+        "pass_rate": round(counts.get("passed", 0) / gated * 100, 2) if gated else None,
+        "collection_errors": collection_errors,
+        "tests": results
+    }
+
+
+def write_json_report(summary: Dict[str, Any], path: str):
+    """
+    Write the summary as JSON.
+
+    Args:
+        summary: Summary from run_suite()
+        path: Output file
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    with open(path, "w") as f:
+        json.dump(summary, f, indent = 2)
+
+
+def write_junit_xml(summary: Dict[str, Any], path: str, suite_name: str = "generated"):
+    """
+    Write the summary in the JUnit XML format read by CI systems.
+
+    Args:
+        summary: Summary from run_suite()
+        path: Output file
+        suite_name: Name of the test suite element
+    """
+    counts = summary["counts"]
+    suite = ET.Element("testsuite", {
+        "name": suite_name,
+        "tests": str(summary["total"] + len(summary["collection_errors"])),
+        "failures": str(counts.get("failed", 0)),
+        "errors": str(counts.get("error", 0) + len(summary["collection_errors"])),
+        "skipped": str(counts.get("skipped", 0) + counts.get("xfailed", 0)),
+        "time": f"{sum(r['duration'] for r in summary['tests']):.3f}",
+        "timestamp": summary["started"]
+    })
+
+    for result in summary["tests"]:
+        classname, _, name = result["nodeid"].rpartition("::")
+        case = ET.SubElement(suite, "testcase", {
+            "classname": _junit_classname(classname),
+            "name": name,
+            "time": f"{result['duration']:.3f}"
+        })
+        outcome = result["outcome"]
+        if outcome in ("failed", "error"):
+            element = ET.SubElement(case, "failure" if outcome == "failed" else "error", {
+                "message": _error_line(result["message"])
+            })
+            element.text = result["message"]
+        elif outcome in ("skipped", "xfailed"):
+            ET.SubElement(case, "skipped", {"message": result["message"] or outcome})
+
+    for error in summary["collection_errors"]:
+        case = ET.SubElement(suite, "testcase", {
+            "classname": _junit_classname(error["nodeid"]),
+            "name": "collection",
+            "time": "0.000"
+        })
+        element = ET.SubElement(case, "error", {"message": "collection failed"})
+        element.text = error["message"]
+
+    root = ET.Element("testsuites")
+    root.append(suite)
+    ET.indent(root)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    ET.ElementTree(root).write(path, encoding = "utf-8", xml_declaration = True)
+
+
+def _junit_classname(nodeid_prefix: str) -> str:
+    """Dotted JUnit class name of a test's file (and class) part of the node ID."""
+    path, _, classes = nodeid_prefix.partition("::")
+    if path.endswith(".py"):
+        path = path[:-3]
+    parts = [part for part in path.replace("\\", "/").split("/") if part]
+    if classes:
+        parts.extend(classes.split("::"))
+    return ".".join(parts)
+
+
+def _error_line(message: Optional[str]) -> str:
+    """Last non-empty line of a failure text, where pytest puts the error."""
+    lines = [line.strip() for line in (message or "").splitlines() if line.strip()]
+    if not lines:
+        return ""
+    return lines[-1][1:].strip() if lines[-1].startswith("E ") else lines[-1]
+
+
+def print_results(summary: Dict[str, Any]):
+    """Print one line per test and the failure details."""
+    for result in summary["tests"]:
+        print(f"{result['outcome'].upper():<8} {result['nodeid']} ({result['duration']:.3f}s)")
+
+    for error in summary["collection_errors"]:
+        print(f"\n--- ERROR collecting {error['nodeid']} ---")
+        print(error["message"])
+    for result in summary["tests"]:
+        if result["outcome"] in ("failed", "error"):
+            print(f"\n--- {result['outcome'].upper()} {result['nodeid']} ---")
+            print(result["message"])
+
+
+def run_tests(paths: List[str] = None, workers: int = 1,
+              json_path: str = "reports/tests/results.json",
+              junit_path: str = "reports/tests/junit.xml",
+              min_pass_rate: float = 80.0):
     """
     Run the generated test cases and report results.
+
+    Args:
+        paths: Test files or directories (defaults to the generated test file)
+        workers: Number of worker processes to shard the tests across
+        json_path: JSON report path (None to skip)
+        junit_path: JUnit XML report path (None to skip)
+        min_pass_rate: Required pass rate in percent
+
+    Returns:
+        True if the tests collected cleanly and the pass rate meets min_pass_rate
     """
     print("=" * 70)
     print("RUNNING GENERATED TEST CASES")
     print("=" * 70)
 
-    test_file = "generated/test_mst_generated.py"
+    paths = paths or [DEFAULT_TEST_FILE]
 
-    # Check if test file exists
-    if not os.path.exists(test_file):
-        print(f"\n Error: Test file not found: {test_file}")
+    # Check if test files exist
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        print(f"\n Error: Test file not found: {', '.join(missing)}")
         print("Please generate tests first by running: python main.py")
         sys.exit(1)
 
-    print(f"\n Test file: {test_file}")
-    print("\n Running tests with pytest...\n")
+    print(f"\n Test file: {', '.join(paths)}")
+
+    if pytest is None:
+        return _run_unittest(paths)
+
+    print(f"\n Running tests with pytest ({workers} worker{'s' if workers != 1 else ''})...\n")
+    summary = run_suite(paths, workers)
+    print_results(summary)
+
+    if json_path:
+        write_json_report(summary, json_path)
+    if junit_path:
+        write_junit_xml(summary, junit_path)
+
+    counts = summary["counts"]
+    pass_rate = summary["pass_rate"]
+
+    print("\n" + "=" * 70)
+    print("TEST RESULTS SUMMARY")
+    print("=" * 70)
+    print(f"Total Tests: {summary['total']}")
+    print(f"Passed: {counts.get('passed', 0)} ")
+    print(f"Failed: {counts.get('failed', 0)} ")
+    for outcome in ("error", "skipped", "xfailed", "xpassed"):
+        if counts.get(outcome):
+            print(f"{outcome.capitalize()}: {counts[outcome]} ")
+    if summary["collection_errors"]:
+        print(f"Collection Errors: {len(summary['collection_errors'])} ")
+    print(f"Duration: {summary['duration_s']:.2f}s")
+    for path in (json_path, junit_path):
+        if path:
+            print(f"Report: {path}")
+
+    if pass_rate is None:
+        print("\n No tests were run")
+        return False
+
+    print(f"Pass Rate: {pass_rate:.1f}%")
+    if summary["collection_errors"]:
+        print("\n WARNING: Some test modules failed to collect")
+        return False
+    if pass_rate >= min_pass_rate:
+        print(f"\n SUCCESS: Pass rate meets {min_pass_rate:g}% requirement!")
+        return True
+    print(f"\n WARNING: Pass rate below {min_pass_rate:g}% requirement")
+    return False
+
+
+def _run_unittest(paths: List[str]) -> bool:
+    """Fallback when pytest is not installed."""
+    print(" pytest not found. Trying unittest...\n")
 
-    # Try running with pytest first
     try:
         result = subprocess.run(
-            ["pytest", test_file, "-v", "--tb=short"],
+            [sys.executable, "-m", "unittest"] + paths,
             capture_output = True,
             text = True
         )
 
         print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-
-        # Parse results
-        output = result.stdout + result.stderr
-
-        # Count passed and failed tests
-        passed = output.count(" PASSED")
-        failed = output.count(" FAILED")
-        total = passed + failed
-
-        if total > 0:
-            pass_rate = (passed / total) * 100
-
-            print("\n" + "=" * 70)
-            print("TEST RESULTS SUMMARY")
-            print("=" * 70)
-            print(f"Total Tests: {total}")
-            print(f"Passed: {passed} ")
-            print(f"Failed: {failed} ")
-            print(f"Pass Rate: {pass_rate:.1f}%")
-
-            if pass_rate >= 80:
-                print("\n SUCCESS: Pass rate meets 80% requirement!")
-            else:
-                print(f"\n WARNING: Pass rate below 80% requirement")
+        print(result.stderr)
 
+        # Check if tests ran
+        if "Ran" in result.stderr:
+            print("\n Tests completed (see output above)")
             return result.returncode == 0
         else:
-            print("\n Could not parse test results")
+            print("\n Tests may not have run properly")
             return False
 
-    except FileNotFoundError:
-        print(" pytest not found. Trying unittest...\n")
-
-        # Fallback to unittest
-        try:
-            result = subprocess.run(
-                ["python", "-m", "unittest", test_file],
-                capture_output = True,
-                text = True
-            )
-
-            print(result.stdout)
-            print(result.stderr)
-
-            # Check if tests ran
-            if "Ran" in result.stderr:
-                print("\n Tests completed (see output above)")
-                return result.returncode == 0
-            else:
-                print("\n Tests may not have run properly")
-                return False
-
-        except Exception as e:
-            print(f"\n Error running tests: {e}")
-            return False
+    except Exception as e:
+        print(f"\n Error running tests: {e}")
+        return False
 
 
 def main():
     """Main function."""
-    success = run_tests()
+    parser = argparse.ArgumentParser(description = "Run the generated test cases")
+    parser.add_argument("paths", nargs = "*", default = [DEFAULT_TEST_FILE],
+                        help = f"test files or directories (default: {DEFAULT_TEST_FILE})")
+    parser.add_argument("--workers", type = int, default = 1,
+                        help = "worker processes to shard the tests across (default: 1)")
+    parser.add_argument("--json", default = "reports/tests/results.json",
+                        help = "JSON report path (default: reports/tests/results.json)")
+    parser.add_argument("--junit-xml", default = "reports/tests/junit.xml",
+                        help = "JUnit XML report path (default: reports/tests/junit.xml)")
+    parser.add_argument("--min-pass-rate", type = float, default = 80.0,
+                        help = "required pass rate in percent (default: 80)")
+    args = parser.parse_args()
+
+    success = run_tests(args.paths, max(1, args.workers), args.json, args.junit_xml,
+                        args.min_pass_rate)
 
     print("\n" + "=" * 70)
 
     if success:
-        print(" All tests completed successfully!")
+        print(" Pass-rate requirement met!")
     else:
-        print(" Some tests failed or had errors")
+        print(" Pass-rate requirement not met or tests had errors")
 
     print("=" * 70)
 
@@ -115,4 +448,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
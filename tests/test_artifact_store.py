@@ -0,0 +1,79 @@
+"""
+Tests for the artifact store
+Author: [Your Name] - [Student ID]
+
+Covers gc() with runs in progress, blobs not yet linked and file systems
+without hard links.
+"""
+
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.artifact_store import ArtifactStore
+
+
+def finished_run(store, run_id, content):
+    """Store one artifact for a run and mark the run finished."""
+    store.begin_run(run_id)
+    store.put(run_id, "app.py", content)
+    store.end_run(run_id)
+
+
+def test_gc_under_budget_leaves_unlinked_blobs_alone(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=1024 * 1024)
+    # A blob another process has written but not linked yet
+    blob = store._blob_path("ab" * 32)
+    store._write_blob(blob, b"pending")
+
+    report = store.gc()
+
+    assert os.path.exists(blob)
+    assert report["removed_runs"] == []
+
+
+def test_gc_skips_runs_in_progress(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=10)
+    finished_run(store, "run-1", "a" * 100)
+    store.begin_run("run-2")
+    store.put("run-2", "app.py", "b" * 100)
+    finished_run(store, "run-3", "c" * 100)
+    store.set_latest("run-3")
+
+    report = store.gc()
+
+    assert report["removed_runs"] == ["run-1"]
+    assert store.list_runs() == ["run-2", "run-3"]
+
+
+def test_gc_removes_runs_whose_owner_exited(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=10)
+    store.begin_run("run-1")
+    store.put("run-1", "app.py", "a" * 100)
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                            capture_output=True, text=True).stdout.strip()
+    with open(os.path.join(store.run_dir("run-1"), ".active"), "w") as f:
+        f.write(exited)
+    finished_run(store, "run-2", "b" * 100)
+    store.set_latest("run-2")
+
+    assert store.gc()["removed_runs"] == ["run-1"]
+
+
+def test_gc_enforces_budget_without_hard_links(tmp_path, monkeypatch):
+    def no_link(src, dst):
+        raise OSError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_link)
+    store = ArtifactStore(str(tmp_path), max_bytes=250)
+    for i in range(4):
+        finished_run(store, f"run-{i}", str(i) * 100)
+    store.set_latest("run-3")
+
+    report = store.gc()
+
+    assert report["removed_runs"] == ["run-0", "run-1"]
+    assert report["total_bytes"] == 200
+    assert store.list_runs() == ["run-2", "run-3"]
@@ -0,0 +1,65 @@
+"""
+Tests for the base agent
+Author: [Your Name] - [Student ID]
+
+Covers the response cache against the in-process fake LLM backend: only
+replies that parse are cached, and a cached reply that does not parse is
+evicted instead of being replayed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.requirements_agent import RequirementsAgent
+from infra.http_pool import ClientRegistry
+from infra.llm_cache import LLMResponseCache
+
+REQUIREMENTS = "A music scale trainer with difficulty levels and progress tracking"
+
+
+def make_agent(tmp_path):
+    """Requirements agent with its own cache and fake backend."""
+    clients = ClientRegistry(backend="fake")
+    cache = LLMResponseCache(cache_dir=str(tmp_path / "llm"))
+    return RequirementsAgent("test-key", cache=cache, clients=clients), clients.fake_backend
+
+
+def cache_key(agent, requirements_text):
+    """Key under which the agent caches its reply for the requirements."""
+    request = agent._build_request(requirements_text)
+    key, _ = agent._check_cache(agent._build_messages(request["messages"],
+                                                      request["system_prompt"]),
+                                request["max_tokens"], 0.7)
+    return key
+
+
+def test_unparseable_cached_reply_is_evicted(tmp_path):
+    agent, backend = make_agent(tmp_path)
+    key = cache_key(agent, REQUIREMENTS)
+    agent.cache.put(key, {"text": "Sorry, I can't help with that."})
+
+    fallback = agent.process(REQUIREMENTS)
+
+    assert fallback == agent.default_requirements(REQUIREMENTS)
+    assert agent.fallback_count == 1
+    assert agent.cache.get(key) is None
+    assert backend.calls == 0
+
+    # The next call goes to the LLM and caches the parsed reply
+    result = agent.process(REQUIREMENTS)
+
+    assert backend.calls == 1
+    assert "Interactive scale exercises" in result["requirements"]["core_features"]
+    assert agent.cache.get(key)["text"].startswith("{")
+
+
+def test_reply_that_fails_to_parse_is_not_cached(tmp_path, monkeypatch):
+    agent, backend = make_agent(tmp_path)
+    monkeypatch.setattr(backend, "_canned_text", lambda messages: "not json")
+
+    agent.process(REQUIREMENTS)
+
+    assert agent.fallback_count == 1
+    assert agent.cache.get(cache_key(agent, REQUIREMENTS)) is None
@@ -0,0 +1,32 @@
+"""
+Tests for workflow checkpoints
+Author: [Your Name] - [Student ID]
+
+Covers picking the run to resume and removing finished runs.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.checkpoint import CheckpointStore
+
+
+def test_latest_run_skips_completed_runs(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save("20240101-000000-aaaaaa", {"status": "running"})
+    store.save("20240102-000000-bbbbbb", {"status": "complete"})
+
+    assert store.latest_run() == "20240101-000000-aaaaaa"
+
+
+def test_deleted_runs_are_not_resumable(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save("20240101-000000-aaaaaa", {"status": "running"})
+
+    store.delete("20240101-000000-aaaaaa")
+    store.delete("20240101-000000-aaaaaa")  # already gone
+
+    assert store.list_runs() == []
+    assert store.latest_run() is None
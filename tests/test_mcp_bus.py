@@ -0,0 +1,198 @@
+"""
+Tests for the MCP bus
+Author: [Your Name] - [Student ID]
+
+Covers the queued mode (per-agent worker limit, inbox backpressure and
+draining on aclose()), broadcast timeouts and tool concurrency slots on
+the thread and process pools.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.code_checks import validate_python
+from infra.mcp_bus import MCPBus, MCPMessage, MCPTool, shutdown_tool_pools
+
+
+class RecordingAgent:
+    """Async agent that records how many requests it serves at once."""
+
+    def __init__(self, gate: asyncio.Event = None):
+        self.gate = gate
+        self.active = 0
+        self.max_active = 0
+        self.served = []
+
+    async def aprocess(self, payload, on_chunk=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(0.01)
+            self.served.append(payload)
+            return {"echo": payload}
+        finally:
+            self.active -= 1
+
+
+class SleepingAgent:
+    """Sync agent that replies after a delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def process(self, payload, on_chunk=None):
+        time.sleep(self.delay)
+        return {"slept": self.delay}
+
+
+def nap(seconds):
+    """Module-level (picklable) tool handler for the process pool."""
+    time.sleep(seconds)
+    return seconds
+
+
+def make_bus(agent, **kwargs):
+    """Build a queued bus with one registered agent."""
+    bus = MCPBus(mode="queued", **kwargs)
+    bus.register_agent("Agent", agent)
+    return bus
+
+
+def request(payload):
+    return MCPMessage("Tester", "Agent", "process_request", payload)
+
+
+def test_workers_limit_concurrency_and_match_responses():
+    agent = RecordingAgent()
+    bus = make_bus(agent, workers_per_agent=2)
+
+    async def scenario():
+        messages = [request(i) for i in range(6)]
+        responses = await asyncio.gather(*(bus.asend_message(m) for m in messages))
+        await bus.aclose()
+        return messages, responses
+
+    messages, responses = asyncio.run(scenario())
+
+    assert agent.max_active == 2
+    for message, response in zip(messages, responses):
+        assert response.correlation_id == message.message_id
+        assert response.payload == {"echo": message.payload}
+
+
+def test_full_inbox_blocks_senders_until_drained():
+    gate = asyncio.Event()
+    agent = RecordingAgent(gate)
+    bus = make_bus(agent, workers_per_agent=1, queue_size=1)
+
+    async def scenario():
+        sends = [asyncio.create_task(bus.asend_message(request(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+
+        # One request is being served, one fills the inbox, the third waits to enqueue
+        stats = bus.get_queue_stats()["Agent"]
+        blocked = not any(send.done() for send in sends)
+        gate.set()
+        responses = await asyncio.gather(*sends)
+        await bus.aclose()
+        return stats, blocked, responses
+
+    stats, blocked, responses = asyncio.run(scenario())
+
+    assert stats == {"queued": 1, "capacity": 1, "workers": 1}
+    assert blocked
+    assert agent.served == [0, 1, 2]
+    assert [response.payload["echo"] for response in responses] == [0, 1, 2]
+
+
+def test_aclose_drains_queued_requests():
+    agent = RecordingAgent()
+    bus = make_bus(agent, workers_per_agent=1, queue_size=2)
+
+    async def scenario():
+        sends = [asyncio.create_task(bus.asend_message(request(i))) for i in range(5)]
+        await asyncio.sleep(0)
+        await bus.aclose()
+        done = [send.done() for send in sends]
+        responses = await asyncio.wait_for(asyncio.gather(*sends), timeout=1)
+        return done, responses
+
+    done, responses = asyncio.run(scenario())
+
+    assert all(done)
+    assert [response.payload["echo"] for response in responses] == [0, 1, 2, 3, 4]
+    assert agent.served == [0, 1, 2, 3, 4]
+
+
+def test_iter_broadcast_reports_replies_that_finish_before_the_timeout_check():
+    bus = MCPBus()
+    bus.register_agent("Fast", SleepingAgent(0))
+    bus.register_agent("Medium", SleepingAgent(0.1))
+    bus.register_agent("Slow", SleepingAgent(2))
+
+    outcomes = {}
+    for agent_name, response, error in bus.iter_broadcast("Tester", "process_request", {},
+                                                          timeout=0.2):
+        outcomes[agent_name] = (response, error)
+        if agent_name == "Fast":
+            # Medium finishes while the caller is busy and the timeout passes
+            time.sleep(0.3)
+
+    assert set(outcomes) == {"Fast", "Medium", "Slow"}
+    assert outcomes["Medium"][0].payload == {"slept": 0.1}
+    assert outcomes["Medium"][1] is None
+    assert isinstance(outcomes["Slow"][1], TimeoutError)
+
+
+def test_timed_out_tool_call_keeps_its_slot_until_it_finishes():
+    tool = MCPTool("slow", "Sleeps", lambda seconds: time.sleep(seconds) or seconds,
+                   executor="thread", max_concurrency=1, timeout=0.1)
+
+    with pytest.raises(TimeoutError, match="timed out after"):
+        tool.execute(seconds=0.4)
+
+    # The first call is still running on the pool and holds the only slot
+    with pytest.raises(TimeoutError, match="free slot"):
+        tool.execute(seconds=0)
+
+    time.sleep(0.4)
+    assert tool.execute(seconds=0) == 0
+
+
+def test_process_tool_handler_must_be_picklable():
+    with pytest.raises(ValueError, match="cannot be pickled"):
+        MCPTool("local", "Unpicklable", lambda: None, executor="process")
+
+
+def test_process_tool_runs_on_the_spawn_pool_and_keeps_its_slot_on_timeout():
+    bus = MCPBus()
+    bus.register_tool(MCPTool("validate", "Parses code", validate_python, executor="process"))
+    nap_tool = MCPTool("nap", "Sleeps", nap, executor="process", max_concurrency=1, timeout=5)
+    bus.register_tool(nap_tool)
+    try:
+        call = MCPMessage("Tester", "MCPBus", "tool_call",
+                          {"tool_name": "validate", "parameters": {"code": "def f():\n    pass\n"}})
+        result = bus.send_message(call).payload["result"]
+        assert result["valid"] is True
+        assert result["functions"] == 1
+        # Workers are warm now, so a short timeout only measures the call
+        assert nap_tool.execute(seconds=0) == 0
+
+        nap_tool.timeout = 0.2
+        with pytest.raises(TimeoutError, match="timed out after"):
+            nap_tool.execute(seconds=1)
+        with pytest.raises(TimeoutError, match="free slot"):
+            nap_tool.execute(seconds=0)
+
+        time.sleep(1)
+        assert nap_tool.execute(seconds=0) == 0
+    finally:
+        shutdown_tool_pools()
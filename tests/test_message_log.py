@@ -0,0 +1,58 @@
+"""
+Tests for the MCP message history
+Author: [Your Name] - [Student ID]
+
+Covers spilling to per-history segments, segment rotation and retention.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.message_log import MessageHistory
+
+
+class Note:
+    """Minimal message with to_dict()."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def to_dict(self):
+        return {"text": self.text}
+
+
+def texts(history, start=0):
+    return [entry["text"] for entry in history.iter(start)]
+
+
+def test_histories_sharing_a_log_path_only_read_their_own_messages(tmp_path):
+    log_path = str(tmp_path / "history.jsonl.gz")
+    a = MessageHistory(max_memory=1, log_path=log_path, spill_batch=1)
+    b = MessageHistory(max_memory=1, log_path=log_path, spill_batch=1)
+
+    for i in range(2):
+        b.append(Note(f"b{i}"))
+    for i in range(4):
+        a.append(Note(f"a{i}"))
+
+    assert texts(a) == ["a0", "a1", "a2", "a3"]
+    assert texts(a, start=2) == ["a2", "a3"]
+    assert texts(b) == ["b0", "b1"]
+
+
+def test_segments_rotate_and_old_ones_are_deleted(tmp_path):
+    log_path = str(tmp_path / "history.jsonl")
+    history = MessageHistory(max_memory=1, log_path=log_path, spill_batch=1,
+                             max_segment_bytes=1, max_segments=2)
+
+    for i in range(5):
+        history.append(Note(f"m{i}"))
+
+    # Four spills, one per segment; only the newest two segments are kept
+    assert len(history.get_stats()["segments"]) == 4
+    assert len(os.listdir(tmp_path)) == 2
+    assert len(history) == 5
+    assert texts(history) == ["m2", "m3", "m4"]
+    assert texts(history, start=3) == ["m3", "m4"]
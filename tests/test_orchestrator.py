@@ -0,0 +1,95 @@
+"""
+Tests for the orchestrator
+Author: [Your Name] - [Student ID]
+
+Runs whole workflows against the in-process fake LLM backend and covers
+reusing unchanged stages, never storing fallback output and regenerating
+mispredicted speculative stages.
+"""
+
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.http_pool import ClientRegistry
+from infra.mock_llm import CANNED_CODE, FakeLLMConfig
+from infra.retry_policy import RetryPolicy
+from orchestrator import Orchestrator
+
+REQUIREMENTS = "A music scale trainer with difficulty levels and progress tracking"
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Keep the caches, reports and outputs of each test in its own directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_orchestrator(**registry_options):
+    """Orchestrator on a fresh fake backend; returns it with the backend."""
+    clients = ClientRegistry(backend="fake", **registry_options)
+    orchestrator = Orchestrator("test-key", clients=clients, output_dir="generated",
+                                reports_dir="reports", checkpoint_dir=".cache/runs")
+    return orchestrator, clients.fake_backend
+
+
+def test_second_run_with_same_requirements_reuses_all_agent_stages():
+    first, first_backend = make_orchestrator()
+    first.run_workflow(REQUIREMENTS)
+    assert first_backend.calls == 3
+
+    second, second_backend = make_orchestrator()
+    result = second.run_workflow(REQUIREMENTS)
+
+    assert result["reuse_report"]["reused_stages"] == ["code", "requirements", "tests"]
+    assert second_backend.calls == 0
+    assert result["reuse_report"]["tokens_saved"] > 0
+    assert CANNED_CODE.strip() in result["generated_code"]["code"]
+
+
+def test_fallback_output_is_never_stored():
+    failing, _ = make_orchestrator(fake_config=FakeLLMConfig(error_rate=1.0,
+                                                             error_kinds=["server"]),
+                                   retry_policy=RetryPolicy(max_retries=0))
+    result = failing.run_workflow(REQUIREMENTS)
+    assert result["reuse_report"]["reused_stages"] == []
+
+    healthy, backend = make_orchestrator()
+    result = healthy.run_workflow(REQUIREMENTS)
+
+    assert result["reuse_report"]["reused_stages"] == []
+    assert backend.calls == 3
+
+
+def test_speculation_miss_is_cancelled_and_regenerated():
+    # Latency keeps the speculative call in flight while requirements are parsed
+    orchestrator, backend = make_orchestrator(fake_config=FakeLLMConfig(latency_s=0.05))
+    code_agent = orchestrator.code_agent
+    build_request = code_agent._build_request
+
+    def build_request_with_features(structured_requirements):
+        # A prompt that depends on the parsed requirements
+        request = build_request(structured_requirements)
+        features = ", ".join(structured_requirements["requirements"]["core_features"])
+        request["messages"][0]["content"] += f"\nFeatures: {features}"
+        return request
+
+    code_agent._build_request = build_request_with_features
+    predicted = copy.deepcopy(orchestrator.requirements_agent.default_requirements(REQUIREMENTS))
+    predicted["requirements"]["core_features"] = ["Something else entirely"]
+    orchestrator.last_requirements = predicted
+
+    result = orchestrator.run_workflow(REQUIREMENTS)
+
+    stages = result["speculation_report"]["stages"]
+    assert stages["code"]["status"] == "miss"
+    assert stages["tests"]["status"] == "hit"
+    assert code_agent.get_speculation_stats()["misses"] == 1
+    # The wasted speculative call, then requirements, code and tests
+    assert backend.calls == 4
+    assert CANNED_CODE.strip() in result["generated_code"]["code"]
@@ -0,0 +1,90 @@
+"""
+Tests for the LLM rate limiter
+Author: [Your Name] - [Student ID]
+
+Covers the wait computed for queued calls, settling reservations, calls
+bigger than the whole budget and reserving without waiting. The clock is
+frozen so waits are exact.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra import rate_limiter
+from infra.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock; set clock.now to move time."""
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: Clock.now)
+    return Clock
+
+
+def test_waits_follow_the_deficit(clock):
+    limiter = RateLimiter(tokens_per_minute=600, requests_per_minute=60)
+
+    assert limiter._reserve(600).wait_s == 0
+    # 300 tokens over budget at 10 tokens/s
+    assert limiter._reserve(300).wait_s == pytest.approx(30)
+    assert limiter.get_stats()["queueDepth"] == 1
+
+    clock.now += 60  # refilled to 300
+    assert limiter._reserve(400).wait_s == pytest.approx(10)
+
+
+def test_request_budget_spaces_calls(clock):
+    limiter = RateLimiter(requests_per_minute=2)
+
+    waits = [limiter._reserve(10).wait_s for _ in range(4)]
+
+    assert waits == pytest.approx([0, 0, 30, 60])
+
+
+def test_settle_refund_does_not_let_new_calls_jump_the_queue(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    first = limiter._reserve(600)
+    queued = limiter._reserve(300)
+
+    limiter.settle(first, 100)  # 500 tokens given back
+
+    assert limiter._tokens == pytest.approx(200)
+    assert limiter._reserve(100).wait_s >= queued.wait_s
+    assert limiter.try_acquire(10) is None
+
+
+def test_settle_never_overfills_the_bucket(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    reservation = limiter._reserve(300)
+
+    limiter.settle(reservation, 0)
+
+    assert limiter._tokens == 600
+    assert limiter.get_stats()["actualTokens"] == 0
+
+
+def test_oversize_call_goes_through_alone(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+
+    oversize = limiter._reserve(5000)
+    after = limiter._reserve(60)
+
+    assert oversize.tokens == 600
+    assert oversize.wait_s == 0
+    assert after.wait_s == pytest.approx(6)
+
+
+def test_try_acquire_only_reserves_without_waiting(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+
+    assert limiter.try_acquire(500).wait_s == 0
+    assert limiter.try_acquire(200) is None
+    assert limiter.get_stats()["requests"] == 1
+    assert RateLimiter().try_acquire(10**6).wait_s == 0
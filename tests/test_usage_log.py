@@ -0,0 +1,39 @@
+"""
+Tests for the usage time series
+Author: [Your Name] - [Student ID]
+
+Covers time filters with and without UTC offsets and rounding of the
+reported statistics.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.usage_log import UsageLog, parse_since
+
+
+def test_since_accepts_offsets_and_naive_records(tmp_path):
+    log = UsageLog(str(tmp_path / "usage.jsonl"))
+    log.append({"ts": "2026-09-30T23:00:00", "duration_s": 1})  # older naive record
+    log.append({"ts": "2026-10-01T00:30:00+00:00", "duration_s": 2})
+    log.append({"ts": "2026-10-01T03:00:00+02:00", "duration_s": 3})
+
+    since = parse_since("2026-10-01T00:00:00Z")
+    until = parse_since("2026-10-01T01:00:00")
+
+    assert [r["duration_s"] for r in log.records(since=since)] == [2, 3]
+    assert [r["duration_s"] for r in log.records(since=since, until=until)] == [2]
+
+
+def test_stats_are_rounded(tmp_path):
+    log = UsageLog(str(tmp_path / "usage.jsonl"))
+    for value in (0.1 + 0.2, 1.1 * 3):  # 0.30000000000000004, 3.3000000000000003
+        log.append({"ts": "2026-10-01T00:00:00+00:00", "duration_s": value})
+
+    stats = log.query("duration_s")["all"]
+
+    assert stats["min"] == 0.3
+    assert stats["max"] == 3.3
+    assert stats["p99"] == 3.3